@@ -1,5 +1,5 @@
 # type: ignore
 
-from . import parlaclarin, tagged
+from . import parlaclarin, parquet, tagged
 from .iterate import ProtocolSegment, ProtocolSegmentIterator
 from .utility import copy_protocols, create_tei_corpus_xml, download_protocols
@@ -1,18 +1,38 @@
 from __future__ import annotations
 
 import glob
+import os
 from dataclasses import asdict, dataclass
-from os.path import basename, dirname, isdir
+from os.path import basename, dirname, isdir, isfile
 from os.path import join as jj
-from typing import Callable, List, Optional, Set
+from typing import Any, Callable, List, Optional, Set
 
 import pandas as pd
+from loguru import logger
 
-from .. import utility
-from .tagged.persist import load_metadata
+from .. import interface, utility
+from .tagged import container
+from .tagged.persist import count_tagged_tokens, load_metadata, load_protocol
+from .utility import get_chamber_by_filename
 
 METADATA_FILENAME: str = 'metadata.json'
 
+"""Manifest of a tagged corpus, stored in corpus folder (one row per protocol archive)"""
+MANIFEST_FILENAME: str = 'manifest.csv'
+MANIFEST_DTYPES: dict[str, Any] = {
+    'path': str,
+    'name': str,
+    'year': int,
+    'chamber_abbrev': str,
+    'date': str,
+    'checksum': str,
+    'size': int,
+    'mtime': int,
+    'n_utterances': int,
+    'n_tokens': int,
+    'is_empty': bool,
+}
+
 """
 Creates a recursive index of files in a source folder that match given pattern.
 """
@@ -27,6 +47,7 @@ class ICorpusSourceItem:
     name: str = None
     subfolder: str = None
     year: Optional[int] = None
+    size: Optional[int] = None
 
     def __post_init__(self):
         self.filename = basename(self.path)
@@ -39,6 +60,10 @@ class ICorpusSourceItem:
         """Year extracted from filename"""
         self.year = int(self.filename.split("-")[1][:4])
 
+        """Size of file in bytes (used when scheduling work)"""
+        if self.size is None:
+            self.size = container.getsize(self.path)
+
     @property
     def is_empty(self) -> bool:
         return False
@@ -56,7 +81,8 @@ class TaggedCorpusSourceItem(ICorpusSourceItem):
 
     def __post_init__(self):
         super().__post_init__()
-        self.metadata = load_metadata(self.path)
+        if self.metadata is None:
+            self.metadata = load_metadata(self.path)
         """Year from data in metadata (the actual year)"""
         # self.actual_year = int(self.metadata['date'][:4]) if self.metadata else self.year
 
@@ -90,22 +116,35 @@ class CorpusSourceIndex:
         source_pattern: str | Callable,
         years: Optional[str | Set[int]] = None,
         skip_empty: bool = True,
+        use_manifest: bool = True,
     ) -> "CorpusSourceIndex":
-        """Loads a CorpusSourceIndex from a folder with files matching a pattern"""
-        if not isdir(source_folder):
+        """Loads a CorpusSourceIndex from a folder (or packed container) with files matching a pattern. If
+        `use_manifest` and the folder has a manifest, then tagged protocols that are unchanged (same size and
+        modification time) since the manifest was stored are not opened."""
+        if not isdir(source_folder) and not container.is_container(source_folder):
             raise FileNotFoundError(f"folder {source_folder} not found")
 
         paths: List[str] = (
             source_pattern(source_folder)
             if callable(source_pattern)
-            else glob.glob(jj(source_folder, source_pattern), recursive=True)
+            else (
+                container.open_container(source_folder).glob(source_pattern)
+                if container.is_container(source_folder)
+                else glob.glob(jj(source_folder, source_pattern), recursive=True)
+            )
         )
 
         target_years: Set[int] = (
             None if years is None else (set(utility.parse_range_list(years)) if isinstance(years, str) else set(years))
         )
 
-        source_items: List[ICorpusSourceItem] = [CorpusSourceIndex.create(path=path) for path in paths]
+        manifest: CorpusManifest | None = CorpusManifest.load(source_folder) if use_manifest else None
+
+        source_items: List[ICorpusSourceItem] = (
+            manifest.to_source_items(paths)
+            if manifest is not None
+            else [CorpusSourceIndex.create(path=path) for path in paths]
+        )
 
         if target_years is not None:
             source_items = [x for x in source_items if x.year in target_years]
@@ -134,19 +173,126 @@ class CorpusSourceIndex:
         """Returns a list of paths to files in the index"""
         return sorted([x.path for x in self.source_items])
 
+    @property
+    def sizes(self) -> dict[str, int]:
+        """Returns file size (in bytes) for each path in the index"""
+        return {x.path: x.size for x in self.source_items if x.size is not None}
+
     def to_pandas(self) -> pd.DataFrame:
-        """Returns a pandas DataFrame with columns path, filename, name, subfolder, year"""
+        """Returns a pandas DataFrame with columns path, filename, name, subfolder, year, size"""
         df: pd.DataFrame = pd.DataFrame(data=[x.to_dict() for x in self.source_items])
         return df
 
     def to_csv(self, filename: str = None) -> Optional[str]:
-        """Writes a CSV file with columns path, filename, name, subfolder, year"""
+        """Writes a CSV file with columns path, filename, name, subfolder, year, size"""
         return self.to_pandas().to_csv(filename, sep='\t', index=None)  # type: ignore
 
     @staticmethod
     def read_csv(filename: str) -> "CorpusSourceIndex":
-        """Reads a CSV file with columns path, filename, name, subfolder, year"""
+        """Reads a CSV file with columns path, filename, name, subfolder, year (and size)"""
         df: pd.DataFrame = pd.read_csv(filename, sep="\t", index_col=None)
         source_items: list[ICorpusSourceItem] = [ICorpusSourceItem(**d) for d in df.to_dict('records')]  # type: ignore
         source_index: CorpusSourceIndex = CorpusSourceIndex(source_items)
         return source_index
+
+
+class CorpusManifest:
+    """Stored metadata of each protocol archive in a tagged corpus folder (see `MANIFEST_DTYPES`). Rows are
+    indexed by path relative to corpus folder, and are valid as long as the file's size and modification time
+    are unchanged. Stored (as TSV) in `MANIFEST_FILENAME` in corpus folder."""
+
+    def __init__(self, source_folder: str, data: pd.DataFrame):
+        self.source_folder: str = source_folder
+        self.data: pd.DataFrame = data
+        self.rows: dict[str, dict] = data.to_dict('index')
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    @property
+    def filename(self) -> str:
+        return jj(self.source_folder, MANIFEST_FILENAME)
+
+    @staticmethod
+    def load(source_folder: str) -> "CorpusManifest | None":
+        """Load manifest stored in `source_folder`. Return None if there is no manifest."""
+        filename: str = jj(source_folder, MANIFEST_FILENAME)
+        if not isfile(filename):
+            return None
+        data: pd.DataFrame = pd.read_csv(
+            filename, sep='\t', index_col=None, dtype={k: v for k, v in MANIFEST_DTYPES.items() if v is not str}
+        )
+        return CorpusManifest(source_folder, data.set_index('path', drop=False).rename_axis(None))
+
+    def store(self) -> "CorpusManifest":
+        """Store manifest in corpus folder. Return self."""
+        self.data.to_csv(self.filename, sep='\t', index=False)
+        return self
+
+    @staticmethod
+    def create(
+        source_folder: str, source_pattern: str = '**/prot-*.zip', previous: "CorpusManifest" = None
+    ) -> "CorpusManifest":
+        """Create manifest of protocols in `source_folder`. Rows of `previous` manifest that are still valid are
+        reused, other protocols are probed."""
+        records: list[dict] = []
+        for path in sorted(glob.glob(jj(source_folder, source_pattern), recursive=True)):
+            stat: os.stat_result = os.stat(path)
+            record: dict | None = previous.get_record(path, stat) if previous is not None else None
+            records.append(record or CorpusManifest.probe(source_folder, path, stat))
+        data: pd.DataFrame = pd.DataFrame(records, columns=list(MANIFEST_DTYPES))
+        return CorpusManifest(source_folder, data.set_index('path', drop=False).rename_axis(None))
+
+    @staticmethod
+    def update(source_folder: str, source_pattern: str = '**/prot-*.zip') -> "CorpusManifest":
+        """Create (or update stale rows of) manifest stored in `source_folder`. Return stored manifest."""
+        previous: CorpusManifest | None = CorpusManifest.load(source_folder)
+        manifest: CorpusManifest = CorpusManifest.create(source_folder, source_pattern, previous=previous).store()
+        logger.info(f"manifest: {len(manifest)} protocols in {source_folder}")
+        return manifest
+
+    @staticmethod
+    def probe(source_folder: str, path: str, stat: os.stat_result) -> dict:
+        """Read metadata and utterance counts of protocol archive `path` (utterance index is read if stored)."""
+        metadata: dict | None = load_metadata(path)
+        protocol: interface.Protocol | None = load_protocol(path, metadata_only=True) if metadata else None
+        utterances: list[interface.Utterance] = protocol.utterances if protocol is not None else []
+        return {
+            'path': os.path.relpath(path, source_folder),
+            'name': utility.strip_path_and_extension(path),
+            'year': int(basename(path).split("-")[1][:4]),
+            'chamber_abbrev': get_chamber_by_filename(path),
+            'date': (metadata or {}).get('date'),
+            'checksum': (metadata or {}).get('checksum'),
+            'size': stat.st_size,
+            'mtime': stat.st_mtime_ns,
+            'n_utterances': len(utterances),
+            'n_tokens': sum(
+                u.n_tokens if isinstance(u, interface.UtteranceMetadata) else count_tagged_tokens(u.tagged_text)
+                for u in utterances
+            ),
+            'is_empty': not bool(metadata),
+        }
+
+    def get_record(self, path: str, stat: os.stat_result) -> dict | None:
+        """Stored row of protocol archive `path` if still valid (same size and modification time), otherwise None."""
+        record: dict | None = self.rows.get(os.path.relpath(path, self.source_folder))
+        if record is None or (record['size'], record['mtime']) != (stat.st_size, stat.st_mtime_ns):
+            return None
+        return record
+
+    def to_source_items(self, paths: list[str]) -> list[ICorpusSourceItem]:
+        """Create source items of `paths`. Protocols without a valid row in manifest are probed."""
+        source_items: list[ICorpusSourceItem] = []
+        n_probed: int = 0
+        for path in paths:
+            record: dict | None = self.get_record(path, os.stat(path))
+            if record is None:
+                source_items.append(CorpusSourceIndex.create(path=path))
+                n_probed += 1
+                continue
+            metadata: dict = {} if record['is_empty'] else {k: record[k] for k in ('name', 'date', 'checksum')}
+            source_items.append(TaggedCorpusSourceItem(path, size=record['size'], metadata=metadata))
+        if n_probed > 0:
+            logger.info(f"manifest: {n_probed} of {len(paths)} protocols are not in manifest (or have changed)")
+        return source_items
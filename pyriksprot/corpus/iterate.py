@@ -1,17 +1,39 @@
 from __future__ import annotations
 
 import abc
-from dataclasses import dataclass
+import collections
+import itertools
+import math
+import os
+import pickle
+import queue
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field, fields
+from functools import partial
 from multiprocessing import get_context
-from typing import TYPE_CHECKING, Callable, Iterable, Literal
+from multiprocessing.pool import AsyncResult
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Literal
 
+import lz4.frame  # type: ignore
 import numpy as np
+import pyarrow as pa
 import tqdm
+from loguru import logger
 
 from .. import to_speech as mu
 from ..corpus.utility import format_protocol_name, get_chamber_by_filename
-from ..interface import ContentType, IDispatchItem, Protocol, SegmentLevel
-from ..utility import compress
+from ..interface import (
+    ContentType,
+    IDispatchItem,
+    Protocol,
+    SegmentLevel,
+    TokenTableUtterance,
+    Utterance,
+    UtteranceHelper,
+)
+from ..utility import compress, intern_str
 
 if TYPE_CHECKING:
     from ..metadata import SpeakerInfo
@@ -19,9 +41,10 @@ if TYPE_CHECKING:
 # pylint: disable=too-many-arguments, no-member
 
 
-@dataclass
+@dataclass(slots=True)
 class ProtocolSegment(IDispatchItem):
-    """Container for a subset of utterances within a single protocol."""
+    """Container for a subset of utterances within a single protocol. Slotted, and names shared by many
+    segments (protocol, chamber, speaker and speaker note) are interned, to keep large segment lists small."""
 
     protocol_name: str
     chamber_abbrev: str
@@ -37,6 +60,64 @@ class ProtocolSegment(IDispatchItem):
     speaker_note_id: str = None
     speech_index: int = None
     speech_name: str = None
+    utterances: list[Utterance] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        """If `data` is None, then `data` is merged from `utterances` when first accessed"""
+        self.protocol_name = intern_str(self.protocol_name)
+        self.chamber_abbrev = intern_str(self.chamber_abbrev)
+        self.who = intern_str(self.who)
+        self.speaker_note_id = intern_str(self.speaker_note_id)
+        if self.data is None and self.utterances is not None:
+            del self.data
+
+    def __getattr__(self, name: str):
+        """Called only when `data` has not yet been merged (or for unknown attributes)"""
+        if name == 'data' and self.utterances is not None:
+            self.data = UtteranceHelper.merge_content(self.utterances, self.merge_content_type)
+            self.utterances = None
+            return self.data
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+    def __getstate__(self) -> dict:
+        """Merge `data` (and drop source utterances) when pickled. Utterances loaded from a columnar store are
+        kept instead (tokens are pickled, tagged CSV is not created)."""
+        if self.utterances is not None and self.is_token_table:
+            return {**{f.name: getattr(self, f.name) for f in fields(self) if f.name != 'data'}, 'data': None}
+        return {**{f.name: getattr(self, f.name) for f in fields(self)}, 'data': self.data, 'utterances': None}
+
+    def __setstate__(self, state: dict) -> None:
+        for key, value in state.items():
+            setattr(self, key, value)
+        if state.get('data') is None and state.get('utterances') is not None:
+            del self.data
+
+    @property
+    def is_token_table(self) -> bool:
+        """True if (not yet merged) tagged data is available as Arrow token tables"""
+        return (
+            self.utterances is not None
+            and self.merge_content_type == ContentType.TaggedFrame
+            and all(isinstance(u, TokenTableUtterance) for u in self.utterances)
+        )
+
+    def token_table(self) -> pa.Table | None:
+        """IDispatchItem interface. Tokens merged from utterances loaded from a columnar store."""
+        if not self.is_token_table:
+            return None
+        return UtteranceHelper.merge_token_tables(self.utterances)
+
+    @property
+    def merge_content_type(self) -> ContentType:
+        """Content merged from utterances (protocol segments are always text)"""
+        return ContentType.Text if self.segment_level in (SegmentLevel.Protocol, None) else self.content_type
+
+    @property
+    def data_length(self) -> int:
+        """Length of `data` (computed from utterances if not yet merged)"""
+        if self.utterances is None:
+            return len(self.data or "")
+        return UtteranceHelper.merged_content_length(self.utterances, self.merge_content_type)
 
     def __len__(self) -> int:
         """IDispatchItem interface"""
@@ -113,7 +194,8 @@ def to_protocol_segment(
             who=None,
             id=protocol.name,
             u_id=None,
-            data=protocol.text,
+            data=None,
+            utterances=protocol.utterances,
             page_number=0,
             n_tokens=0,
             n_utterances=len(protocol.utterances),
@@ -145,9 +227,10 @@ def to_speech_segments(
             who=s.who,
             id=s.speech_id,
             u_id=s.speech_id,
-            data=s.to_content_str(content_type),
+            data=None,
+            utterances=s.utterances,
             page_number=s.page_number,
-            n_tokens=0 if not s.has_tagged_text else s.tagged_text.count("\n"),
+            n_tokens=UtteranceHelper.count_tokens(s.utterances),
             n_utterances=len(s),
             speaker_note_id=s.speaker_note_id,
             speech_index=s.speech_index,
@@ -176,7 +259,8 @@ def to_who_segments(
             who=s.who,
             id=s.speech_id,
             u_id=s.speech_id,
-            data=s.to_content_str(content_type),
+            data=None,
+            utterances=s.utterances,
             page_number=s.page_number,
             n_tokens=0,
             n_utterances=len(s),
@@ -185,17 +269,19 @@ def to_who_segments(
     ]
 
 
-def to_utterance_segments(
-    *, protocol: Protocol, content_type: ContentType, which_year: Literal["filename", "date"] = "filename", **_
-) -> list[ProtocolSegment]:
-    return [
-        ProtocolSegment(
-            protocol_name=protocol.name,
-            chamber_abbrev=get_chamber_by_filename(protocol.name),
+def iter_utterance_segments(
+    *, protocol_name: str, year: int, utterances: Iterable[Utterance], content_type: ContentType
+) -> Iterator[ProtocolSegment]:
+    """Streaming version of `to_utterance_segments`. Yields a segment as soon as each utterance is consumed."""
+    chamber_abbrev: str = get_chamber_by_filename(protocol_name)
+    for i, u in enumerate(utterances):
+        yield ProtocolSegment(
+            protocol_name=protocol_name,
+            chamber_abbrev=chamber_abbrev,
             content_type=content_type,
             segment_level=SegmentLevel.Utterance,
-            year=protocol.get_year(which=which_year),
-            name=f'{protocol.name}_{i+1:03}',
+            year=year,
+            name=f'{protocol_name}_{i+1:03}',
             who=u.who,
             id=u.u_id,
             u_id=u.u_id,
@@ -204,32 +290,56 @@ def to_utterance_segments(
             n_tokens=0,
             n_utterances=1,
         )
-        for i, u in enumerate(protocol.utterances)
-    ]
 
 
-def to_paragraph_segments(
+def iter_paragraph_segments(
+    *, protocol_name: str, year: int, utterances: Iterable[Utterance], content_type: ContentType
+) -> Iterator[ProtocolSegment]:
+    """Streaming version of `to_paragraph_segments`. Yields segments as soon as each utterance is consumed."""
+    chamber_abbrev: str = get_chamber_by_filename(protocol_name)
+    for j, u in enumerate(utterances):
+        for i, p in enumerate(u.paragraphs):
+            yield ProtocolSegment(
+                protocol_name=protocol_name,
+                chamber_abbrev=chamber_abbrev,
+                content_type=content_type,
+                segment_level=SegmentLevel.Paragraph,
+                year=year,
+                name=f'{protocol_name}_{j+1:03}_{i+1:03}',
+                who=u.who,
+                id=f"{u.u_id}@{i}",
+                u_id=u.u_id,
+                data=p,
+                page_number=u.page_number,
+                n_tokens=0,
+                n_utterances=1,
+            )
+
+
+def to_utterance_segments(
     *, protocol: Protocol, content_type: ContentType, which_year: Literal["filename", "date"] = "filename", **_
 ) -> list[ProtocolSegment]:
-    return [
-        ProtocolSegment(
+    return list(
+        iter_utterance_segments(
             protocol_name=protocol.name,
-            chamber_abbrev=get_chamber_by_filename(protocol.name),
+            year=protocol.get_year(which=which_year),
+            utterances=protocol.utterances,
             content_type=content_type,
-            segment_level=SegmentLevel.Paragraph,
+        )
+    )
+
+
+def to_paragraph_segments(
+    *, protocol: Protocol, content_type: ContentType, which_year: Literal["filename", "date"] = "filename", **_
+) -> list[ProtocolSegment]:
+    return list(
+        iter_paragraph_segments(
+            protocol_name=protocol.name,
             year=protocol.get_year(which=which_year),
-            name=f'{protocol.name}_{j+1:03}_{i+1:03}',
-            who=u.who,
-            id=f"{u.u_id}@{i}",
-            u_id=u.u_id,
-            data=p,
-            page_number=u.page_number,
-            n_tokens=0,
-            n_utterances=1,
+            utterances=protocol.utterances,
+            content_type=content_type,
         )
-        for j, u in enumerate(protocol.utterances)
-        for i, p in enumerate(u.paragraphs)
-    ]
+    )
 
 
 def to_segments(
@@ -267,11 +377,43 @@ def to_segments(
             x.data = preprocess(x.data)
 
     if segment_skip_size > 0:
-        segments = [x for x in segments if len(x.data) > segment_skip_size]
+        segments = [x for x in segments if x.data_length > segment_skip_size]
 
     return segments
 
 
+def iter_segments(
+    *,
+    protocol_name: str,
+    year: int,
+    utterances: Iterable[Utterance],
+    content_type: ContentType,
+    segment_level: SegmentLevel,
+    segment_skip_size: int = 1,
+    preprocess: Callable[[str], str] = None,
+) -> Iterator[ProtocolSegment]:
+    """Streaming version of `to_segments` for utterance and paragraph levels.
+
+    Segments are yielded as utterances are consumed from `utterances` (e.g. a parser's `iter_utterances`),
+    so memory is bounded by a single utterance instead of an entire protocol.
+    """
+    if segment_level not in STREAMING_SEGMENT_FUNCTIONS:
+        raise ValueError(f"streaming not supported for segment level {segment_level}")
+
+    segments: Iterable[ProtocolSegment] = STREAMING_SEGMENT_FUNCTIONS.get(segment_level)(
+        protocol_name=protocol_name, year=year, utterances=utterances, content_type=content_type
+    )
+
+    for x in segments:
+        if preprocess is not None:
+            x.data = preprocess(x.data)
+
+        if segment_skip_size > 0 and not len(x.data) > segment_skip_size:
+            continue
+
+        yield x
+
+
 SEGMENT_FUNCTIONS: dict = {
     None: to_protocol_segment,
     SegmentLevel.Protocol: to_protocol_segment,
@@ -281,6 +423,319 @@ SEGMENT_FUNCTIONS: dict = {
     SegmentLevel.Paragraph: to_paragraph_segments,
 }
 
+STREAMING_SEGMENT_FUNCTIONS: dict = {
+    SegmentLevel.Utterance: iter_utterance_segments,
+    SegmentLevel.Paragraph: iter_paragraph_segments,
+}
+
+
+class ISegmentPreprocessor(abc.ABC):
+    """Picklable per-segment preprocess stage that, when multiprocessing, is applied in the worker processes.
+
+    Expensive resources (dehyphenator, metadata lookups etc.) are created in `setup`, which is called once
+    per worker process by the pool initializer (or on first call when not multiprocessing).
+    """
+
+    def __init__(self):
+        self.is_setup: bool = False
+
+    def setup(self) -> None:
+        """Create resources needed by `process`."""
+
+    @abc.abstractmethod
+    def process(self, item: ProtocolSegment) -> None: ...
+
+    def ensure_setup(self) -> ISegmentPreprocessor:
+        if not self.is_setup:
+            self.setup()
+            self.is_setup = True
+        return self
+
+    def __call__(self, item: ProtocolSegment) -> None:
+        self.ensure_setup().process(item)
+
+
+"""Preprocess stage installed in worker process by `initialize_worker`"""
+WORKER_PREPROCESS: ISegmentPreprocessor | None = None
+
+
+def initialize_worker(preprocess: ISegmentPreprocessor) -> None:
+    """Pool initializer: install (and setup) preprocess stage in worker process."""
+    global WORKER_PREPROCESS  # pylint: disable=global-statement
+    WORKER_PREPROCESS = preprocess
+    try:
+        preprocess.ensure_setup()
+    except Exception as ex:  # pylint: disable=broad-exception-caught
+        """Exceptions raised in initializer would make pool respawn workers indefinitely, defer to first call"""
+        logger.error(f"worker preprocess setup failed: {ex}")
+
+
+def pack_segments(segments: list[ProtocolSegment], compress_text: bool = False) -> bytes:
+    """Pack segments into a single buffer: attributes are stored column-wise and segment texts are
+    concatenated into one block (LZ4 compressed if `compress_text`). Reduces cost of transferring
+    segments between processes."""
+    states: list[dict] = [x.__getstate__() for x in segments]
+    keys: tuple[str, ...] = tuple(states[0]) if states else ()
+    if any(tuple(x) != keys for x in states):
+        raise ValueError("pack_segments: segments must have identical attributes")
+    texts: list[str] = [x['data'] or "" for x in states]
+    columns: list[list] = [[x[key] for x in states] for key in keys if key != 'data']
+    block: str | bytes = "".join(texts)
+    if compress_text:
+        block = lz4.frame.compress(block.encode("utf-8"))
+    return pickle.dumps((keys, columns, [len(t) for t in texts], block), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def unpack_segments(data: bytes) -> list[ProtocolSegment]:
+    """Rebuild segments packed by `pack_segments`."""
+    keys, columns, lengths, block = pickle.loads(data)
+    text: str = lz4.frame.decompress(block).decode("utf-8") if isinstance(block, bytes) else block
+    offsets: list[int] = [0, *itertools.accumulate(lengths)]
+    texts: list[str] = [text[i:j] for i, j in zip(offsets, offsets[1:])]
+    data_index: int = keys.index('data') if keys else 0
+    segments: list[ProtocolSegment] = []
+    for values in zip(*columns[:data_index], texts, *columns[data_index:]):
+        segment: ProtocolSegment = object.__new__(ProtocolSegment)
+        segment.__setstate__(dict(zip(keys, values)))
+        segments.append(segment)
+    return segments
+
+
+def worker_load(
+    args, fx: Callable[..., Iterable[ProtocolSegment]], preprocess: bool, transport: str
+) -> list[ProtocolSegment] | bytes:
+    """Load segments using `fx` and apply worker's preprocess stage (if `preprocess`) before segments are
+    returned to parent, packed into a single buffer unless `transport` is 'pickle'."""
+    items: list[ProtocolSegment] = list(fx(args))
+    if preprocess:
+        for item in items:
+            WORKER_PREPROCESS(item)
+    if transport == "pickle":
+        return items
+    return pack_segments(items, compress_text=transport == "packed-lz4")
+
+
+def worker_imap(
+    imap: Callable, fx: Callable, args: Iterable, *, preprocess: bool, transport: str, **kwargs
+) -> Iterable[list[ProtocolSegment] | bytes]:
+    """Wraps pool's `imap` so that worker stages are applied to results of `fx`."""
+    return imap(partial(worker_load, fx=fx, preprocess=preprocess, transport=transport), args, **kwargs)
+
+
+def payload_size(payload: list[ProtocolSegment] | bytes) -> int:
+    """Approximate size of worker result: length of packed buffer or of segments' text."""
+    if isinstance(payload, (bytes, bytearray)):
+        return len(payload)
+    return sum(len(x.data or "") for x in payload)
+
+
+def indexed_payload_size(chunk: list[tuple[int, list[ProtocolSegment] | bytes]]) -> int:
+    """Size of worker result of an indexed chunk (see `scheduled_imap`)."""
+    return sum(payload_size(x) for _, x in chunk)
+
+
+def map_chunk(fx: Callable, chunk: list) -> list:
+    return [fx(args) for args in chunk]
+
+
+def chunked(items: Iterable, size: int) -> Iterator[list]:
+    iterator: Iterator = iter(items)
+    while chunk := list(itertools.islice(iterator, max(size, 1))):
+        yield chunk
+
+
+def bounded_imap(
+    executor,
+    fx: Callable,
+    args: Iterable,
+    chunksize: int = 1,
+    *,
+    keep_order: bool = False,
+    max_inflight: int = None,
+    max_inflight_bytes: int = None,
+    arg_count: Callable[[object], int] = None,
+    result_size: Callable[[object], int] = payload_size,
+) -> Iterator:
+    """Replacement for `Pool.imap`/`Pool.imap_unordered` with backpressure.
+
+    Tasks (chunks of `chunksize` args) are submitted lazily, so that at most `max_inflight` protocols are
+    submitted but not yet consumed (defaults to two tasks per worker process). Each arg is one protocol, unless
+    `arg_count` is given (e.g. `len` if args are chunks of protocols). No new task is submitted while size of
+    results not yet consumed (see `result_size`), plus estimated size of submitted but unfinished tasks (mean size
+    of completed tasks), exceeds `max_inflight_bytes`. If `keep_order`, results are yielded in submit order, with
+    the window acting as a bounded reorder buffer.
+    """
+    chunks: Iterator[list] = chunked(args, chunksize)
+    max_tasks: int = 2 * max(getattr(executor, '_processes', None) or 1, 1)
+    n_protocols: dict[int, int] = {}
+
+    completed: queue.SimpleQueue = queue.SimpleQueue()
+    inflight: dict[int, AsyncResult] = {}
+    lock: threading.Lock = threading.Lock()
+    buffered_bytes: int = 0
+    sizes: dict[int, int] = {}
+    stats: dict[str, int] = {'n_tasks': 0, 'n_bytes': 0}
+
+    def on_result(task_id: int, results: list) -> None:
+        """Note: runs in pool's result handler thread, an exception raised here would stall the iteration."""
+        nonlocal buffered_bytes
+        try:
+            size: int = sum(result_size(x) for x in results) if max_inflight_bytes else 0
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.warning(f"bounded_imap: unable to compute size of result ({ex})")
+            size = 0
+        with lock:
+            sizes[task_id] = size
+            buffered_bytes += size
+            stats['n_tasks'] += 1
+            stats['n_bytes'] += size
+        if not keep_order:
+            completed.put(task_id)
+
+    def on_error(task_id: int, _: BaseException) -> None:
+        with lock:
+            sizes[task_id] = 0
+        if not keep_order:
+            completed.put(task_id)
+
+    def can_submit(n_chunk_protocols: int) -> bool:
+        if not inflight:
+            return True
+        if max_inflight:
+            if sum(n_protocols.values()) + n_chunk_protocols > max_inflight:
+                return False
+        elif len(inflight) >= max_tasks:
+            return False
+        if not max_inflight_bytes:
+            return True
+        with lock:
+            n_unfinished: int = len(inflight) - len(sizes)
+            estimate: float = stats['n_bytes'] / stats['n_tasks'] if stats['n_tasks'] else 0
+            return buffered_bytes + n_unfinished * estimate < max_inflight_bytes
+
+    task_ids: Iterator[int] = itertools.count()
+    order: collections.deque[int] = collections.deque()
+    exhausted: bool = False
+    chunk: list | None = None
+
+    while True:
+        while not exhausted:
+            chunk = chunk or next(chunks, None)
+            if chunk is None:
+                exhausted = True
+                break
+            n_chunk_protocols: int = sum(arg_count(x) for x in chunk) if arg_count else len(chunk)
+            if not can_submit(n_chunk_protocols):
+                break
+            task_id: int = next(task_ids)
+            n_protocols[task_id] = n_chunk_protocols
+            inflight[task_id] = executor.apply_async(
+                map_chunk,
+                (fx, chunk),
+                callback=partial(on_result, task_id),
+                error_callback=partial(on_error, task_id),
+            )
+            if keep_order:
+                order.append(task_id)
+            chunk = None
+
+        if not inflight:
+            return
+
+        if keep_order:
+            task_id = order.popleft()
+            inflight[task_id].wait()
+        else:
+            task_id = completed.get()
+
+        results: list = inflight.pop(task_id).get()
+        n_protocols.pop(task_id, None)
+        with lock:
+            buffered_bytes -= sizes.pop(task_id, 0)
+
+        yield from results
+
+
+def prefetch_map(fx: Callable, items: Iterable, prefetch: int) -> Iterator:
+    """Threaded `map` that computes up to `prefetch` results ahead of the consumer. Results are yielded in order.
+    Useful when `fx` is dominated by file I/O and decompression (that release the GIL)."""
+    iterator: Iterator = iter(items)
+    futures: collections.deque[Future] = collections.deque()
+    executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=max(prefetch, 1))
+    try:
+        for item in itertools.islice(iterator, max(prefetch, 1)):
+            futures.append(executor.submit(fx, item))
+        while futures:
+            result = futures.popleft().result()
+            for item in itertools.islice(iterator, 1):
+                futures.append(executor.submit(fx, item))
+            yield result
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def largest_first(sizes: list[int]) -> list[int]:
+    """Longest-processing-time-first (LPT) order: indices of `sizes` in descending size (stable)."""
+    return sorted(range(len(sizes)), key=lambda i: -sizes[i])
+
+
+def chunked_by_size(items: Iterable, sizes: Iterable[int], max_bytes: int) -> Iterator[list]:
+    """Group items into chunks having a total size of at most `max_bytes` (items larger than `max_bytes` are
+    chunks of their own)."""
+    chunk: list = []
+    chunk_bytes: int = 0
+    for item, size in zip(items, sizes):
+        if chunk and chunk_bytes + size > max_bytes:
+            yield chunk
+            chunk, chunk_bytes = [], 0
+        chunk.append(item)
+        chunk_bytes += size
+    if chunk:
+        yield chunk
+
+
+def map_indexed_chunk(fx: Callable, chunk: list[tuple[int, object]]) -> list[tuple[int, object]]:
+    return [(i, fx(args)) for i, args in chunk]
+
+
+def scheduled_imap(
+    imap: Callable,
+    fx: Callable,
+    args: list,
+    chunksize: int = 1,
+    *,
+    sizes: list[int],
+    chunk_bytes: int = None,
+    keep_order: bool = False,
+) -> Iterator:
+    """Replacement for `Pool.imap`/`Pool.imap_unordered` that submits `args` largest first (LPT) using `sizes`
+    (e.g. file sizes), which reduces the tail where a single worker processes the last large protocols alone.
+
+    Chunks have a total size of (at most) `chunk_bytes`, which defaults to the size of `chunksize` average items,
+    so that the large items (first) are submitted one by one and the small items (last) are batched.
+    `imap` is an unordered map. If `keep_order`, results are reordered (buffered) to the order of `args`. Note that
+    the reorder buffer is unbounded (the next result in order may be submitted last) and is not counted by `imap`.
+    """
+    order: list[int] = largest_first(sizes)
+    chunk_bytes = chunk_bytes or math.ceil(chunksize * sum(sizes) / max(len(sizes), 1))
+    chunks: Iterator[list] = chunked_by_size([(i, args[i]) for i in order], [sizes[i] for i in order], chunk_bytes)
+
+    results: Iterable[list[tuple[int, object]]] = imap(partial(map_indexed_chunk, fx), chunks)
+
+    if not keep_order:
+        for chunk in results:
+            for _, result in chunk:
+                yield result
+        return
+
+    pending: dict[int, object] = {}
+    next_index: int = 0
+    for chunk in results:
+        pending.update(chunk)
+        while next_index in pending:
+            yield pending.pop(next_index)
+            next_index += 1
+
 
 class ProtocolSegmentIterator(abc.ABC):
     def __init__(
@@ -294,8 +749,16 @@ class ProtocolSegmentIterator(abc.ABC):
         multiproc_chunksize: int = 100,
         multiproc_keep_order: bool = False,
         merge_strategy: str = 'chain',
-        preprocess: Callable[[str], str] = None,
+        speech_index_filename: str = None,
+        preprocess: Callable[[ProtocolSegment], None] = None,
         which_year: Literal["filename", "date"] = "filename",
+        multiproc_transport: Literal["pickle", "packed", "packed-lz4"] = "pickle",
+        multiproc_max_inflight: int = None,
+        multiproc_max_inflight_bytes: int = None,
+        multiproc_schedule: Literal["sorted", "size"] = "sorted",
+        multiproc_chunk_bytes: int = None,
+        filesizes: dict[str, int] = None,
+        prefetch: int = None,
     ):
         """Merge utterances within protocols to segments.
 
@@ -308,20 +771,57 @@ class ProtocolSegmentIterator(abc.ABC):
             multiproc_chunksize (int, optional): Multiprocessing multiproc_chunksize. Defaults to 100.
             multiproc_keep_order (bool, optional): Keep doc order. Defaults to False.
             merge_strategy (str, optional): Speech merge strategy. Defaults to 'chain'.
-            preprocess (Callable[[str], str], optional): Preprocess funcion, only used for text. Defaults to None.
+            speech_index_filename (str, optional): Merge utterances using speeches of `merge_strategy` stored in
+                this utterance speech index (see `CorpusIndexFactory`). Protocols changed since the index was
+                created are clustered by `merge_strategy`. Defaults to None.
+            preprocess (Callable[[ProtocolSegment], None], optional): Preprocess function applied to each segment.
+                An `ISegmentPreprocessor` is applied in worker processes when multiprocessing. Defaults to None.
             which_year (Literal["filename", "date"]): Take year from filename or XML tag `date` in content
+            multiproc_transport (Literal["pickle", "packed", "packed-lz4"]): Return segments from worker processes
+                as pickled objects, or packed column-wise into a single buffer per protocol (optionally with LZ4
+                compressed text). Defaults to 'pickle'.
+            multiproc_max_inflight (int, optional): Max number of protocols submitted to, or returned from, worker
+                processes but not yet consumed. Defaults to None (two tasks per worker process if
+                `multiproc_max_inflight_bytes` is set, otherwise unbounded).
+            multiproc_max_inflight_bytes (int, optional): Pause submitting protocols while size of returned but not
+                yet consumed segments exceeds this limit. Defaults to None (unbounded).
+            multiproc_schedule (Literal["sorted", "size"]): Submit files to worker processes in filename order, or
+                largest first (LPT). If combined with `multiproc_keep_order`, results are reordered in an unbounded
+                buffer, hence in-flight limits cannot be set. Defaults to 'sorted'.
+            multiproc_chunk_bytes (int, optional): If scheduled by size, submit files in chunks of (at most) this
+                many bytes. Defaults to None (size of `multiproc_chunksize` average files).
+            filesizes (dict[str, int], optional): File sizes used by size schedule (e.g. from corpus index).
+                Missing sizes are read from disk. Defaults to None.
+            prefetch (int, optional): If not multiprocessing, load (read, decompress and segment) up to this many
+                files ahead of the consumer in background threads. Defaults to None (no read-ahead).
         """
+        if (
+            multiproc_schedule == "size"
+            and multiproc_keep_order
+            and (multiproc_max_inflight or multiproc_max_inflight_bytes)
+        ):
+            raise ValueError(
+                "multiproc_keep_order cannot be combined with size schedule and a bounded in-flight window "
+                "(results are reordered in an unbounded buffer)"
+            )
         self.filenames: list[str] = sorted(filenames)
         self.iterator: Iterable[ProtocolSegment] | None = None
         self.content_type: ContentType = content_type
         self.segment_level: SegmentLevel = segment_level
         self.segment_skip_size: int = segment_skip_size
-        self.merge_strategy: str = merge_strategy  # FIXME: used??
+        self.merge_strategy: str | mu.IMergeStrategy = mu.resolve_merge_strategy(merge_strategy, speech_index_filename)
         self.multiproc_processes: int = multiproc_processes or 1
         self.multiproc_chunksize: int = multiproc_chunksize
         self.multiproc_keep_order: bool = multiproc_keep_order
-        self.preprocess: Callable[[str], str] = preprocess
+        self.preprocess: Callable[[ProtocolSegment], None] = preprocess
         self.which_year: str = which_year
+        self.multiproc_transport: str = multiproc_transport
+        self.multiproc_max_inflight: int = multiproc_max_inflight
+        self.multiproc_max_inflight_bytes: int = multiproc_max_inflight_bytes
+        self.multiproc_schedule: str = multiproc_schedule
+        self.multiproc_chunk_bytes: int = multiproc_chunk_bytes
+        self.filesizes: dict[str, int] = filesizes or {}
+        self.prefetch: int = prefetch or 0
 
     def __iter__(self):
         self.iterator = self.create_iterator()
@@ -330,34 +830,86 @@ class ProtocolSegmentIterator(abc.ABC):
     def __next__(self):
         return next(self.iterator)
 
+    def get_filesizes(self) -> list[int]:
+        """Sizes of `filenames` (in bytes)"""
+        return [
+            self.filesizes[name] if name in self.filesizes else os.path.getsize(name) if os.path.isfile(name) else 0
+            for name in self.filenames
+        ]
+
+    def create_args(self) -> list[tuple]:
+        """Arguments of tasks submitted to worker processes: one task per file."""
+        return [
+            (
+                name,
+                self.content_type,
+                self.segment_level,
+                self.segment_skip_size,
+                self.merge_strategy,
+                self.which_year,
+            )
+            for name in self.filenames
+        ]
+
+    def get_task_sizes(self, args: list[tuple]) -> list[int]:  # pylint: disable=unused-argument
+        """Sizes of tasks created by `create_args` (used by size schedule)."""
+        return self.get_filesizes()
+
     def create_iterator(self) -> Iterable[ProtocolSegment]:
         item: ProtocolSegment
         fx = self.preprocess
         # speaker_service: SpeakerInfoService = self.speaker_service
 
         if self.multiproc_processes > 1:
-            args: list[tuple[str, str, str, int]] = [
-                (
-                    name,
-                    self.content_type,
-                    self.segment_level,
-                    self.segment_skip_size,
-                    self.merge_strategy,
-                    self.which_year,
-                )
-                for name in self.filenames
-            ]
-            with get_context("spawn").Pool(processes=self.multiproc_processes) as executor:
-                imap = executor.imap if self.multiproc_keep_order else executor.imap_unordered
+            args: list[tuple] = self.create_args()
+            worker_fx: ISegmentPreprocessor | None = fx if isinstance(fx, ISegmentPreprocessor) else None
+            with get_context("spawn").Pool(
+                processes=self.multiproc_processes,
+                initializer=initialize_worker if worker_fx else None,
+                initargs=(worker_fx,) if worker_fx else (),
+            ) as executor:
+                by_size: bool = self.multiproc_schedule == "size"
+                keep_order: bool = self.multiproc_keep_order and not by_size
+                if self.multiproc_max_inflight or self.multiproc_max_inflight_bytes:
+                    imap = partial(
+                        bounded_imap,
+                        executor,
+                        keep_order=keep_order,
+                        max_inflight=self.multiproc_max_inflight,
+                        max_inflight_bytes=self.multiproc_max_inflight_bytes,
+                        arg_count=len if by_size else None,
+                        result_size=indexed_payload_size if by_size else payload_size,
+                    )
+                else:
+                    imap = executor.imap if keep_order else executor.imap_unordered
+                if by_size:
+                    imap = partial(
+                        scheduled_imap,
+                        imap,
+                        sizes=self.get_task_sizes(args),
+                        chunk_bytes=self.multiproc_chunk_bytes,
+                        keep_order=self.multiproc_keep_order,
+                    )
+                pack: bool = self.multiproc_transport != "pickle"
+                if worker_fx or pack:
+                    imap = partial(
+                        worker_imap, imap, preprocess=worker_fx is not None, transport=self.multiproc_transport
+                    )
+                if worker_fx:
+                    fx = None
                 futures = self.map_futures(imap=imap, args=args) or []
                 for payload in futures:
-                    for item in payload:
+                    for item in unpack_segments(payload) if pack else payload:
                         if fx:
                             fx(item)
                         yield item
         else:
-            for filename in tqdm.tqdm(self.filenames):
-                for item in self.load(filename=filename):
+            filenames: Iterable[str] = tqdm.tqdm(self.filenames)
+            loaded: Iterable[Iterable[ProtocolSegment]] = (
+                prefetch_map(self.load, filenames, self.prefetch) if self.prefetch > 0 else map(self.load, filenames)
+            )
+            for items in loaded:
+                for item in items:
                     if fx:
                         fx(item)
                     yield item
@@ -1,6 +1,8 @@
 # type: ignore
 
+from .cache import ProtocolCache, configure_protocol_cache, get_protocol_cache
 from .convert import ProtocolConverter, convert_protocol
-from .iterate import XmlProtocolSegmentIterator, XmlUntangleSegmentIterator
+from .iterate import XmlIterParseSegmentIterator, XmlProtocolSegmentIterator, XmlUntangleSegmentIterator
+from .iterparse import IterParseProtocolMapper
 from .parse import ProtocolMapper
 from .tf import TermFrequencyCounter
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import contextlib
+import functools
+import glob
+import hashlib
+import os
+import threading
+from typing import Any, Callable, Iterable, Type
+
+import lz4.frame  # type: ignore
+from loguru import logger
+from pandas.io.json import ujson_dumps, ujson_loads  # type: ignore
+
+from pyriksprot import interface
+from pyriksprot.utility import compute_file_hash
+
+jj = os.path.join
+
+"""Environment variables that enable (opt-in) the parsed protocol cache. Environment is used (instead of
+module state) since it is inherited by `spawn`:ed worker processes."""
+PROTOCOL_CACHE_ENV: str = "PYRIKSPROT_PROTOCOL_CACHE"
+PROTOCOL_CACHE_MAX_SIZE_ENV: str = "PYRIKSPROT_PROTOCOL_CACHE_MAX_SIZE"
+PROTOCOL_CACHE_USE_HASH_ENV: str = "PYRIKSPROT_PROTOCOL_CACHE_USE_HASH"
+
+CACHE_EXTENSION: str = ".json.lz4"
+CACHE_VERSION: int = 1
+
+"""Fraction of `max_size` that eviction shrinks the cache to"""
+LOW_WATERMARK: float = 0.9
+
+
+def source_fingerprint(filename: str, use_hash: bool = False) -> dict[str, Any]:
+    """Identity of a source file's content: path, size, mtime and (optionally) content hash."""
+    stat: os.stat_result = os.stat(filename)
+    return {
+        'path': os.path.abspath(filename),
+        'size': stat.st_size,
+        'mtime': stat.st_mtime_ns,
+        'hash': compute_file_hash(filename) if use_hash else None,
+    }
+
+
+def encode_protocol(protocol: interface.Protocol, fingerprint: dict[str, Any]) -> bytes:
+    """Encode protocol as LZ4 compressed JSON."""
+    data: dict = {
+        'version': CACHE_VERSION,
+        'source': fingerprint,
+        'name': protocol.name,
+        'date': protocol.date,
+        'preface_name': protocol.preface_name,
+        'utterances': [u.__getstate__() for u in protocol.utterances],
+        'speaker_notes': {k: v.speaker_note for k, v in protocol.speaker_notes.items()},
+        'page_references': [(p.source_id, p.page_number, p.reference) for p in protocol.page_references or []],
+    }
+    return lz4.frame.compress(ujson_dumps(data).encode('utf-8'))
+
+
+def decode_data(data: bytes) -> dict:
+    return ujson_loads(lz4.frame.decompress(data).decode('utf-8'))
+
+
+def decode_protocol(data: dict) -> interface.Protocol:
+    """Create protocol from decoded cache entry."""
+    return interface.Protocol(
+        date=data['date'],
+        name=data['name'],
+        preface_name=data['preface_name'],
+        utterances=[interface.Utterance(**u) for u in data['utterances']],
+        speaker_notes={k: interface.SpeakerNote(k, v) for k, v in data['speaker_notes'].items()},
+        page_references=[interface.PageReference(*p) for p in data['page_references']],
+    )
+
+
+class ProtocolCache:
+    """On-disk cache of parsed protocols keyed by source fingerprint (path, size, mtime and optional hash).
+
+    Entries are stored as `<folder>/<key[:2]>/<key>.json.lz4`. Since the key is derived from the
+    fingerprint, an updated source file simply misses the cache (stale entries are removed by `prune`).
+    Least recently used entries are evicted when the total size of the cache exceeds `max_size` bytes.
+    """
+
+    def __init__(self, folder: str, *, max_size: int | None = None, use_hash: bool = False):
+        self.folder: str = folder
+        self.max_size: int | None = max_size or None
+        self.use_hash: bool = use_hash
+        self._size: int | None = None
+        self._lock: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def from_environ() -> "ProtocolCache | None":
+        """Return cache configured by environment, or None if cache is not enabled."""
+        settings: tuple[str, int, bool] | None = environ_settings()
+        if settings is None:
+            return None
+        return ProtocolCache(settings[0], max_size=settings[1], use_hash=settings[2])
+
+    def key(self, fingerprint: dict[str, Any], **opts) -> str:
+        """Cache key for source fingerprint and parse options (that affect the parsed protocol)."""
+        parts: list[str] = [f"{k}={fingerprint[k]}" for k in sorted(fingerprint)] + [
+            f"{k}={sorted(v) if isinstance(v, (set, list, tuple)) else v}" for k, v in sorted(opts.items())
+        ]
+        return hashlib.sha1("|".join(parts).encode('utf-8')).hexdigest()
+
+    def path(self, key: str) -> str:
+        return jj(self.folder, key[:2], f"{key}{CACHE_EXTENSION}")
+
+    def get(self, filename: str, **opts) -> interface.Protocol | None:
+        """Return cached protocol for `filename` if it exists and is up-to-date, otherwise None."""
+        try:
+            path: str = self.path(self.key(source_fingerprint(filename, self.use_hash), **opts))
+            with open(path, "rb") as fp:
+                data: dict = decode_data(fp.read())
+            if data.get('version') != CACHE_VERSION:
+                return None
+            protocol: interface.Protocol = decode_protocol(data)
+            os.utime(path)
+            return protocol
+        except FileNotFoundError:
+            return None
+        except Exception as ex:  # pylint: disable=broad-exception-caught
+            logger.warning(f"protocol cache: ignoring unreadable entry for {filename}: {ex}")
+            return None
+
+    def put(self, filename: str, protocol: interface.Protocol, **opts) -> None:
+        """Store `protocol` parsed from `filename`."""
+        fingerprint: dict[str, Any] = source_fingerprint(filename, self.use_hash)
+        path: str = self.path(self.key(fingerprint, **opts))
+        data: bytes = encode_protocol(protocol, fingerprint)
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        """Write to temporary file (unique per process and thread) and rename so that concurrent readers never see
+        partial entries. Size of an overwritten entry is subtracted from running size."""
+        tmp_path: str = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as fp:
+            fp.write(data)
+        with self._lock:
+            old_size: int = os.path.getsize(path) if os.path.isfile(path) else 0
+            os.replace(tmp_path, path)
+            if self.max_size:
+                self._size = self.size() if self._size is None else self._size + len(data) - old_size
+            exceeded: bool = bool(self.max_size) and self._size > self.max_size
+
+        if exceeded:
+            self.prune(stale=False)
+
+    def entries(self) -> list[str]:
+        return glob.glob(jj(self.folder, "*", f"*{CACHE_EXTENSION}"))
+
+    def size(self) -> int:
+        """Total size in bytes of all entries."""
+        return sum(os.path.getsize(path) for path in self.entries())
+
+    def is_stale(self, path: str) -> bool:
+        """True if entry's source file has been removed or changed since entry was created."""
+        try:
+            with open(path, "rb") as fp:
+                fingerprint: dict[str, Any] = decode_data(fp.read())['source']
+            source: str = fingerprint['path']
+            return not os.path.isfile(source) or source_fingerprint(source, bool(fingerprint['hash'])) != fingerprint
+        except Exception:  # pylint: disable=broad-exception-caught
+            return True
+
+    def prune(self, *, max_size: int | None = None, stale: bool = True) -> list[str]:
+        """Remove stale entries (if `stale`) and evict least recently used entries until size is below `max_size`.
+        Return removed entries."""
+        max_size = max_size or self.max_size
+        removed: list[str] = []
+
+        entries: list[tuple[float, int, str]] = []
+        for path in self.entries():
+            if stale and self.is_stale(path):
+                removed.append(path)
+                continue
+            stat: os.stat_result = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total_size: int = sum(e[1] for e in entries)
+
+        if max_size and total_size > max_size:
+            for _, size, path in sorted(entries):
+                if total_size <= max_size * LOW_WATERMARK:
+                    break
+                removed.append(path)
+                total_size -= size
+
+        for path in removed:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+
+        with self._lock:
+            self._size = total_size
+        return removed
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        for path in self.entries():
+            os.remove(path)
+        self._size = 0
+
+    def warm(self, filenames: Iterable[str], parser: Type[interface.IProtocolParser], **opts) -> int:
+        """Parse (and cache) all `filenames` not already in cache. Return number of parsed files."""
+        n_parsed: int = 0
+        for filename in filenames:
+            if self.get(filename, **opts) is not None:
+                continue
+            self.put(filename, parser.parse(filename, **opts), **opts)
+            n_parsed += 1
+        return n_parsed
+
+
+def configure_protocol_cache(folder: str | None, *, max_size: int | None = None, use_hash: bool = False) -> None:
+    """Enable (or disable if `folder` is None) the parsed protocol cache for this process and its children."""
+    if not folder:
+        for key in (PROTOCOL_CACHE_ENV, PROTOCOL_CACHE_MAX_SIZE_ENV, PROTOCOL_CACHE_USE_HASH_ENV):
+            os.environ.pop(key, None)
+        return
+    os.environ[PROTOCOL_CACHE_ENV] = folder
+    os.environ[PROTOCOL_CACHE_MAX_SIZE_ENV] = str(max_size or 0)
+    os.environ[PROTOCOL_CACHE_USE_HASH_ENV] = str(use_hash)
+
+
+def environ_settings() -> tuple[str, int, bool] | None:
+    """Folder, max size and use of hash of cache configured by environment, or None if cache is not enabled."""
+    folder: str = os.environ.get(PROTOCOL_CACHE_ENV)
+    if not folder:
+        return None
+    return (
+        folder,
+        int(os.environ.get(PROTOCOL_CACHE_MAX_SIZE_ENV) or 0),
+        os.environ.get(PROTOCOL_CACHE_USE_HASH_ENV, "").lower() in ("1", "true", "yes"),
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def _shared_protocol_cache(folder: str, max_size: int, use_hash: bool) -> ProtocolCache:
+    return ProtocolCache(folder, max_size=max_size, use_hash=use_hash)
+
+
+def get_protocol_cache() -> ProtocolCache | None:
+    """Shared (per process) cache configured by environment, or None if cache is not enabled. The instance is
+    memoised on the environment values so that its running size persists between parses."""
+    settings: tuple[str, int, bool] | None = environ_settings()
+    if settings is None:
+        return None
+    return _shared_protocol_cache(*settings)
+
+
+def cached_protocol(parse: Callable[..., interface.Protocol]) -> Callable[..., interface.Protocol]:
+    """Decorates a protocol parser's `parse` so that the protocol cache is consulted (if enabled)."""
+
+    @functools.wraps(parse)
+    def decorated(filename: Any, *, use_preface_name: bool = False, ignore_tags: set[str] | str = "teiHeader"):
+        cache: ProtocolCache | None = get_protocol_cache() if isinstance(filename, str) else None
+
+        if cache is None:
+            return parse(filename, use_preface_name=use_preface_name, ignore_tags=ignore_tags)
+
+        opts: dict = dict(
+            use_preface_name=use_preface_name,
+            ignore_tags=set(ignore_tags.split(",")) if isinstance(ignore_tags, str) else ignore_tags,
+        )
+
+        protocol: interface.Protocol | None = cache.get(filename, **opts)
+        if protocol is None:
+            protocol = parse(filename, **opts)
+            cache.put(filename, protocol, **opts)
+
+        return protocol
+
+    return decorated
@@ -1,19 +1,22 @@
 from __future__ import annotations
 
-from typing import Iterable, List, Tuple
+from functools import partial
+from typing import Iterable, List, Tuple, Type
 
 from pyriksprot.corpus import iterate
-from pyriksprot.interface import ContentType
-from pyriksprot.utility import deprecated
+from pyriksprot.interface import ContentType, IProtocolParser, Protocol
+from pyriksprot.utility import deprecated, strip_path_and_extension
 
+from .cache import get_protocol_cache
+from .iterparse import IterParseProtocolMapper
 from .parse import ProtocolMapper
 
 
-def multiprocessing_xml_load(args) -> Iterable[iterate.ProtocolSegment]:
+def multiprocessing_xml_load(args, parser: Type[IProtocolParser] = ProtocolMapper) -> Iterable[iterate.ProtocolSegment]:
     """Load protocol from XML. Aggregate text to `segment_level`. Return (name, who, id, text)."""
     return iterate.to_segments(
         content_type=ContentType.Text,
-        protocol=ProtocolMapper.parse(filename=args[0], use_preface_name=False),
+        protocol=parser.parse(filename=args[0], use_preface_name=False),
         segment_level=args[2],
         merge_strategy=args[4],
         segment_skip_size=args[3],
@@ -24,11 +27,13 @@ def multiprocessing_xml_load(args) -> Iterable[iterate.ProtocolSegment]:
 class XmlUntangleSegmentIterator(iterate.ProtocolSegmentIterator):
     """Iterate ParlaClarin XML files using `untangle` wrapper."""
 
+    parser: Type[IProtocolParser] = ProtocolMapper
+
     def load(self, filename: str) -> Iterable[iterate.ProtocolSegment]:
         """Load protocol from XML. Aggregate text to `segment_level`. Return sequence of segment.ProtocolSegment."""
         return iterate.to_segments(
             content_type=ContentType.Text,
-            protocol=ProtocolMapper.parse(filename=filename, use_preface_name=False),
+            protocol=self.parser.parse(filename=filename, use_preface_name=False),
             segment_level=self.segment_level,
             merge_strategy=self.merge_strategy,
             segment_skip_size=self.segment_skip_size,
@@ -36,7 +41,37 @@ class XmlUntangleSegmentIterator(iterate.ProtocolSegmentIterator):
         )
 
     def map_futures(self, imap, args: List[Tuple[str, str, int]]):
-        return imap(multiprocessing_xml_load, args)
+        return imap(partial(multiprocessing_xml_load, parser=self.parser), args)
+
+
+class XmlIterParseSegmentIterator(XmlUntangleSegmentIterator):
+    """Iterate ParlaClarin XML files using streaming `iterparse` parser (no intermediate element tree).
+    Utterance and paragraph segments are yielded as they are parsed when not multiprocessing
+    (and the parsed protocol cache is not enabled).
+    """
+
+    parser: Type[IProtocolParser] = IterParseProtocolMapper
+
+    def load(self, filename: str) -> Iterable[iterate.ProtocolSegment]:
+        if (
+            self.segment_level not in iterate.STREAMING_SEGMENT_FUNCTIONS
+            or self.which_year != "filename"
+            or get_protocol_cache() is not None
+        ):
+            return super().load(filename)
+
+        """Only name is needed to resolve year from filename"""
+        header: Protocol = Protocol(
+            date=None, name=strip_path_and_extension(filename), utterances=[], speaker_notes={}, page_references=[]
+        )
+        return iterate.iter_segments(
+            protocol_name=header.name,
+            year=header.get_year(which="filename"),
+            utterances=self.parser.iter_utterances(filename),
+            content_type=ContentType.Text,
+            segment_level=self.segment_level,
+            segment_skip_size=self.segment_skip_size,
+        )
 
 
 @deprecated
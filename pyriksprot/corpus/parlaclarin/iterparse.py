@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+import xml.etree.ElementTree as ET
+from os.path import basename, splitext
+from typing import IO, Iterator
+
+import pyarrow as pa
+from loguru import logger
+
+from pyriksprot import interface
+from pyriksprot.preprocess import dedent as dedent_text
+
+from .cache import cached_protocol, get_protocol_cache
+from .parse import ProtocolContentBuilder, normalize_preface_name
+
+XML_ID: str = '{http://www.w3.org/XML/1998/namespace}id'
+
+"""Path (of local names) to the element that holds the content sections"""
+BODY_PATH: tuple[str, ...] = ('TEI', 'text', 'body')
+"""Path (of local names) to the element that holds the preface (name & date)"""
+PREFACE_PATH: tuple[str, ...] = ('TEI', 'text', 'front', 'div')
+
+ContentItem = interface.Utterance | interface.SpeakerNote | interface.PageReference
+
+
+def local_name(tag: str) -> str:
+    """Strip namespace from element tag."""
+    return tag.rsplit('}', 1)[1] if tag[0] == '{' else tag
+
+
+def get_cdata(element: ET.Element) -> str:
+    """Character data owned by `element` (i.e. excluding text of child elements, same as untangle's `cdata`)."""
+    if len(element) == 0:
+        return element.text or ""
+    return (element.text or "") + "".join(child.tail or "" for child in element)
+
+
+class IterParseProtocolReader:
+    """Streams content of a ParlaClarin XML file using `xml.etree.ElementTree.iterparse`.
+
+    Utterances, speaker notes and page references are created directly from `end` events of
+    the content elements, and each element is cleared as soon as it has been mapped. Hence,
+    no complete element tree is ever built. Preface name and date are available once the
+    preface has been consumed (i.e. before the first content item is yielded).
+    """
+
+    def __init__(self, source: str | IO, ignore_tags: set[str] | str = "teiHeader", keep_utterances: bool = True):
+        self.source: str | IO = source
+        self.ignore_tags: set[str] = (
+            set(ignore_tags.split(",")) if isinstance(ignore_tags, str) else ignore_tags or set()
+        )
+        self.builder: ProtocolContentBuilder = ProtocolContentBuilder(keep_utterances=keep_utterances)
+        self.date: str | None = None
+        self.preface_name: str | None = None
+        self.has_body: bool = False
+
+        self._preface_count: int = 0
+        self._heads: list[str] = []
+        self._dates: list[str] = []
+
+    def __iter__(self) -> Iterator[ContentItem]:
+        path: list[str] = []
+        n_body: int = len(BODY_PATH)
+        ignore_tags: set[str] = self.ignore_tags
+
+        for event, element in ET.iterparse(self.source, events=('start', 'end')):
+            tag: str = local_name(element.tag)
+
+            if tag in ignore_tags:
+                """Ignored tags are transparent i.e. their children are treated as children of the parent"""
+                continue
+
+            if event == 'start':
+                path.append(tag)
+                if len(path) == n_body and tuple(path) == BODY_PATH:
+                    self.has_body = True
+                continue
+
+            depth: int = len(path)
+
+            if depth == n_body + 2 and tuple(path[:n_body]) == BODY_PATH:
+                item: ContentItem = self._map_content_element(tag, element)
+                element.clear()
+                if item is not None:
+                    yield item
+            elif depth == n_body + 1 and tuple(path[:n_body]) == BODY_PATH:
+                element.clear()
+            elif depth == len(PREFACE_PATH) + 1 and tuple(path[:-1]) == PREFACE_PATH:
+                if tag == 'head':
+                    self._heads.append(get_cdata(element))
+                elif tag == 'docDate':
+                    self._dates.append(element.get('when'))
+            elif depth == len(PREFACE_PATH) and tuple(path) == PREFACE_PATH:
+                self._preface_count += 1
+                self._resolve_preface()
+                element.clear()
+            elif depth == 2:
+                """Drop elements outside of `text` (e.g. header) as soon as they have been consumed"""
+                element.clear()
+
+            path.pop()
+
+        if not self.has_body:
+            logger.warning(f'no content (text.body) found in {self.preface_name or "unknown"}')
+
+    def _resolve_preface(self) -> None:
+        """Same semantics as ProtocolMapper.get_name/get_date: preface div & head must be unique"""
+        if self._preface_count != 1:
+            self.date, self.preface_name = None, None
+            return
+        self.date = self._dates[0] if self._dates else None
+        self.preface_name = normalize_preface_name(self._heads[0]) if len(self._heads) == 1 else None
+
+    def _map_content_element(self, tag: str, element: ET.Element) -> ContentItem | None:
+        if tag == 'pb':
+            return self.builder.add_page_break(n=element.get('n'), facs=element.get('facs'))
+
+        if tag == 'note':
+            if element.get('type') != "speaker":
+                return None
+            return self.builder.add_speaker_note(speaker_note_id=element.get(XML_ID), text=get_cdata(element))
+
+        if tag == 'u':
+            return self.builder.add_utterance(
+                u_id=element.get(XML_ID),
+                who=element.get('who'),
+                prev_id=element.get('prev'),
+                next_id=element.get('next'),
+                paragraphs=[dedent_text(get_cdata(seg)) for seg in element if local_name(seg.tag) == 'seg'],
+            )
+
+        return None
+
+
+class IterParseProtocolMapper(interface.IProtocolParser):
+    """Maps ParlaClarin XML to `Protocol` using a streaming (iterparse) reader.
+
+    Produces the same `Protocol` as `ProtocolMapper` without building an intermediate `untangle` tree.
+    """
+
+    @staticmethod
+    def iter_utterances(
+        filename: str | IO, *, ignore_tags: set[str] | str = "teiHeader"
+    ) -> Iterator[interface.Utterance]:
+        """Yield utterances in document order as they are parsed. Utterances are not retained by the reader."""
+        reader: IterParseProtocolReader = IterParseProtocolReader(
+            filename, ignore_tags=ignore_tags, keep_utterances=False
+        )
+        yield from (item for item in reader if isinstance(item, interface.Utterance))
+
+    @staticmethod
+    def parse_to_arrow(
+        filename: str | IO, *, use_preface_name: bool = False, ignore_tags: set[str] | str = "teiHeader"
+    ) -> pa.RecordBatch:
+        """Map XML to a record batch of flat utterance columns. Protocol name, date, speaker notes and page
+        references are stored as schema metadata (see `ProtocolBatchMetadata`). Utterances are streamed into the
+        columns i.e. no `Protocol` is created (unless cached)."""
+        if isinstance(filename, str) and get_protocol_cache() is not None:
+            protocol: interface.Protocol = IterParseProtocolMapper.parse(
+                filename, use_preface_name=use_preface_name, ignore_tags=ignore_tags
+            )
+            return interface.UtteranceHelper.to_record_batch(
+                protocol.utterances,
+                metadata=interface.ProtocolBatchMetadata.encode(
+                    name=protocol.name,
+                    date=protocol.date,
+                    preface_name=protocol.preface_name,
+                    speaker_notes=protocol.speaker_notes,
+                    page_references=protocol.page_references,
+                ),
+            )
+
+        reader: IterParseProtocolReader = IterParseProtocolReader(
+            filename, ignore_tags=ignore_tags, keep_utterances=False
+        )
+        batch: pa.RecordBatch = interface.UtteranceHelper.to_record_batch(
+            item for item in reader if isinstance(item, interface.Utterance)
+        )
+        source_name: str = filename if isinstance(filename, str) else "unknown"
+        return batch.replace_schema_metadata(
+            interface.ProtocolBatchMetadata.encode(
+                name=reader.preface_name if use_preface_name else splitext(basename(source_name))[0],
+                date=reader.date,
+                preface_name=reader.preface_name,
+                speaker_notes=reader.builder.speaker_notes,
+                page_references=reader.builder.page_references,
+            )
+        )
+
+    @staticmethod
+    @cached_protocol
+    def parse(
+        filename: str | IO, *, use_preface_name: bool = False, ignore_tags: set[str] | str = "teiHeader"
+    ) -> interface.Protocol:
+        """Map XML to domain entity. Return Protocol."""
+        protocol: interface.Protocol = None
+        source_name: str = filename if isinstance(filename, str) else "unknown"
+        try:
+            reader: IterParseProtocolReader = IterParseProtocolReader(filename, ignore_tags=ignore_tags)
+
+            for _ in reader:
+                pass
+
+            parsed_data: dict = reader.builder.to_dict()
+
+            if len(parsed_data.get("utterances") or []) == 0:
+                logger.warning(f'no utterances found in {source_name}')
+
+            protocol_name: str | None = reader.preface_name if use_preface_name else splitext(basename(source_name))[0]
+
+            protocol = interface.Protocol(
+                utterances=parsed_data.get("utterances"),
+                speaker_notes=parsed_data.get("speaker_notes"),
+                page_references=parsed_data.get("page_references"),
+                date=reader.date,
+                name=protocol_name,
+                preface_name=reader.preface_name,
+            )
+        except Exception as ex:
+            logger.error(f"error parsing {source_name}: {ex}")
+            raise ex
+
+        return protocol
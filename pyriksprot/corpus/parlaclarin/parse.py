@@ -2,14 +2,17 @@ from __future__ import annotations
 
 import re
 from os.path import basename, splitext
-from typing import Any, Iterable
+from typing import Any, Iterable, Iterator
 
+import pyarrow as pa
 from loguru import logger
 
 from pyriksprot import interface
 from pyriksprot.foss import untangle
 from pyriksprot.preprocess import dedent as dedent_text
 
+from .cache import cached_protocol
+
 XML_ID: str = '{http://www.w3.org/XML/1998/namespace}id'
 
 # pylint: disable=too-many-statements
@@ -22,6 +25,124 @@ def zero_fill_filename_sequence(name: str) -> str:
     return '-'.join(parts)
 
 
+def normalize_preface_name(name: str) -> str:
+    """Bug fix: Replace underscores with dashes and lowercase"""
+    if name.startswith("prot_"):
+        name = name.replace("_", "-").lower()
+    return zero_fill_filename_sequence(name)
+
+
+def decode_page_reference(
+    page_ref: interface.PageReference, *, n: str | None, facs: str | None
+) -> interface.PageReference:
+    """Decode page reference from `pb` attributes `n` and `facs`, given previous page reference."""
+    page_number: int = page_ref.page_number + 1
+    source_id: int = page_ref.source_id
+    if n and n.isdigit():
+        page_number = int(n)
+
+    reference: str = facs or ""
+    if not reference:
+        if (n or "").startswith("http"):
+            reference = n
+
+    if 'kb.se' in reference:
+        page_number: int = int(re.search(r'-(\d+)\.jp2', reference).group(1))
+        source_id: int = 1
+        reference: str = ""
+    elif 'riksdagen.se' in reference:
+        page_number: int = int(re.search(r'#page=(\d+)', reference).group(1))
+        source_id: int = 2
+        reference: str = reference.split("/")[-1].split("#")[0]
+
+    return interface.PageReference(source_id=source_id, page_number=page_number, reference=reference)
+
+
+class ProtocolContentBuilder:
+    """Maps protocol content (page breaks, speaker notes and utterances) visited in document order to entities.
+
+    Keeps track of current page and current speaker note so that any parser backend that visits
+    the content elements in document order produces the same utterances, speaker notes and page references.
+    """
+
+    def __init__(self, keep_utterances: bool = True):
+        """Setup builder.
+
+        Args:
+            keep_utterances (bool, optional): Collect created utterances (disable when streaming). Defaults to True.
+        """
+        self.keep_utterances: bool = keep_utterances
+        self.utterances: list[interface.Utterance] = []
+        self.speaker_notes: dict[str, interface.SpeakerNote] = {}
+        self.page_references: list[interface.PageReference] = []
+        self.page_reference: interface.PageReference = interface.PageReference(
+            source_id=0, page_number=-1, reference=""
+        )
+        self.page_number: int = 1
+
+        """Current Speaker Note"""
+        self.speaker_note: interface.SpeakerNote = None
+        self.previous: interface.Utterance = None
+
+    def add_page_break(self, *, n: str | None, facs: str | None) -> interface.PageReference:
+        self.page_number += 1
+        self.page_reference = decode_page_reference(self.page_reference, n=n, facs=facs)
+        self.page_references.append(self.page_reference)
+        return self.page_reference
+
+    def add_speaker_note(self, *, speaker_note_id: str, text: str) -> interface.SpeakerNote:
+        self.speaker_note = interface.SpeakerNote(speaker_note_id, " ".join(text.split()))
+        self.speaker_notes[speaker_note_id] = self.speaker_note
+        self.previous = None
+        return self.speaker_note
+
+    def add_utterance(
+        self, *, u_id: str, who: str | None, prev_id: str | None, next_id: str | None, paragraphs: list[str]
+    ) -> interface.Utterance:
+        if len(self.page_references) == 0:
+            self.page_references = [self.page_reference]
+
+        utterance: interface.Utterance = interface.Utterance(
+            u_id=u_id,
+            who=who or "unknown",
+            page_number=self.page_number,
+            prev_id=prev_id,
+            next_id=next_id,
+            paragraphs=paragraphs,
+        )
+
+        if self.previous:
+            """We have seen at least one utterance since last speaker intro"""
+
+            """If other speaker then invalidate speaker intro"""
+            if self.previous.who != utterance.who:
+                self.speaker_note = None
+
+            """If prev doesn't link to previous then invalidate speaker intro"""
+            if utterance.prev_id != self.previous.u_id:
+                self.speaker_note = None
+
+        utterance.speaker_note_id = (
+            self.speaker_note.speaker_note_id if self.speaker_note is not None else interface.MISSING_SPEAKER_NOTE_ID
+        )
+
+        if self.keep_utterances:
+            self.utterances.append(utterance)
+
+        self.previous = utterance
+
+        return utterance
+
+    def to_dict(
+        self,
+    ) -> dict[str, list[interface.Utterance] | dict[str, interface.SpeakerNote] | list[interface.PageReference]]:
+        return {
+            'utterances': self.utterances,
+            'speaker_notes': self.speaker_notes,
+            'page_references': self.page_references,
+        }
+
+
 class ProtocolMapper(interface.IProtocolParser):
     @staticmethod
     def get_date(data: untangle.Element) -> str | None:
@@ -35,11 +156,7 @@ class ProtocolMapper(interface.IProtocolParser):
     def get_name(data: untangle.Element) -> str | None:
         """Protocol name"""
         try:
-            name: str = data.TEI.text.front.div.head.cdata  # type: ignore
-            """Bug fix: Replace underscores with dashes and lowercase"""
-            if name.startswith("prot_"):
-                name = name.replace("_", "-").lower()
-            return zero_fill_filename_sequence(name)  # type: ignore
+            return normalize_preface_name(data.TEI.text.front.div.head.cdata)  # type: ignore
         except (AttributeError, KeyError):
             return None
 
@@ -67,96 +184,27 @@ class ProtocolMapper(interface.IProtocolParser):
     def get_data(
         data: untangle.Element,
     ) -> dict[str, list[interface.Utterance] | dict[str, interface.SpeakerNote] | list[interface.PageReference]]:
-        """All utterances in sequence"""
-        utterances: list[interface.Utterance] = []
-        """All speaker notes"""
-        speaker_notes: dict[str, interface.SpeakerNote] = {}
-
-        page_refs: list[interface.PageReference] = []
-        page_ref: interface.PageReference = interface.PageReference(source_id=0, page_number=-1, reference="")
-        page_number: int = 1
-
-        """Current Speaker Note"""
-        speaker_note: interface.SpeakerNote = None
-        first: interface.Utterance = None
-        previous: interface.Utterance = None
+        builder: ProtocolContentBuilder = ProtocolContentBuilder()
 
         for element in ProtocolMapper.get_content_elements(data):
             if element.name == 'pb':
-                page_number += 1
-                page_ref = ProtocolMapper.decode_page_reference(page_ref, element)
-                page_refs.append(page_ref)
+                builder.add_page_break(n=element.get_attribute('n'), facs=element.get_attribute('facs'))
             elif element.name == "note" and element['type'] == "speaker":
-                speaker_note = interface.SpeakerNote(element["xml:id"], " ".join(element.cdata.split()))
-                speaker_notes[element["xml:id"]] = speaker_note
-                first = None
-                previous = None
-
+                builder.add_speaker_note(speaker_note_id=element["xml:id"], text=element.cdata)
             elif element.name == 'u':
-                if len(page_refs) == 0:
-                    page_refs = [page_ref]
-
-                utterance: interface.Utterance = interface.Utterance(
+                builder.add_utterance(
                     u_id=element.get_attribute('xml:id'),
-                    who=element.get_attribute('who') or "unknown",
-                    page_number=page_number,  # page_ref.page_number,
+                    who=element.get_attribute('who'),
                     prev_id=element.get_attribute('prev'),
                     next_id=element.get_attribute('next'),
                     paragraphs=ProtocolMapper.to_paragraphs(element, dedent=True),
                 )
 
-                if first is None:
-                    first = utterance
-
-                if previous:
-                    """We have seen at least one utterance since last speaker intro"""
-
-                    """If other speaker then invalidate speaker intro"""
-                    if previous.who != utterance.who:
-                        speaker_note = None
-
-                    """If prev doesn't link to previous then invalidate speaker intro"""
-                    if utterance.prev_id != previous.u_id:
-                        speaker_note = None
-
-                utterance.speaker_note_id = (
-                    speaker_note.speaker_note_id if speaker_note is not None else interface.MISSING_SPEAKER_NOTE_ID
-                )
-
-                utterances.append(utterance)
-
-                previous = utterance
-
-        return {
-            'utterances': utterances,
-            'speaker_notes': speaker_notes,
-            'page_references': page_refs,
-        }
+        return builder.to_dict()
 
     @staticmethod
     def decode_page_reference(page_ref, element) -> interface.PageReference:
-        page_number: int = page_ref.page_number + 1
-        source_id: int = page_ref.source_id
-        n_attribute: str | None = element.get_attribute('n')
-        if n_attribute and n_attribute.isdigit():
-            page_number = int(n_attribute)
-
-        reference: str = element.get_attribute('facs') or ""
-        if not reference:
-            if (n_attribute or "").startswith("http"):
-                reference = n_attribute
-
-        if 'kb.se' in reference:
-            page_number: int = int(re.search(r'-(\d+)\.jp2', reference).group(1))
-            source_id: int = 1
-            reference: str = ""
-        elif 'riksdagen.se' in reference:
-            page_number: int = int(re.search(r'#page=(\d+)', reference).group(1))
-            source_id: int = 2
-            reference: str = reference.split("/")[-1].split("#")[0]
-
-        page_ref = interface.PageReference(source_id=source_id, page_number=page_number, reference=reference)
-        return page_ref
+        return decode_page_reference(page_ref, n=element.get_attribute('n'), facs=element.get_attribute('facs'))
 
     @staticmethod
     def to_paragraphs(element: untangle.Element, dedent: bool = True) -> list[str]:
@@ -166,6 +214,31 @@ class ProtocolMapper(interface.IProtocolParser):
         return list(texts)
 
     @staticmethod
+    def iter_utterances(filename: str, *, ignore_tags: set[str] | str = "teiHeader") -> Iterator[interface.Utterance]:
+        """Yield utterances in document order as they are parsed.
+
+        An `untangle` tree can only be created for the entire document, hence the streaming
+        (iterparse) reader is used so that memory is bounded by a single utterance.
+        """
+        from .iterparse import IterParseProtocolMapper  # pylint: disable=import-outside-toplevel
+
+        yield from IterParseProtocolMapper.iter_utterances(filename, ignore_tags=ignore_tags)
+
+    @staticmethod
+    def parse_to_arrow(
+        filename: str, *, use_preface_name: bool = False, ignore_tags: set[str] | str = "teiHeader"
+    ) -> pa.RecordBatch:
+        """Map XML to a record batch of flat utterance columns (see `UtteranceHelper.ARROW_COLUMNS`).
+        Protocol name and date are stored as schema metadata. Delegates to the streaming (iterparse) reader.
+        """
+        from .iterparse import IterParseProtocolMapper  # pylint: disable=import-outside-toplevel
+
+        return IterParseProtocolMapper.parse_to_arrow(
+            filename, use_preface_name=use_preface_name, ignore_tags=ignore_tags
+        )
+
+    @staticmethod
+    @cached_protocol
     def parse(
         filename: str, *, use_preface_name: bool = False, ignore_tags: set[str] | str = "teiHeader"
     ) -> interface.Protocol:
@@ -0,0 +1,11 @@
+# type: ignore
+
+from .iterate import ParquetSegmentIterator
+from .persist import (
+    list_protocols,
+    list_years,
+    load_protocol_index,
+    load_protocols,
+    open_dataset,
+    store_corpus,
+)
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from functools import partial
+from typing import Iterable
+
+import pandas as pd
+import pyarrow as pa
+
+from pyriksprot import to_speech as mu
+from pyriksprot.interface import SegmentLevel
+from pyriksprot.utility import strip_path_and_extension
+
+from .. import iterate
+from . import persist
+
+"""Merge strategies that can be segmented (vectorised) for all protocols in a year at once"""
+VECTORISED_MERGE_STRATEGIES: set[str] = {x.value for x in mu.MergeStrategyType} - {mu.MergeStrategyType.undefined}
+
+
+def to_speech_mergers(utterances: pa.Table, merge_strategy: str) -> dict[str, mu.IMergeStrategy]:
+    """Segment speeches of all protocols in `utterances` in a single vectorised pass. Return merge strategy (with
+    precomputed speech indices) for each protocol."""
+    if utterances.num_rows == 0:
+        return {}
+    indices: pd.Series = pd.Series(
+        mu.to_speech_indices(
+            utterances.select(['protocol_name', 'who', 'speaker_note_id', 'prev_id', 'next_id']).rename_columns(
+                ['document_id', 'who', 'speaker_note_id', 'prev_id', 'next_id']
+            ),
+            merge_strategy,
+        )
+    )
+    return {
+        name: mu.MergeBySpeechIndex(group.to_numpy())
+        for name, group in indices.groupby(utterances.column('protocol_name').to_numpy(), sort=False)
+    }
+
+
+def load_protocols(
+    source_folder: str, protocol_names: list[str], segment_level: SegmentLevel, merge_strategy: str | mu.IMergeStrategy
+) -> Iterable[tuple[iterate.Protocol, str | mu.IMergeStrategy]]:
+    """Load protocols (one year at a time). Yield each protocol and merge strategy to use for the protocol."""
+    if isinstance(merge_strategy, mu.MergeByStoredSpeechIndex):
+        """Speeches are segmented from current Parquet utterances, hence a stored speech index is not needed"""
+        merge_strategy = merge_strategy.merge_strategy
+    vectorise: bool = segment_level == SegmentLevel.Speech and merge_strategy in VECTORISED_MERGE_STRATEGIES
+    for protocols, utterances in persist.load_tables(source_folder, protocol_names=protocol_names):
+        mergers: dict[str, mu.IMergeStrategy] = to_speech_mergers(utterances, merge_strategy) if vectorise else {}
+        for protocol in persist.to_protocols(protocols, utterances):
+            yield protocol, mergers.get(protocol.name, merge_strategy)
+
+
+def multiprocessing_load(args, source_folder: str) -> Iterable[iterate.ProtocolSegment]:
+    """Load and segment all protocols in `args[0]` (names of protocols in the same year) in one pass."""
+    return [
+        segment
+        for protocol, merge_strategy in load_protocols(source_folder, list(args[0]), args[2], args[4])
+        for segment in iterate.to_segments(
+            protocol=protocol,
+            content_type=args[1],
+            segment_level=args[2],
+            segment_skip_size=args[3],
+            merge_strategy=merge_strategy,
+            which_year=args[5],
+        )
+    ]
+
+
+class ParquetSegmentIterator(iterate.ProtocolSegmentIterator):
+    """Reads protocols from a Parquet utterance store (see `persist.store_corpus`) and returns a stream of
+    `ProtocolSegment`. Only partitions (years) of protocols in `filenames` (names or paths) are read.
+    Speeches are segmented for all protocols in a partition at once."""
+
+    def __init__(self, *, source_folder: str, filenames: list[str] = None, filesizes: dict[str, int] = None, **kwargs):
+        super().__init__(
+            filenames=strip_path_and_extension(filenames) if filenames else persist.list_protocols(source_folder),
+            filesizes={strip_path_and_extension(k): v for k, v in (filesizes or {}).items()},
+            **kwargs,
+        )
+        self.source_folder: str = source_folder
+
+    def create_iterator(self) -> Iterable[iterate.ProtocolSegment]:
+        if self.multiproc_processes > 1:
+            yield from super().create_iterator()
+            return
+
+        for protocol, merge_strategy in self.load_protocols(self.filenames):
+            for item in self.to_segments(protocol, merge_strategy):
+                if self.preprocess:
+                    self.preprocess(item)
+                yield item
+
+    def load_protocols(self, protocol_names: list[str]) -> Iterable[tuple[iterate.Protocol, str | mu.IMergeStrategy]]:
+        return load_protocols(self.source_folder, protocol_names, self.segment_level, self.merge_strategy)
+
+    def to_segments(
+        self, protocol: iterate.Protocol, merge_strategy: str | mu.IMergeStrategy = None
+    ) -> Iterable[iterate.ProtocolSegment]:
+        return iterate.to_segments(
+            protocol=protocol,
+            content_type=self.content_type,
+            segment_level=self.segment_level,
+            segment_skip_size=self.segment_skip_size,
+            merge_strategy=merge_strategy or self.merge_strategy,
+            which_year=self.which_year,
+        )
+
+    def load(self, filename: str) -> Iterable[iterate.ProtocolSegment]:
+        return [
+            segment
+            for protocol, merge_strategy in self.load_protocols([filename])
+            for segment in self.to_segments(protocol, merge_strategy)
+        ]
+
+    def create_args(self) -> list[tuple]:
+        """One task per year (partition) holding names of all protocols in that year, so that each partition is
+        read, and segmented, once."""
+        years: dict[int, list[str]] = {}
+        for name in self.filenames:
+            years.setdefault(persist.get_year(name), []).append(name)
+        return [
+            (
+                tuple(names),
+                self.content_type,
+                self.segment_level,
+                self.segment_skip_size,
+                self.merge_strategy,
+                self.which_year,
+            )
+            for _, names in sorted(years.items())
+        ]
+
+    def get_task_sizes(self, args: list[tuple]) -> list[int]:
+        """Total size of protocols in each task (number of protocols if sizes are unknown)."""
+        return [sum(self.filesizes.get(name, 1) for name in names) for names, *_ in args]
+
+    def map_futures(self, imap, args):
+        """Tasks are already grouped by year, hence chunk size is one."""
+        return imap(partial(multiprocessing_load, source_folder=self.source_folder), args, chunksize=1)
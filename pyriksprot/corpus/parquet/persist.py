@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import contextlib
+import os
+from functools import partial
+from multiprocessing import get_context
+from typing import Iterable, Type
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from loguru import logger
+from tqdm import tqdm
+
+from pyriksprot import interface
+from pyriksprot.utility import strip_path_and_extension
+
+from ..parlaclarin.iterparse import IterParseProtocolMapper
+from ..utility import get_chamber_by_filename, load_chamber_indexes, ls_corpus_folder
+
+jj = os.path.join
+
+"""Store layout: protocol index (one row per protocol) and utterance dataset (one row per utterance)"""
+PROTOCOLS_FILENAME: str = "protocols.parquet"
+UTTERANCES_FOLDER: str = "utterances"
+
+"""Protocol level columns (repeated for each utterance)"""
+PROTOCOL_SCHEMA: pa.Schema = pa.schema(
+    [('protocol_name', pa.string()), ('date', pa.string()), ('preface_name', pa.string())]
+)
+"""Hive style partitioning of utterances: `utterances/year=<year>/chamber_abbrev=<chamber>/part-0.parquet`"""
+PARTITION_SCHEMA: pa.Schema = pa.schema([('year', pa.int32()), ('chamber_abbrev', pa.string())])
+
+UTTERANCE_SCHEMA: pa.Schema = pa.schema(
+    [
+        *PROTOCOL_SCHEMA,
+        *[(name, dtype) for name, (dtype, _) in interface.UtteranceHelper.ARROW_COLUMNS.items()],
+        *PARTITION_SCHEMA,
+    ]
+)
+PROTOCOL_INDEX_SCHEMA: pa.Schema = pa.schema([*PROTOCOL_SCHEMA, *PARTITION_SCHEMA])
+
+
+def get_year(protocol_name: str) -> int:
+    """Year as given by protocol's filename"""
+    return interface.Protocol(
+        date=None, name=protocol_name, utterances=[], speaker_notes={}, page_references=[]
+    ).get_year(which="filename")
+
+
+def load_record_batch(
+    filename: str, parser: Type[interface.IProtocolParser], protocol_to_chamber: dict[str, str]
+) -> tuple[dict[str, str | int], pa.RecordBatch]:
+    """Parse protocol. Return protocol record and utterances as a record batch with protocol and partition
+    columns added."""
+    batch: pa.RecordBatch = parser.parse_to_arrow(filename, ignore_tags={"teiHeader"})
+    metadata: dict[bytes, bytes] = batch.schema.metadata or {}
+    name: str = strip_path_and_extension(filename)
+    chamber_abbrev: str = protocol_to_chamber.get(os.path.basename(filename)) or get_chamber_by_filename(filename)
+    values: dict[str, str | int] = {
+        'protocol_name': name,
+        'date': metadata.get(b'date', b'').decode('utf-8'),
+        'preface_name': metadata.get(b'preface_name', b'').decode('utf-8'),
+        'year': get_year(name),
+        'chamber_abbrev': chamber_abbrev,
+    }
+    return values, pa.RecordBatch.from_arrays(
+        [
+            (
+                batch.column(field.name)
+                if field.name in batch.schema.names
+                else pa.repeat(values[field.name], batch.num_rows).cast(field.type)
+            )
+            for field in UTTERANCE_SCHEMA
+        ],
+        schema=UTTERANCE_SCHEMA,
+    )
+
+
+def store_corpus(
+    source_folder: str,
+    target_folder: str,
+    *,
+    parser: Type[interface.IProtocolParser] = IterParseProtocolMapper,
+    processes: int = 1,
+    compression: str = "zstd",
+) -> None:
+    """Convert ParlaClarin XML corpus in `source_folder` to a Parquet store in `target_folder`. Utterances are
+    stored in a dataset partitioned by year and chamber. Protocols are processed one year at a time."""
+    filenames: list[str] = sorted(ls_corpus_folder(source_folder))
+    chambers: dict[str, set[str]] = load_chamber_indexes(source_folder)
+    protocol_to_chamber: dict[str, str] = {v: k for k, p in chambers.items() for v in p}
+
+    years: dict[int, list[str]] = {}
+    for filename in filenames:
+        years.setdefault(get_year(strip_path_and_extension(filename)), []).append(filename)
+
+    load_batch = partial(load_record_batch, parser=parser, protocol_to_chamber=protocol_to_chamber)
+    file_options: ds.FileWriteOptions = ds.ParquetFileFormat().make_write_options(compression=compression)
+
+    logger.info(f"Parquet store: converting {len(filenames)} protocols in {source_folder} to {target_folder}")
+
+    records: list[dict[str, str | int]] = []
+    with contextlib.ExitStack() as stack:
+        imap = stack.enter_context(get_context("spawn").Pool(processes=processes)).imap if processes > 1 else map
+        for year in tqdm(sorted(years)):
+            batches: list[pa.RecordBatch] = []
+            for record, batch in imap(load_batch, years[year]):
+                records.append(record)
+                batches.append(batch)
+            ds.write_dataset(
+                pa.Table.from_batches(batches, schema=UTTERANCE_SCHEMA),
+                jj(target_folder, UTTERANCES_FOLDER),
+                format="parquet",
+                partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+                basename_template="part-{i}.parquet",
+                existing_data_behavior="delete_matching",
+                file_options=file_options,
+            )
+
+    pq.write_table(
+        pa.Table.from_pylist(records, schema=PROTOCOL_INDEX_SCHEMA),
+        jj(target_folder, PROTOCOLS_FILENAME),
+        compression=compression,
+    )
+
+    logger.info("Parquet store: done.")
+
+
+def open_dataset(source_folder: str) -> ds.Dataset:
+    """Utterance dataset in store."""
+    return ds.dataset(
+        jj(source_folder, UTTERANCES_FOLDER),
+        format="parquet",
+        partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+    )
+
+
+def load_protocol_index(source_folder: str) -> pa.Table:
+    """Protocols in store (including protocols without utterances)."""
+    return pq.read_table(jj(source_folder, PROTOCOLS_FILENAME), schema=PROTOCOL_INDEX_SCHEMA)
+
+
+def list_years(source_folder: str) -> list[int]:
+    """Years (partitions) in store."""
+    return sorted(pc.unique(load_protocol_index(source_folder).column('year')).to_pylist())
+
+
+def list_protocols(source_folder: str) -> list[str]:
+    """Names of all protocols in store."""
+    return sorted(load_protocol_index(source_folder).column('protocol_name').to_pylist())
+
+
+def to_protocols(protocols: pa.Table, utterances: pa.Table) -> Iterable[interface.Protocol]:
+    """Create protocols from protocol and utterance rows. Return protocols in name order."""
+    groups: dict[str, list[dict]] = {}
+    for row in utterances.to_pylist():
+        groups.setdefault(row['protocol_name'], []).append(row)
+
+    for record in sorted(protocols.to_pylist(), key=lambda r: r['protocol_name']):
+        yield interface.Protocol(
+            date=record['date'],
+            name=record['protocol_name'],
+            preface_name=record['preface_name'],
+            utterances=[interface.Utterance(**row) for row in groups.get(record['protocol_name'], [])],
+            speaker_notes={},
+            page_references=[],
+        )
+
+
+def load_tables(source_folder: str, protocol_names: Iterable[str] = None) -> Iterable[tuple[pa.Table, pa.Table]]:
+    """Load protocol and utterance rows from store in `source_folder`, one year (partition) at a time.
+    If `protocol_names` is given, then only these protocols (and years) are read."""
+    dataset: ds.Dataset = open_dataset(source_folder)
+    index: pa.Table = load_protocol_index(source_folder)
+
+    if protocol_names is not None:
+        index = index.filter(pc.is_in(index.column('protocol_name'), pa.array(set(protocol_names), pa.string())))
+
+    for year in sorted(pc.unique(index.column('year')).to_pylist()):
+        protocols: pa.Table = index.filter(pc.equal(index.column('year'), year))
+        expression: ds.Expression = ds.field('year') == year
+        if protocol_names is not None:
+            expression &= ds.field('protocol_name').isin(protocols.column('protocol_name'))
+        yield protocols, dataset.to_table(filter=expression)
+
+
+def load_protocols(source_folder: str, protocol_names: Iterable[str] = None) -> Iterable[interface.Protocol]:
+    """Load protocols from store in `source_folder`, one year (partition) at a time.
+    If `protocol_names` is given, then only these protocols (and years) are read."""
+    for protocols, utterances in load_tables(source_folder, protocol_names):
+        yield from to_protocols(protocols, utterances)
@@ -1,4 +1,15 @@
 # type: ignore
 
-from .iterate import ProtocolIterator
-from .persist import FileIsEmptyError, glob_protocols, load_metadata, load_protocol, load_protocols, store_protocol
+from .container import PackedCorpus, pack_corpus, unpack_corpus
+from .iterate import METADATA_SEGMENT_LEVELS, ProtocolIterator
+from .persist import (
+    FileIsEmptyError,
+    glob_protocols,
+    load_metadata,
+    load_protocol,
+    load_protocols,
+    load_tagged_frame,
+    load_token_table,
+    load_utterance_index,
+    store_protocol,
+)
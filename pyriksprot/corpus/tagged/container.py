@@ -0,0 +1,205 @@
+from __future__ import annotations
+
+import fnmatch
+import glob
+import io
+import json
+import mmap
+import os
+import struct
+import zipfile
+from functools import lru_cache
+from typing import Any, Optional
+
+from loguru import logger
+from tqdm import tqdm
+
+from pyriksprot.utility import strip_path_and_extension
+
+"""
+Packed container of a tagged corpus i.e. all protocol archives (ZIP files) stored in a single file:
+
+    MAGIC | archive | archive | ... | index (JSON) | index offset, index size, MAGIC
+
+The index holds, for each archive, its path (relative to the packed corpus folder), protocol name, offset, size and
+stored metadata (i.e. `metadata.json`). Archives in a container are addressed by virtual paths
+`<container>/<relative path>` e.g. `tagged_frames.pack/1955/prot-1955--ak--022.zip`, hence can be used wherever a
+path to a tagged protocol is expected.
+"""
+
+CONTAINER_EXTENSION: str = '.pack'
+MAGIC: bytes = b'RPPACK01'
+FOOTER: struct.Struct = struct.Struct(f'<QQ{len(MAGIC)}s')
+METADATA_FILENAME: str = 'metadata.json'
+
+
+class PackedCorpus:
+    """Read-only access to a packed container. Archives are read by protocol name or relative path, using a
+    memory-mapped view of the container (or positional reads if `use_mmap` is False). Reads are thread safe."""
+
+    def __init__(self, filename: str, use_mmap: bool = True):
+        self.filename: str = filename
+        self.fd: int = os.open(filename, os.O_RDONLY)
+        self.buffer: mmap.mmap | None = mmap.mmap(self.fd, 0, access=mmap.ACCESS_READ) if use_mmap else None
+
+        index_offset, index_size, magic = FOOTER.unpack(
+            self.read_range(os.fstat(self.fd).st_size - FOOTER.size, FOOTER.size)
+        )
+        if magic != MAGIC or self.read_range(0, len(MAGIC)) != MAGIC:
+            self.close()
+            raise ValueError(f"{filename} is not a packed corpus")
+
+        self.items: list[dict[str, Any]] = json.loads(self.read_range(index_offset, index_size).decode('utf-8'))
+        self.paths: dict[str, dict[str, Any]] = {x['path']: x for x in self.items}
+        self.names: dict[str, dict[str, Any]] = {x['name']: x for x in self.items}
+
+    def __enter__(self) -> PackedCorpus:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.paths or key in self.names
+
+    def close(self) -> None:
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def read_range(self, offset: int, size: int) -> bytes:
+        if self.buffer is not None:
+            return self.buffer[offset : offset + size]
+        return os.pread(self.fd, size, offset)
+
+    def item(self, key: str) -> dict[str, Any] | None:
+        """Index entry of archive with relative path or protocol name `key`."""
+        return self.paths.get(key) or self.names.get(key)
+
+    def read(self, key: str) -> bytes:
+        """Archive with relative path or protocol name `key`. Raises KeyError if not found."""
+        item: dict[str, Any] | None = self.item(key)
+        if item is None:
+            raise KeyError(key)
+        return self.read_range(item['offset'], item['size'])
+
+    def metadata(self, key: str) -> dict | None:
+        """Stored metadata of archive (None if archive is empty or has no metadata)."""
+        item: dict[str, Any] | None = self.item(key)
+        return None if item is None else item['metadata']
+
+    def open(self, key: str) -> zipfile.ZipFile:
+        """Open archive as a ZIP file (read from memory)."""
+        return zipfile.ZipFile(io.BytesIO(self.read(key)), 'r')
+
+    def glob(self, pattern: str = None) -> list[str]:
+        """Virtual paths of archives whose relative path matches (glob-style) `pattern`."""
+        paths: list[str] = [x['path'] for x in self.items]
+        if pattern:
+            patterns: set[str] = {pattern, pattern.removeprefix('**/')}
+            paths = [p for p in paths if any(fnmatch.fnmatch(p, x) for x in patterns)]
+        return [f"{self.filename}/{p}" for p in paths]
+
+
+def is_container(filename: str) -> bool:
+    return isinstance(filename, str) and filename.endswith(CONTAINER_EXTENSION) and os.path.isfile(filename)
+
+
+def split_path(path: str) -> Optional[tuple[str, str]]:
+    """Split virtual path into container filename and relative path. Return None if not in a container."""
+    head, separator, tail = path.partition(f"{CONTAINER_EXTENSION}/")
+    if not separator or not tail:
+        return None
+    return f"{head}{CONTAINER_EXTENSION}", tail
+
+
+@lru_cache(maxsize=8)
+def _open_container(filename: str, mtime_ns: int) -> PackedCorpus:  # pylint: disable=unused-argument
+    return PackedCorpus(filename)
+
+
+def open_container(filename: str) -> PackedCorpus:
+    """Shared (per process) open container. Container is reopened if it has been modified."""
+    return _open_container(filename, os.stat(filename).st_mtime_ns)
+
+
+def resolve(path: str) -> Optional[tuple[PackedCorpus, str]]:
+    """Open container and relative path of virtual `path`. Return None if `path` is not in an existing container."""
+    parts: tuple[str, str] | None = split_path(path)
+    if parts is None or not is_container(parts[0]):
+        return None
+    return open_container(parts[0]), parts[1]
+
+
+def getsize(path: str) -> Optional[int]:
+    """Size of archive `path` (in a container or on disk). Return None if not found."""
+    member: tuple[PackedCorpus, str] | None = resolve(path)
+    if member is not None:
+        item: dict[str, Any] | None = member[0].item(member[1])
+        return None if item is None else item['size']
+    return os.path.getsize(path) if os.path.isfile(path) else None
+
+
+def read_stored_metadata(data: bytes) -> dict | None:
+    """Read `metadata.json` of archive `data` (as is). Return None if archive is empty, invalid or has no metadata."""
+    try:
+        with zipfile.ZipFile(io.BytesIO(data), 'r') as fp:
+            if METADATA_FILENAME not in fp.namelist():
+                return None
+            return json.loads(fp.read(METADATA_FILENAME).decode('utf-8'))
+    except zipfile.BadZipFile:
+        return None
+
+
+def pack_corpus(source_folder: str, target_filename: str, pattern: str = '**/prot-*.zip') -> int:
+    """Pack all archives in `source_folder` matching `pattern` into container `target_filename`. Archives are
+    stored as is (empty files included). Return number of packed archives."""
+    if not target_filename.endswith(CONTAINER_EXTENSION):
+        raise ValueError(f"container filename must end with {CONTAINER_EXTENSION}")
+
+    filenames: list[str] = sorted(glob.glob(os.path.join(source_folder, pattern), recursive=True))
+    items: list[dict[str, Any]] = []
+
+    os.makedirs(os.path.dirname(os.path.abspath(target_filename)), exist_ok=True)
+    temp_filename: str = f"{target_filename}.tmp"
+    with open(temp_filename, 'wb') as fp:
+        fp.write(MAGIC)
+        for filename in tqdm(filenames, miniters=100, desc="pack"):
+            with open(filename, 'rb') as source:
+                data: bytes = source.read()
+            items.append(
+                {
+                    'path': os.path.relpath(filename, source_folder).replace(os.sep, '/'),
+                    'name': strip_path_and_extension(filename),
+                    'offset': fp.tell(),
+                    'size': len(data),
+                    'metadata': read_stored_metadata(data) if data else None,
+                }
+            )
+            fp.write(data)
+        index: bytes = json.dumps(items).encode('utf-8')
+        index_offset: int = fp.tell()
+        fp.write(index)
+        fp.write(FOOTER.pack(index_offset, len(index), MAGIC))
+    os.replace(temp_filename, target_filename)
+
+    logger.info(f"packed {len(items)} archives from {source_folder} into {target_filename}")
+    return len(items)
+
+
+def unpack_corpus(source_filename: str, target_folder: str) -> int:
+    """Unpack archives in container `source_filename` into `target_folder` (original layout). Return number of
+    unpacked archives."""
+    with PackedCorpus(source_filename, use_mmap=False) as container:
+        for item in container.items:
+            filename: str = os.path.join(target_folder, item['path'])
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            with open(filename, 'wb') as fp:
+                fp.write(container.read(item['path']))
+        return len(container)
@@ -1,50 +1,87 @@
 from __future__ import annotations
 
+from functools import partial
 from typing import Iterable, List, Tuple
 
 import pandas as pd
 
+from ...interface import ContentType, SegmentLevel
 from .. import iterate
 from . import persist
 
+"""Segment levels that can be created from stored utterance metadata (i.e. without loading content)"""
+METADATA_SEGMENT_LEVELS: tuple[SegmentLevel, ...] = (SegmentLevel.Speech, SegmentLevel.Who)
 
-def multiprocessing_load(args) -> Iterable[iterate.ProtocolSegment]:
-    protocol: iterate.Protocol = persist.load_protocol(filename=args[0])
-    return (
-        []
-        if protocol is None
-        else iterate.to_segments(
+
+def load_segments(
+    filename: str,
+    content_type: ContentType,
+    segment_level: SegmentLevel,
+    segment_skip_size: int,
+    merge_strategy: str,
+    which_year: str,
+    metadata_only: bool = False,
+) -> list[iterate.ProtocolSegment]:
+    protocol: iterate.Protocol = persist.load_protocol(filename=filename, metadata_only=metadata_only)
+
+    if protocol is None:
+        return []
+
+    if metadata_only:
+        """Content is not loaded, hence skip size is applied to speech text lengths (stored in metadata) only"""
+        return iterate.SEGMENT_FUNCTIONS.get(segment_level)(
             protocol=protocol,
-            content_type=args[1],
-            segment_level=args[2],
-            segment_skip_size=args[3],
-            merge_strategy=args[4],
-            which_year=args[5],
+            content_type=content_type,
+            segment_skip_size=segment_skip_size,
+            merge_strategy=merge_strategy,
+            which_year=which_year,
         )
+
+    return iterate.to_segments(
+        protocol=protocol,
+        content_type=content_type,
+        segment_level=segment_level,
+        segment_skip_size=segment_skip_size,
+        merge_strategy=merge_strategy,
+        which_year=which_year,
     )
 
 
+def multiprocessing_load(args, metadata_only: bool = False) -> Iterable[iterate.ProtocolSegment]:
+    return load_segments(*args[:6], metadata_only=metadata_only)
+
+
 class ProtocolIterator(iterate.ProtocolSegmentIterator):
     """Reads xml files and returns a stream of `ProtocolSegment`"""
 
+    def __init__(self, *, metadata_only: bool = False, **kwargs):
+        """See `ProtocolSegmentIterator` for arguments.
+
+        Args:
+            metadata_only (bool, optional): Read only the utterance index stored in each protocol archive.
+                Segments have empty data, but correct speech boundaries, ids and token counts. Only speech and
+                who segment levels are supported. Defaults to False.
+        """
+        super().__init__(**kwargs)
+        if metadata_only and self.segment_level not in METADATA_SEGMENT_LEVELS:
+            raise ValueError(f"metadata only iteration not supported for segment level {self.segment_level}")
+        self.metadata_only: bool = metadata_only
+
     def load(self, filename: str) -> List[Tuple[str, str, int]]:  # type: ignore
-        protocol: iterate.Protocol = persist.load_protocol(filename=filename)
-
-        return (  # type: ignore
-            []
-            if protocol is None
-            else iterate.to_segments(
-                protocol=protocol,
-                content_type=self.content_type,
-                segment_level=self.segment_level,
-                segment_skip_size=self.segment_skip_size,
-                merge_strategy=self.merge_strategy,
-                which_year=self.which_year,
-            )
+        return load_segments(  # type: ignore
+            filename,
+            self.content_type,
+            self.segment_level,
+            self.segment_skip_size,
+            self.merge_strategy,
+            self.which_year,
+            metadata_only=self.metadata_only,
         )
 
     def map_futures(self, imap, args):
-        return imap(multiprocessing_load, args, chunksize=self.multiproc_chunksize)
+        return imap(
+            partial(multiprocessing_load, metadata_only=self.metadata_only), args, chunksize=self.multiproc_chunksize
+        )
 
     def to_segment_index(self) -> pd.DataFrame:
         """Iterate and return a meta data index over segments."""
@@ -4,8 +4,13 @@ import glob
 import json
 import os
 import zipfile
-from typing import Iterable, List, Optional
+from typing import Callable, Iterable, List, Optional
 
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
 from loguru import logger
 from tqdm import tqdm
 
@@ -13,13 +18,144 @@ from pyriksprot.utility import ensure_path, is_empty, strip_path_and_extension,
 
 from ... import interface
 from ..parlaclarin.parse import zero_fill_filename_sequence
+from . import container
 
 METADATA_FILENAME: str = 'metadata.json'
 
+"""Per-utterance metadata (no text or annotation) stored in each protocol archive, read by metadata-only loads"""
+UTTERANCE_INDEX_FILENAME: str = 'utterance_index.json'
+UTTERANCE_INDEX_COLUMNS: list[str] = [
+    'u_id',
+    'who',
+    'prev_id',
+    'next_id',
+    'speaker_note_id',
+    'page_number',
+    'n_chars',
+    'n_tokens',
+    'n_words',
+]
+
+"""Columnar (Arrow) storage formats: one utterance table and one token table per protocol"""
+TOKENS_SUFFIX: str = 'tokens'
+TOKEN_COLUMNS: list[str] = ['u_id', 'token', 'lemma', 'pos', 'xpos', 'sentence_id']
+ANNOTATION_COLUMNS: dict[str, pa.DataType] = {
+    'num_tokens': pa.int32(),
+    'num_words': pa.int32(),
+    'annotation_header': pa.dictionary(pa.int32(), pa.string()),
+    'n_rows': pa.int32(),
+}
+
 jj = os.path.join
 relpath = os.path.relpath
 
 
+def count_tagged_tokens(tagged_text: str | None) -> int:
+    """Number of token rows (excluding header) in a tagged CSV string."""
+    return 0 if not tagged_text else sum(1 for line in tagged_text.split('\n')[1:] if line)
+
+
+def to_utterance_index(utterances: list[interface.Utterance]) -> dict:
+    """Create utterance index (column-wise JSON) of utterances' metadata."""
+    return {
+        'columns': UTTERANCE_INDEX_COLUMNS,
+        'data': [
+            [
+                u.u_id,
+                u.who,
+                u.prev_id,
+                u.next_id,
+                u.speaker_note_id,
+                u.page_number,
+                u.text_length,
+                count_tagged_tokens(u.tagged_text),
+                getattr(u, 'num_words', None),
+            ]
+            for u in utterances
+        ],
+    }
+
+
+def to_arrow_tables(utterances: list[interface.Utterance]) -> tuple[pa.Table, pa.Table]:
+    """Split utterances into an utterance table (one row per utterance, no annotation) and a token table (one row
+    per token, in utterance order) with columns `TOKEN_COLUMNS` (plus any other tagged column). Token columns are
+    dictionary encoded strings. Each utterance's annotation header is kept so that annotations can be restored
+    (empty lines, if any, are dropped)."""
+    columns: dict[str, list[str | None]] = {c: [] for c in TOKEN_COLUMNS}
+    headers: list[str | None] = []
+    n_rows: list[int] = []
+    n_total: int = 0
+
+    for u in utterances:
+        annotation: str | None = u.tagged_text
+        lines: list[str] = annotation.split('\n') if annotation else []
+        headers.append(annotation[: len(lines[0]) + 1] if lines else annotation)
+        rows: list[list[str]] = [line.split('\t') for line in lines[1:] if line]
+        n_rows.append(len(rows))
+        if not rows:
+            continue
+        columns['u_id'].extend([u.u_id] * len(rows))
+        for i, name in enumerate(lines[0].split('\t')):
+            if name not in columns:
+                columns[name] = [None] * n_total
+            columns[name].extend(row[i] if i < len(row) else None for row in rows)
+        n_total += len(rows)
+        for values in columns.values():
+            values.extend([None] * (n_total - len(values)))
+
+    batch: pa.RecordBatch = interface.UtteranceHelper.to_record_batch(utterances)
+    annotations: dict[str, list] = {
+        'num_tokens': [getattr(u, 'num_tokens', None) for u in utterances],
+        'num_words': [getattr(u, 'num_words', None) for u in utterances],
+        'annotation_header': headers,
+        'n_rows': n_rows,
+    }
+    utterance_table: pa.Table = pa.Table.from_arrays(
+        [
+            *batch.columns,
+            *[pa.array(annotations[name], dtype) for name, dtype in ANNOTATION_COLUMNS.items()],
+        ],
+        names=[*batch.schema.names, *ANNOTATION_COLUMNS],
+    )
+    token_table: pa.Table = pa.table(
+        {name: pa.array(values, pa.string()).dictionary_encode() for name, values in columns.items()}
+    )
+    return utterance_table, token_table
+
+
+def from_arrow_tables(utterance_table: pa.Table, token_table: pa.Table) -> list[interface.Utterance]:
+    """Create utterances from tables created by `to_arrow_tables`. The annotation of each utterance is kept as a
+    (zero-copy) slice of `token_table`, i.e. tagged CSV is not created unless requested."""
+    records: list[dict] = utterance_table.to_pylist()
+    utterances: list[interface.Utterance] = []
+    offset: int = 0
+    for record in records:
+        n_rows: int = record.pop('n_rows')
+        u: interface.Utterance = interface.TokenTableUtterance(
+            **record, tokens=token_table.slice(offset, n_rows) if n_rows > 0 else None
+        )
+        u.num_tokens, u.num_words = record['num_tokens'], record['num_words']
+        utterances.append(u)
+        offset += n_rows
+    return utterances
+
+
+def write_table(table: pa.Table, storage_format: interface.StorageFormat) -> bytes:
+    """Serialize `table` as Feather or Parquet (ZSTD compressed)."""
+    sink: pa.BufferOutputStream = pa.BufferOutputStream()
+    if storage_format == interface.StorageFormat.FEATHER:
+        feather.write_feather(table, sink, compression='zstd')
+    else:
+        pq.write_table(table, sink, compression='zstd')
+    return sink.getvalue().to_pybytes()
+
+
+TABLE_READERS: dict[str, Callable[[bytes], pa.Table]] = dict(
+    feather=lambda data: feather.read_table(pa.BufferReader(data)),
+    parquet=lambda data: pq.read_table(pa.BufferReader(data)),
+)
+
+
 def store_protocol(
     output_filename: str,
     protocol: interface.Protocol,
@@ -32,6 +168,7 @@ def store_protocol(
         with zipfile.ZipFile(output_filename, 'w', zipfile.ZIP_DEFLATED) as fp:
             metadata: dict = dict(name=protocol.name, date=protocol.date, checksum=checksum)
             fp.writestr(METADATA_FILENAME, json.dumps(metadata, indent=4))
+            fp.writestr(UTTERANCE_INDEX_FILENAME, json.dumps(to_utterance_index(protocol.utterances)))
 
             if storage_format == interface.StorageFormat.CSV:
                 utterances_csv_str: str = protocol.to_csv()
@@ -41,6 +178,15 @@ def store_protocol(
                 utterances_json_str: str = protocol.to_json()
                 fp.writestr(f'{protocol.name}.json', utterances_json_str or "")
 
+            elif storage_format in (interface.StorageFormat.FEATHER, interface.StorageFormat.PARQUET):
+                """Tables are already compressed, hence stored as is"""
+                ext: str = interface.StorageFormat(storage_format).value
+                for stored_filename, table in zip(
+                    [f'{protocol.name}.{ext}', f'{protocol.name}.{TOKENS_SUFFIX}.{ext}'],
+                    to_arrow_tables(protocol.utterances),
+                ):
+                    fp.writestr(stored_filename, write_table(table, storage_format), compress_type=zipfile.ZIP_STORED)
+
             # document_index: pd.DataFrame = (
             #     pd.DataFrame(speeches)
             #     .set_index('document_name', drop=False)
@@ -53,19 +199,30 @@ def store_protocol(
         raise ValueError("Only Zip store currently implemented")
 
 
+def read_metadata(fp: zipfile.ZipFile) -> Optional[dict]:
+    """Read metadata attributes stored in `metadata.json` of open archive `fp`"""
+    if METADATA_FILENAME not in fp.namelist():
+        return None
+    return to_metadata(json.loads(fp.read(METADATA_FILENAME).decode('utf-8')))
+
+
+def to_metadata(data: dict | None) -> Optional[dict]:
+    if data is None:
+        return None
+    # FIXME: #74 Zero-filled sequence number in protocol name
+    return {**data, "name": zero_fill_filename_sequence(data["name"])}
+
+
 def load_metadata(filename: str) -> Optional[dict]:
-    """Read metadata attributes stored in `metadata.json`"""
+    """Read metadata attributes stored in `metadata.json` (or in the index, if `filename` is in a packed container)"""
+
+    member: tuple[container.PackedCorpus, str] | None = container.resolve(filename)
+    if member is not None:
+        return to_metadata(member[0].metadata(member[1]))
 
     try:
         with zipfile.ZipFile(filename, 'r') as fp:
-            filenames: List[str] = [f.filename for f in fp.filelist]
-            if METADATA_FILENAME not in filenames:
-                return None
-            json_str = fp.read(METADATA_FILENAME).decode('utf-8')
-            data: dict[str, str] = json.loads(json_str)
-            # FIXME: #74 Zero-filled sequence number in protocol name
-            data["name"] = zero_fill_filename_sequence(data["name"])
-            return data
+            return read_metadata(fp)
     except (zipfile.BadZipFile, FileNotFoundError):
         return None
     except Exception as ex:
@@ -73,6 +230,22 @@ def load_metadata(filename: str) -> Optional[dict]:
         return None
 
 
+def is_archive(filename: str) -> bool:
+    """Check if `filename` is a non-empty archive (on disk or in a packed container)"""
+    member: tuple[container.PackedCorpus, str] | None = container.resolve(filename)
+    if member is not None:
+        return member[0].metadata(member[1]) is not None
+    return not is_empty(filename) and zipfile.is_zipfile(filename)
+
+
+def open_archive(filename: str) -> zipfile.ZipFile:
+    """Open archive `filename` (on disk or in a packed container)"""
+    member: tuple[container.PackedCorpus, str] | None = container.resolve(filename)
+    if member is not None:
+        return member[0].open(member[1])
+    return zipfile.ZipFile(filename, 'r')
+
+
 PROTOCOL_LOADERS: dict = dict(
     json=interface.UtteranceHelper.from_json,
     csv=interface.UtteranceHelper.from_csv,
@@ -82,44 +255,116 @@ PROTOCOL_LOADERS: dict = dict(
 class FileIsEmptyError(Exception): ...
 
 
-def load_protocol(filename: str) -> Optional[interface.Protocol]:
-    """Loads a tagged protocol stored in ZIP as JSON or CSV"""
+def read_utterance_index(fp: zipfile.ZipFile) -> Optional[list[dict]]:
+    """Read utterance metadata stored in `utterance_index.json` of open archive `fp`. Return None if no index."""
+    if UTTERANCE_INDEX_FILENAME not in fp.namelist():
+        return None
+    data: dict = json.loads(fp.read(UTTERANCE_INDEX_FILENAME).decode('utf-8'))
+    return [dict(zip(data['columns'], values)) for values in data['data']]
+
+
+def load_utterance_index(filename: str) -> Optional[list[dict]]:
+    """Read utterance metadata stored in `utterance_index.json`. Return None if archive has no index."""
+    with open_archive(filename) as fp:
+        return read_utterance_index(fp)
 
-    if is_empty(filename) or not zipfile.is_zipfile(filename):
+
+def load_protocol(filename: str, metadata_only: bool = False) -> Optional[interface.Protocol]:
+    """Loads a tagged protocol stored in ZIP as JSON, CSV, Feather or Parquet. If `metadata_only` then only the
+    utterance index is read, and utterances have no text or annotation (archives without index are loaded in full).
+    The archive is opened once (`filename` can be in a packed container)."""
+
+    if not is_archive(filename):
         return None
 
-    metadata: dict = load_metadata(filename)
+    basename: str = strip_path_and_extension(filename)
+    utterances: list[interface.Utterance] | None = None
 
-    if metadata is None:
+    with open_archive(filename) as fp:
+
+        metadata: dict = read_metadata(fp)
+
+        if metadata is None:
+            return None
+
+        filenames: List[str] = fp.namelist()
+
+        if metadata_only:
+            records: list[dict] | None = read_utterance_index(fp)
+            if records is not None:
+                utterances = [interface.UtteranceMetadata(**record) for record in records]
+
+        if utterances is None:
+            for ext in PROTOCOL_LOADERS:
+                stored_filename: str = f"{basename}.{ext}"
+
+                if not stored_filename in filenames:
+                    continue
+
+                data_str: str = fp.read(stored_filename).decode('utf-8')
+                utterances = PROTOCOL_LOADERS.get(ext)(data_str)
+                break
+
+            else:
+                tables: tuple[pa.Table, pa.Table] | None = read_arrow_tables(fp, basename)
+                if tables is not None:
+                    utterances = from_arrow_tables(*tables)
+
+    if utterances is None:
         return None
 
-    with zipfile.ZipFile(filename, 'r') as fp:
+    # Note: Speaker notes and page references are not stored in the protocol file
+    # These files are instead stored in separate files in the metadata folder
+    protocol: interface.Protocol = interface.Protocol(
+        utterances=utterances,
+        name=basename,
+        date=metadata.get('date', None),
+        preface_name=metadata['name'],
+        speaker_notes={},
+        page_references=[],
+    )
+
+    return protocol
 
-        preface_name: str = metadata['name']
-        basename: str = strip_path_and_extension(filename)
-        filenames: List[str] = [f.filename for f in fp.filelist]
 
-        for ext in PROTOCOL_LOADERS:
-            stored_filename: str = f"{basename}.{ext}"
+def read_arrow_tables(
+    fp: zipfile.ZipFile, basename: str, tokens_only: bool = False
+) -> tuple[pa.Table | None, pa.Table] | None:
+    """Read utterance and token tables stored in open archive `fp`. Return None if not stored in a columnar format."""
+    filenames: list[str] = fp.namelist()
+    for ext, reader in TABLE_READERS.items():
+        stored_filename: str = f"{basename}.{TOKENS_SUFFIX}.{ext}"
+        if stored_filename not in filenames:
+            continue
+        utterance_table: pa.Table | None = None if tokens_only else reader(fp.read(f"{basename}.{ext}"))
+        return utterance_table, reader(fp.read(stored_filename))
+    return None
 
-            if not stored_filename in filenames:
-                continue
 
-            data_str: str = fp.read(stored_filename).decode('utf-8')
-            utterances: List[interface.Utterance] = PROTOCOL_LOADERS.get(ext)(data_str)
+def load_token_table(filename: str, u_ids: Iterable[str] = None) -> Optional[pa.Table]:
+    """Load token table (see `TOKEN_COLUMNS`) of protocol stored in a columnar format, optionally only tokens of
+    utterances `u_ids`. Columns are dictionary encoded. Return None if protocol is not stored in a columnar format."""
+    if not is_archive(filename):
+        return None
+    with open_archive(filename) as fp:
+        tables: tuple[pa.Table | None, pa.Table] | None = read_arrow_tables(
+            fp, strip_path_and_extension(filename), tokens_only=True
+        )
+    if tables is None:
+        return None
+    token_table: pa.Table = tables[1]
+    if u_ids is not None:
+        token_table = token_table.filter(
+            pc.is_in(token_table.column('u_id').cast(pa.string()), pa.array(list(u_ids), pa.string()))
+        )
+    return token_table
 
-            # Note: Speaker notes and page references are not stored in the protocol file
-            # These files are instead stored in separate files in the metadata folder
-            protocol: interface.Protocol = interface.Protocol(
-                utterances=utterances,
-                name=basename,
-                date=metadata.get('date', None),
-                preface_name=preface_name,
-                speaker_notes={},
-                page_references=[],
-            )
 
-            return protocol
+def load_tagged_frame(filename: str, u_ids: Iterable[str] = None) -> Optional[pd.DataFrame]:
+    """Load token table of protocol stored in a columnar format as a data frame (categorical columns). See
+    `load_token_table`."""
+    token_table: pa.Table | None = load_token_table(filename, u_ids=u_ids)
+    return None if token_table is None else token_table.to_pandas()
 
 
 def load_protocols(source: str | list[str], pattern: str = '**/prot-*.zip') -> Iterable[interface.Protocol]:
@@ -132,7 +377,7 @@ def load_protocols(source: str | list[str], pattern: str = '**/prot-*.zip') -> I
 
 
 def glob_protocols(source: str, pattern: str = None, strip_path: bool = False):
-    """Glob for protocols in `source` folder, matching `file_pattern`"""
+    """Glob for protocols in `source` folder (or packed container), matching `file_pattern`"""
     filenames: list[str] = []
     if isinstance(source, str):
         path: str = jj(source, pattern) if pattern else source
@@ -145,6 +390,8 @@ def glob_protocols(source: str, pattern: str = None, strip_path: bool = False):
         if isinstance(source, str)
         else source if isinstance(source, list) else []
     )
+    if container.is_container(source):
+        filenames = container.open_container(source).glob(pattern)
     if strip_path:
         filenames = strip_paths(filenames)
     return filenames
@@ -175,6 +422,11 @@ def update_speaker_note_id(speaker_note_id_lookup: dict[str, str], source_folder
             with zipfile.ZipFile(filename, "r") as fp:
                 protocol_str = fp.read(json_name).decode('utf-8')
                 metadata_str = fp.read("metadata.json").decode('utf-8')
+                index_str = (
+                    fp.read(UTTERANCE_INDEX_FILENAME).decode('utf-8')
+                    if UTTERANCE_INDEX_FILENAME in fp.namelist()
+                    else None
+                )
         except zipfile.BadZipFile:
             touch(target_filename)
             continue
@@ -184,6 +436,14 @@ def update_speaker_note_id(speaker_note_id_lookup: dict[str, str], source_folder
             if speaker_note_id:
                 u['speaker_note_id'] = speaker_note_id
         utterances_csv_str: str = json.dumps(protocol)
+        if index_str is not None:
+            index: dict = json.loads(index_str)
+            column: int = index['columns'].index('speaker_note_id')
+            for values in index['data']:
+                values[column] = speaker_note_id_lookup.get(values[0]) or values[column]
+            index_str = json.dumps(index)
         with zipfile.ZipFile(target_filename, "w", compression=zipfile.ZIP_DEFLATED) as fp:
             fp.writestr(json_name, utterances_csv_str or "")
             fp.writestr("metadata.json", metadata_str or "")
+            if index_str is not None:
+                fp.writestr(UTTERANCE_INDEX_FILENAME, index_str)
@@ -3,6 +3,7 @@
 from .dispatch import (
     CheckpointPerGroupDispatcher,
     CompressType,
+    DispatchShard,
     FilesInFolderDispatcher,
     FilesInZipDispatcher,
     IDispatcher,
@@ -6,12 +6,14 @@ import string
 import sys
 import zipfile
 from collections import defaultdict
+from dataclasses import dataclass
 from enum import Enum
 from io import StringIO
 from typing import Any, Literal, Type
 
 import numpy as np
 import pandas as pd
+import pyarrow as pa
 from loguru import logger
 
 from pyriksprot.corpus.iterate import ProtocolSegment
@@ -71,8 +73,44 @@ class CompressType(str, Enum):
         return [e.value for e in cls]
 
 
+"""Compression extensions added by `utility.store_str`"""
+COMPRESS_EXTENSIONS: tuple[str, ...] = ('.gz', '.bz2', '.xz')
+
+
+@dataclass
+class DispatchShard:
+    """Result of a dispatcher that has dispatched a (temporal) partition of the corpus to its own target."""
+
+    target_name: str
+    document_data: list[dict]
+    document_id: int
+    vocabulary: list[str] | None = None
+
+
+def ls_shard_files(folder: str, skip_names: tuple[str, ...] = ()) -> list[str]:
+    """Relative paths of all files in `folder` except top-level files that starts with any of `skip_names`."""
+    filenames: list[str] = []
+    for path, _, names in os.walk(folder):
+        for name in names:
+            filename: str = os.path.relpath(jj(path, name), folder)
+            if os.path.dirname(filename) == "" and name.startswith(skip_names):
+                continue
+            filenames.append(filename)
+    return sorted(filenames)
+
+
+def move_shard_files(source_folder: str, target_folder: str, skip_names: tuple[str, ...] = ()) -> None:
+    for filename in ls_shard_files(source_folder, skip_names):
+        os.makedirs(os.path.dirname(jj(target_folder, filename)), exist_ok=True)
+        os.replace(jj(source_folder, filename), jj(target_folder, filename))
+
+
 class IDispatcher(abc.ABC):
     name: str = 'parent'
+    """True if dispatcher implements `merge_shards(shards)`: merge targets of dispatchers that have dispatched
+    consecutive (temporal) partitions of the corpus into this (opened) target. The result has the same layout and
+    document ids as if all items had been dispatched by this dispatcher. Indexes are written when target is closed."""
+    supports_merge: bool = False
 
     def __init__(self, *, target_name: str, compress_type: CompressType, lookups: Codecs, **kwargs):
         """Dispatches text blocks to a target_name zink.
@@ -133,6 +171,20 @@ class IDispatcher(abc.ABC):
         document_index: pd.DataFrame = pd.DataFrame(self.document_data)
         return document_index
 
+    def to_shard(self) -> DispatchShard:
+        """State needed to merge this dispatcher's target with other shards."""
+        return DispatchShard(
+            target_name=self.target_name, document_data=self.document_data, document_id=self.document_id
+        )
+
+    def _merge_document_data(self, shard: DispatchShard) -> int:
+        """Add shard's document index with document ids offset by current document id. Return offset."""
+        offset: int = self.document_id
+        for data in shard.document_data:
+            self.document_data.append({**data, 'document_id': data['document_id'] + offset})
+        self.document_id += shard.document_id
+        return offset
+
     def document_index_str(self) -> str:
         csv_str: str = self.document_index().to_csv(sep='\t')
         return csv_str
@@ -213,6 +265,7 @@ class FilesInFolderDispatcher(IDispatcher):
         super().__init__(target_name=target_name, compress_type=compress_type, lookups=lookups, **kwargs)
 
     name: str = 'files-in-folder'
+    supports_merge: bool = True
 
     def open_target(self, target_name: Any) -> None:
         os.makedirs(target_name, exist_ok=True)
@@ -224,11 +277,17 @@ class FilesInFolderDispatcher(IDispatcher):
         """Write index of documents to disk."""
         self.store('document_index.csv', self.document_index_str())
 
+    def merge_shards(self, shards: list[DispatchShard]) -> None:
+        for shard in shards:
+            move_shard_files(shard.target_name, self.target_name, skip_names=('document_index.csv',))
+            self._merge_document_data(shard)
+
 
 class FilesInZipDispatcher(IDispatcher):
     """Dispatch text to a single zip file."""
 
     name: str = 'files-in-zip'
+    supports_merge: bool = True
 
     def __init__(self, target_name: str, compress_type: CompressType, lookups: Codecs, **kwargs):
         self.zup: zipfile.ZipFile = None
@@ -257,6 +316,14 @@ class FilesInZipDispatcher(IDispatcher):
     def _dispatch_item(self, item: IDispatchItem) -> None:
         self.zup.writestr(self.get_filename(item), self.to_lower(item.text))
 
+    def merge_shards(self, shards: list[DispatchShard]) -> None:
+        for shard in shards:
+            with zipfile.ZipFile(shard.target_name, mode="r") as fp:
+                for info in fp.infolist():
+                    if info.filename != 'document_index.csv':
+                        self.zup.writestr(info, fp.read(info))
+            self._merge_document_data(shard)
+
 
 class SortedSpeechesInZipDispatcher(FilesInZipDispatcher):
     """Dispatch speeches to files in a single zip file."""
@@ -313,6 +380,7 @@ class CheckpointPerGroupDispatcher(IDispatcher):
         super().__init__(target_name=target_name, compress_type=compress_type, lookups=lookups, **kwargs)
 
     name: str = 'checkpoint-per-group'
+    supports_merge: bool = True
 
     def open_target(self, target_name: Any) -> None:
         return
@@ -326,6 +394,11 @@ class CheckpointPerGroupDispatcher(IDispatcher):
     def dispatch_index(self) -> None:
         return
 
+    def merge_shards(self, shards: list[DispatchShard]) -> None:
+        """Each checkpoint has its own document index, hence files are simply moved"""
+        for shard in shards:
+            move_shard_files(shard.target_name, self.target_name)
+
     def dispatch(self, dispatch_items: list[IDispatchItem]) -> None:
         self._reset_index()
 
@@ -428,7 +501,12 @@ class TaggedFramePerGroupDispatcher(FilesInFolderDispatcher):
     def create_tagged_frame(self, item: IDispatchItem) -> pd.DataFrame:
         pads: set = {'MID', 'MAD', 'PAD'}
 
-        tagged_frame: pd.DataFrame = pd.read_csv(StringIO(item.text), sep='\t', quoting=3, dtype=str)
+        tokens: pa.Table | None = item.token_table()
+        tagged_frame: pd.DataFrame = (
+            tokens.to_pandas()
+            if tokens is not None
+            else pd.read_csv(StringIO(item.text), sep='\t', quoting=3, dtype=str)
+        )
         tagged_frame['document_id'] = self.document_id
 
         if self.lowercase:
@@ -484,6 +562,34 @@ class TaggedFramePerGroupDispatcher(FilesInFolderDispatcher):
 
         self.store(filename=jj(self.target_name, 'document_index.csv'), data=document_index)
 
+    def merge_shards(self, shards: list[DispatchShard]) -> None:
+        for shard in shards:
+            offset: int = self._merge_document_data(shard)
+            for filename in ls_shard_files(shard.target_name, skip_names=('document_index', 'token2id')):
+                tagged_frame: pd.DataFrame = self.merge_tagged_frame(
+                    self.read_tagged_frame(jj(shard.target_name, filename)), shard, offset
+                )
+                self.store_merged_tagged_frame(tagged_frame, filename)
+
+    def read_tagged_frame(self, filename: str) -> pd.DataFrame:
+        """Read tagged frame stored by `store`. CSV values are read as strings (and hence written back as is), using
+        the (minimal) quoting that `store` writes with."""
+        if self.compress_type == CompressType.Feather:
+            return pd.read_feather(filename)
+        return pd.read_csv(filename, sep='\t', index_col=0, dtype=str, keep_default_na=False)
+
+    def merge_tagged_frame(self, tagged_frame: pd.DataFrame, shard: DispatchShard, offset: int) -> pd.DataFrame:
+        """Update shard's tagged frame so that it is consistent with merged document index."""
+        tagged_frame['document_id'] = tagged_frame['document_id'].astype(np.int64) + offset
+        return tagged_frame
+
+    def store_merged_tagged_frame(self, tagged_frame: pd.DataFrame, filename: str) -> None:
+        for extension in COMPRESS_EXTENSIONS:
+            if filename.endswith(extension):
+                filename = filename[: -len(extension)]
+        os.makedirs(os.path.dirname(jj(self.target_name, filename)), exist_ok=True)
+        self.store(filename=jj(self.target_name, filename), data=tagged_frame)
+
 
 class IdTaggedFramePerGroupDispatcher(TaggedFramePerGroupDispatcher):
     """Store merged group items in a single tagged frame.
@@ -524,6 +630,20 @@ class IdTaggedFramePerGroupDispatcher(TaggedFramePerGroupDispatcher):
         super().dispatch_index()
         self.dispatch_vocabulary()
 
+    def to_shard(self) -> DispatchShard:
+        shard: DispatchShard = super().to_shard()
+        shard.vocabulary = list(self.token2id.keys())
+        return shard
+
+    def merge_tagged_frame(self, tagged_frame: pd.DataFrame, shard: DispatchShard, offset: int) -> pd.DataFrame:
+        """Translate shard's token ids to ids in merged vocabulary"""
+        tagged_frame = super().merge_tagged_frame(tagged_frame, shard, offset)
+        token_ids: np.ndarray = np.array([self.token2id[token] for token in shard.vocabulary or []], dtype=np.int64)
+        for column in ['token_id', 'lemma_id']:
+            if column in tagged_frame.columns:
+                tagged_frame[column] = token_ids[tagged_frame[column].astype(np.int64).values]
+        return tagged_frame
+
     def dispatch_vocabulary(self) -> None:
         vocabulary: pd.DataFrame = pd.DataFrame(
             data={
@@ -552,6 +672,10 @@ class SingleIdTaggedFrameDispatcher(IdTaggedFramePerGroupDispatcher):
         total_frame: pd.DataFrame = pd.concat(self.tagged_frames, ignore_index=True)
         self.store(filename=self.corpus_name, data=total_frame)
 
+    def store_merged_tagged_frame(self, tagged_frame: pd.DataFrame, filename: str) -> None:
+        """Merged frames are stored as a single frame when target is closed"""
+        self.tagged_frames.append(tagged_frame)
+
 
 def trim_series_type(series: pd.Series) -> pd.Series:
     max_value: int = series.max()
@@ -2,6 +2,8 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 
+import pyarrow as pa
+
 from ..corpus import ProtocolSegment
 from ..interface import ContentType, IDispatchItem
 from ..utility import merge_csv_strings
@@ -48,6 +50,13 @@ class DispatchItem(IDispatchItem):
             else '\n'.join(self._get_texts())
         )
 
+    def token_table(self) -> pa.Table | None:
+        """Tokens of all segments (see `ProtocolSegment.token_table`). Return None if any segment has no token table."""
+        tables: list[pa.Table | None] = [s.token_table() for s in self.protocol_segments]
+        if not tables or any(t is None for t in tables):
+            return None
+        return pa.concat_tables(tables, promote_options='default').select(tables[0].column_names)
+
     def to_dict(self):
         return {
             'year': self.year,
@@ -17,6 +17,7 @@ License: MIT License - http://www.opensource.org/licenses/mit-license.php
 """
 import keyword
 import os
+import sys
 from io import StringIO
 from typing import Container, List, Mapping, Optional, Set
 from xml.sax import handler, make_parser
@@ -32,22 +33,46 @@ __version__ = "1.1.1"
 class Element:
     """
     Representation of an XML element.
+
+    Slotted to keep the (very large number of) instances small. Attributes are kept
+    as given by the parser and copied to a dict first when `attributes` is accessed,
+    and child lookups (by attribute access) are cached in a dict created on first use.
     """
 
+    __slots__ = ('name', '_attributes', 'children', 'is_root', '_cdata', '_lookup')
+
     def __init__(self, name: str, attributes: Mapping[str, str]):
         self.name: str = name
-        self.attributes: Mapping[str, str] = attributes
+        self._attributes: Mapping[str, str] = attributes
         self.children: List["Element"] = []
         self.is_root: bool = False
-        self.cdatas: List[str] = []
+        self._cdata: str = ''
+        self._lookup: Optional[dict] = None
+
+    @property
+    def attributes(self) -> Mapping[str, str]:
+        if self._attributes is None:
+            if not self.is_root:
+                self._attributes = {}
+        elif not isinstance(self._attributes, dict):
+            self._attributes = dict(self._attributes)
+        return self._attributes
+
+    @attributes.setter
+    def attributes(self, attributes: Mapping[str, str]) -> None:
+        self._attributes = attributes
 
     @property
     def cdata(self):
-        return ''.join(self.cdatas)
+        return self._cdata
 
     @cdata.setter
     def cdata(self, cdata):
-        self.cdatas = [cdata]
+        self._cdata = cdata
+
+    @property
+    def cdatas(self) -> List[str]:
+        return [self._cdata] if self._cdata else []
 
     def add_child(self, element: "Element") -> None:
         """Store child elements."""
@@ -55,11 +80,11 @@ class Element:
 
     def add_cdata(self, cdata: str) -> None:
         """Store cdata"""
-        self.cdatas.append(cdata)
+        self._cdata += cdata
 
     def get_attribute(self, key) -> Optional[str]:
         """Get attributes by key"""
-        return self.attributes.get(key)
+        return self._attributes.get(key) if self._attributes is not None else None
 
     def get_elements(self, name: str = None) -> List["Element"]:
         """Find a child element by name"""
@@ -71,19 +96,29 @@ class Element:
         return self.get_attribute(key)
 
     def __getattr__(self, key):
+        if key in Element.__slots__:
+            """Guard against recursion if a slot is accessed before it is assigned (e.g. when unpickling)"""
+            raise AttributeError(key)
+
+        if self._lookup is not None and key in self._lookup:
+            return self._lookup[key]
+
         matching_children = [x for x in self.children if x.name == key]
         if matching_children:
+            if self._lookup is None:
+                self._lookup = {}
+
             if len(matching_children) == 1:
-                self.__dict__[key] = matching_children[0]
+                self._lookup[key] = matching_children[0]
                 return matching_children[0]
 
-            self.__dict__[key] = matching_children
+            self._lookup[key] = matching_children
             return matching_children
 
         raise AttributeError(f"'{self.name}' has no attribute '{key}'")
 
     def __hasattribute__(self, name):
-        if name in self.__dict__:
+        if self._lookup is not None and name in self._lookup:
             return True
         return any(x.name == name for x in self.children)
 
@@ -133,33 +168,40 @@ class Handler(handler.ContentHandler):
         self.root: Element = Element(None, None)
         self.root.is_root = True
         self.elements: List[Element] = []
+        self.cdatas: List[List[str]] = []
         self.ignore_tags: Set[str] = set(ignore_tags or [])
+        self.names: dict[str, str] = {}
+
+    def element_name(self, name: str) -> str:
+        """Python friendly (interned) name of tag `name`."""
+        mapped_name: str | None = self.names.get(name)
+        if mapped_name is None:
+            mapped_name = name.replace("-", "_").replace(".", "_").replace(":", "_")
+            if keyword.iskeyword(mapped_name):
+                mapped_name += "_"
+            mapped_name = self.names[name] = sys.intern(mapped_name)
+        return mapped_name
 
     def startElement(self, name: str, attrs: Mapping[str, str]) -> None:
         if name in self.ignore_tags:
             return
 
-        name = name.replace("-", "_").replace(".", "_").replace(":", "_")
-
-        if keyword.iskeyword(name):
-            name += "_"
-
-        element = Element(name, dict(attrs))
+        element = Element(self.element_name(name), attrs or None)
         if len(self.elements) > 0:
             self.elements[-1].add_child(element)
         else:
             self.root.add_child(element)
         self.elements.append(element)
+        self.cdatas.append([])
 
     def endElement(self, name: str) -> None:
         if name in self.ignore_tags:
             return
 
-        self.elements.pop()
+        self.elements.pop().cdata = ''.join(self.cdatas.pop())
 
     def characters(self, content: str) -> None:
-        # self.elements[-1].add_cdata(content)
-        self.elements[-1].cdatas.append(content)
+        self.cdatas[-1].append(content)
 
 
 def parse(filename: str, ignore_tags: Container[str] = None, **parser_features) -> Element:
@@ -4,16 +4,20 @@ import abc
 import contextlib
 import csv
 import hashlib
+import itertools
 import re
+from array import array
 from dataclasses import dataclass, field
 from enum import Enum
 from io import StringIO
-from typing import Any, Callable, Literal, Mapping, Optional, Union
+from typing import Any, Callable, Iterable, Iterator, Literal, Mapping, Optional, Union
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from pandas.io.json import ujson_dumps, ujson_loads  # type: ignore
 
-from .utility import flatten, merge_csv_strings, strip_extensions
+from .utility import flatten, intern_str, merge_csv_strings, strip_csv_header, strip_extensions
 
 # pylint: disable=too-many-arguments, no-member, too-many-positional-arguments
 
@@ -67,6 +71,8 @@ class ContentType(str, Enum):
 class StorageFormat(str, Enum):
     CSV = 'csv'
     JSON = 'json'
+    FEATHER = 'feather'
+    PARQUET = 'parquet'
 
 
 PARAGRAPH_MARKER: str = '@#@'
@@ -74,6 +80,8 @@ PARAGRAPH_MARKER: str = '@#@'
 
 @dataclass
 class IDispatchItem(abc.ABC):
+    __slots__ = ()
+
     segment_level: SegmentLevel
     content_type: ContentType
     n_tokens: int
@@ -84,6 +92,11 @@ class IDispatchItem(abc.ABC):
     @property
     def text(self) -> str: ...
 
+    def token_table(self) -> pa.Table | None:
+        """Tagged tokens as an Arrow table, if available without parsing `text` (i.e. loaded from a columnar
+        store). Return None otherwise."""
+        return None
+
     def to_dict(self) -> dict:
         return {}
 
@@ -112,13 +125,13 @@ class IProtocol(abc.ABC):
     def get_speaker_notes(self) -> dict[str, SpeakerNote]: ...
 
 
-@dataclass
+@dataclass(slots=True)
 class SpeakerNote:
     speaker_note_id: str
     speaker_note: str
 
 
-@dataclass
+@dataclass(slots=True)
 class PageReference:
     source_id: int
     page_number: int
@@ -129,7 +142,27 @@ MISSING_SPEAKER_NOTE: SpeakerNote = SpeakerNote(MISSING_SPEAKER_NOTE_ID, "")
 
 
 class Utterance:
-    """Represents an utterance in the ParlaClarin XML file"""
+    """Represents an utterance in the ParlaClarin XML file.
+
+    Slotted to keep the (very large number of) instances small. Paragraphs are packed into a single string
+    (joined by `delimiter`) and the offset of each paragraph's end. Ids and `who` are interned so that equal
+    values (e.g. `prev_id` and the previous utterance's `u_id`) share a single string.
+    """
+
+    __slots__ = (
+        'u_id',
+        'who',
+        'prev_id',
+        'next_id',
+        'annotation',
+        'page_number',
+        'speaker_note_id',
+        'num_tokens',
+        'num_words',
+        '_packed',
+        '_offsets',
+        '_text',
+    )
 
     delimiter: str = '\n'
 
@@ -146,16 +179,62 @@ class Utterance:
         speaker_note_id: str = MISSING_SPEAKER_NOTE.speaker_note_id,
         **_,
     ):
-        self.u_id: str = u_id
-        self.who: str = who
-        self.prev_id: str | None = prev_id if isinstance(prev_id, str) else None
-        self.next_id: str | None = next_id if isinstance(next_id, str) else None
-        self.paragraphs: list[str] = (
+        self.u_id: str = intern_str(u_id)
+        self.who: str = intern_str(who)
+        self.prev_id: str | None = intern_str(prev_id) if isinstance(prev_id, str) else None
+        self.next_id: str | None = intern_str(next_id) if isinstance(next_id, str) else None
+        self.paragraphs = (
             [] if not paragraphs else paragraphs if isinstance(paragraphs, list) else paragraphs.split(PARAGRAPH_MARKER)
         )
         self.annotation: Optional[str] = annotation if isinstance(annotation, str) else None
         self.page_number: int = page_number
-        self.speaker_note_id: str = speaker_note_id
+        self.speaker_note_id: str = intern_str(speaker_note_id)
+        """Assigned by tagger"""
+        self.num_tokens: int | None = None
+        self.num_words: int | None = None
+
+    def __getstate__(self) -> dict:
+        """Utterance's attributes (cached text is not included)."""
+        state: dict[str, Any] = {
+            'u_id': self.u_id,
+            'who': self.who,
+            'prev_id': self.prev_id,
+            'next_id': self.next_id,
+            'paragraphs': self.paragraphs,
+            'annotation': self.annotation,
+            'page_number': self.page_number,
+            'speaker_note_id': self.speaker_note_id,
+        }
+        for key in ('num_tokens', 'num_words'):
+            if getattr(self, key) is not None:
+                state[key] = getattr(self, key)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(**state)  # pylint: disable=unnecessary-dunder-call
+        self.num_tokens = state.get('num_tokens')
+        self.num_words = state.get('num_words')
+
+    @property
+    def paragraphs(self) -> list[str]:
+        if self._offsets is None:
+            return [self._packed]
+        return [self._packed[i : j - 1] for i, j in zip((0, *self._offsets), self._offsets)]
+
+    @paragraphs.setter
+    def paragraphs(self, paragraphs: list[str]) -> None:
+        """Pack paragraphs. Offsets are not stored for a single paragraph (the common case)."""
+        self._text = None
+        if len(paragraphs) == 1:
+            self._packed, self._offsets = paragraphs[0], None
+        else:
+            self._packed = self.delimiter.join(paragraphs)
+            self._offsets = array('I', itertools.accumulate(len(p) + 1 for p in paragraphs)) if paragraphs else ()
+
+    def invalidate(self) -> "Utterance":
+        """Reset cached text. Return self."""
+        self._text = None
+        return self
 
     @property
     def is_unknown(self) -> bool:
@@ -171,13 +250,31 @@ class Utterance:
 
     @property
     def text(self) -> str:
-        """Merge utterance paragraphs. Return text."""
-        return self.delimiter.join(p for p in self.paragraphs if p != '').strip()
+        """Merge utterance paragraphs. Return text. Text of a single paragraph is stripped from the packed string
+        (not cached, to avoid keeping a second copy of the text), text of several paragraphs is merged once."""
+        if self._offsets is None:
+            return self._packed.strip()
+        if self._text is None:
+            self._text = self.delimiter.join(p for p in self.paragraphs if p != '').strip()
+        return self._text
+
+    @property
+    def text_length(self) -> int:
+        return len(self.text)
 
     def checksum(self) -> str:
         """Compute checksum of utterance text."""
         return UtteranceHelper.compute_checksum(self.text)
 
+    @property
+    def tagged_body(self) -> str:
+        """Tagged CSV rows (without header)"""
+        return strip_csv_header(self.tagged_text)
+
+    def token_table(self) -> pa.Table | None:
+        """Tagged tokens as an Arrow table (only if loaded from a columnar store)"""
+        return None
+
     def to_str(self, what: ContentType) -> str | None:
         return self.tagged_text if what == ContentType.TaggedFrame else self.text
 
@@ -185,6 +282,92 @@ class Utterance:
         return UtteranceHelper.to_dict(self)
 
 
+class UtteranceMetadata(Utterance):
+    """Utterance loaded without paragraphs and annotation. Text length and token counts of the stored utterance
+    are kept, so that speeches can be merged (and counted) without loading the content."""
+
+    __slots__ = ('n_chars', 'n_tokens', 'n_words')
+
+    def __init__(self, *, n_chars: int = 0, n_tokens: int = 0, n_words: int = None, **kwargs):
+        super().__init__(**{**kwargs, 'paragraphs': None, 'annotation': None})
+        self.n_chars: int = n_chars or 0
+        self.n_tokens: int = n_tokens or 0
+        self.n_words: int | None = n_words
+
+    def __getstate__(self) -> dict:
+        return {**super().__getstate__(), 'n_chars': self.n_chars, 'n_tokens': self.n_tokens, 'n_words': self.n_words}
+
+    @property
+    def text_length(self) -> int:
+        return self.n_chars
+
+
+class TokenTableUtterance(Utterance):
+    """Utterance loaded from a columnar (Arrow) store. The annotation is kept as the utterance's slice of the
+    protocol's token table (and the tagged CSV header), and is formatted as tagged CSV only when requested."""
+
+    __slots__ = ('tokens', 'annotation_header')
+
+    def __init__(self, *, tokens: pa.Table = None, annotation_header: str = None, **kwargs):
+        super().__init__(**{**kwargs, 'annotation': None})
+        self.tokens: pa.Table | None = tokens if tokens is not None and tokens.num_rows > 0 else None
+        self.annotation_header: str | None = annotation_header
+
+    def __getstate__(self) -> dict:
+        """Only values of the utterance's tokens are pickled (not the entire table the slice refers to)"""
+        state: dict[str, Any] = {k: v for k, v in super().__getstate__().items() if k != 'annotation'}
+        return {**state, 'annotation_header': self.annotation_header, 'tokens': self.token_table()}
+
+    @property
+    def columns(self) -> list[str]:
+        """Tagged CSV columns (as given by header)"""
+        return self.annotation_header.rstrip('\n').split('\t') if self.annotation_header else []
+
+    def token_table(self) -> pa.Table | None:
+        """Tokens (CSV columns only) decoded to strings. Columns not in store are null."""
+        if self.tokens is None:
+            return None
+        return pa.table(
+            {
+                name: (
+                    self.tokens.column(name).cast(pa.string())
+                    if name in self.tokens.column_names
+                    else pa.nulls(self.tokens.num_rows, pa.string())
+                )
+                for name in self.columns
+            }
+        )
+
+    @property
+    def tagged_body(self) -> str:
+        if self.tokens is None:
+            return ''
+        rows: pa.ChunkedArray = pc.binary_join_element_wise(*self.token_table().columns, '\t', null_handling='replace')
+        return '\n'.join(rows.to_pylist())
+
+    @property
+    def tagged_text(self) -> str | None:
+        return self.annotation_header if self.tokens is None else self.annotation_header + self.tagged_body
+
+    @property
+    def tagged_text_length(self) -> int:
+        """Length of `tagged_text` computed from token lengths (without formatting)"""
+        header_length: int = len(self.annotation_header or '')
+        if self.tokens is None:
+            return header_length
+        n_rows: int = self.tokens.num_rows
+        n_chars: int = sum(
+            pc.sum(pc.fill_null(pc.utf8_length(column), 0)).as_py() or 0 for column in self.token_table().columns
+        )
+        return header_length + n_chars + n_rows * (len(self.columns) - 1) + n_rows - 1
+
+    @property
+    def tagged_newlines(self) -> int:
+        """Number of line breaks in `tagged_text`"""
+        n_header: int = (self.annotation_header or '').count('\n')
+        return n_header if self.tokens is None else n_header + self.tokens.num_rows - 1
+
+
 class UtteranceHelper:
     CSV_OPTS = dict(
         quoting=csv.QUOTE_MINIMAL,
@@ -193,16 +376,32 @@ class UtteranceHelper:
         sep='\t',
     )
 
+    """Arrow column type and value getter of (flat) utterance columns"""
+    ARROW_COLUMNS: dict[str, tuple[pa.DataType, Callable[[Utterance], Any]]] = {
+        'u_id': (pa.string(), lambda u: u.u_id),
+        'who': (pa.string(), lambda u: u.who),
+        'prev_id': (pa.string(), lambda u: u.prev_id),
+        'next_id': (pa.string(), lambda u: u.next_id),
+        'page_number': (pa.int64(), lambda u: u.page_number),
+        'speaker_note_id': (pa.string(), lambda u: u.speaker_note_id),
+        'paragraphs': (pa.string(), lambda u: PARAGRAPH_MARKER.join(u.paragraphs)),
+    }
+
     @staticmethod
-    def compute_paragraph_checksum(text: str | list[str]) -> str:
-        """Compute checksum of given text."""
+    def paragraphs_to_text(text: str | list[str]) -> str:
+        """Merge paragraphs (a list or a `PARAGRAPH_MARKER` packed string) same as `Utterance.text`."""
         if isinstance(text, str) and PARAGRAPH_MARKER in text:
             text = text.split(PARAGRAPH_MARKER)
 
         if isinstance(text, list):
-            text = Utterance.delimiter.join(p for p in text if p != '').strip()
+            text = Utterance.delimiter.join(p for p in text if p != '')
 
-        return UtteranceHelper.compute_checksum(text or "")
+        return (text or "").strip()
+
+    @staticmethod
+    def compute_paragraph_checksum(text: str | list[str]) -> str:
+        """Compute checksum of given text."""
+        return UtteranceHelper.compute_checksum(UtteranceHelper.paragraphs_to_text(text))
 
     @staticmethod
     def compute_checksum(text: str) -> str:
@@ -242,6 +441,23 @@ class UtteranceHelper:
             df: pd.DataFrame = pd.DataFrame(UtteranceHelper.to_dicts(utterances)).set_index('u_id')
         return df
 
+    @staticmethod
+    def to_record_batch(
+        utterances: Iterable[Utterance], columns: list[str] = None, metadata: dict[str, str] = None
+    ) -> pa.RecordBatch:
+        """Convert utterances to an Arrow record batch with (a subset of) `ARROW_COLUMNS`. Return batch.
+        Utterances are consumed in a single pass i.e. `utterances` can be a (streaming) iterator."""
+        columns = columns or list(UtteranceHelper.ARROW_COLUMNS)
+        getters: list[Callable[[Utterance], Any]] = [UtteranceHelper.ARROW_COLUMNS[c][1] for c in columns]
+        values: list[list[Any]] = [[] for _ in columns]
+        for u in utterances:
+            for column_values, getter in zip(values, getters):
+                column_values.append(getter(u))
+        schema: pa.Schema = pa.schema([(c, UtteranceHelper.ARROW_COLUMNS[c][0]) for c in columns], metadata=metadata)
+        return pa.RecordBatch.from_arrays(
+            [pa.array(v, type=dtype) for v, dtype in zip(values, schema.types)], schema=schema
+        )
+
     @staticmethod
     def to_vrt(utterances: list[Utterance], structural_tags: str = "") -> str:
         """Convert list of utterances to a VRT string. Return VRT string."""
@@ -262,7 +478,7 @@ class UtteranceHelper:
     @staticmethod
     def to_json(utterances: list[Utterance]) -> str:
         """Convert list of utterances to a JSON string. Return JSON string."""
-        json_str: str = ujson_dumps([u.__dict__ for u in utterances])
+        json_str: str = ujson_dumps([u.__getstate__() for u in utterances])
         return json_str
 
     @staticmethod
@@ -280,6 +496,91 @@ class UtteranceHelper:
     def merge_tagged_csv(csv_strings: list[str], sep: str = '\n') -> str:
         return merge_csv_strings(csv_strings, sep=sep)
 
+    @staticmethod
+    def merge_texts(utterances: list[Utterance], sep: str = '\n') -> str:
+        """Merge texts into a single string (same as `UtteranceMixIn.text`)"""
+        return sep.join(t for t in (u.text for u in utterances) if t != '').strip()
+
+    @staticmethod
+    def merge_content(utterances: list[Utterance], what: ContentType) -> str:
+        """Merge utterances' text or tagged text (same as `UtteranceMixIn.to_content_str`)"""
+        if what == ContentType.TaggedFrame:
+            return UtteranceHelper.merge_tagged_texts(utterances, sep='\n')
+        return UtteranceHelper.merge_texts(utterances, sep='\n')
+
+    @staticmethod
+    def tagged_body_offsets(utterances: list[Utterance], sep: str = '\n') -> Iterable[tuple[str, int]]:
+        """Tagged CSV strings that are included in `merge_tagged_texts`, and offset of each string's content in
+        merged string (i.e. 0 for first string and end of header for the others)."""
+        for i, csv_str in enumerate(u.tagged_text for u in utterances):
+            if i == 0:
+                yield csv_str, 0
+                continue
+            idx: int = csv_str.find(sep) if csv_str else -1
+            if 0 < idx < len(csv_str) - 1:
+                yield csv_str, idx + 1
+
+    @staticmethod
+    def tagged_body_sizes(utterances: list[Utterance], sep: str = '\n') -> Iterable[tuple[int, int]]:
+        """Length of content, and number of `sep`, of each tagged CSV string included in `merge_tagged_texts` (see
+        `tagged_body_offsets`). Sizes of utterances loaded from a columnar store are computed from token tables."""
+        if sep != '\n' or not all(isinstance(u, TokenTableUtterance) for u in utterances):
+            for csv_str, idx in UtteranceHelper.tagged_body_offsets(utterances, sep):
+                yield len(csv_str) - idx, csv_str.count(sep)
+            return
+        for i, u in enumerate(utterances):
+            if i == 0:
+                yield u.tagged_text_length, u.tagged_newlines
+            elif u.tokens is not None:
+                yield u.tagged_text_length - len(u.annotation_header), u.tagged_newlines
+
+    @staticmethod
+    def count_tagged_lines(utterances: list[Utterance], sep: str = '\n') -> int:
+        """Number of `sep` in `merge_tagged_texts(utterances)` computed from each utterance (without merging)."""
+        return sum(n for _, n in UtteranceHelper.tagged_body_sizes(utterances, sep))
+
+    @staticmethod
+    def merge_token_tables(utterances: list[Utterance]) -> pa.Table | None:
+        """Tokens of utterances (in columns of the first utterance's header) as a single Arrow table, i.e. same
+        content as `merge_tagged_texts` without formatting and parsing CSV. Return None if any utterance was not
+        loaded from a columnar store."""
+        if not utterances or not all(isinstance(u, TokenTableUtterance) for u in utterances):
+            return None
+        columns: list[str] = next((u.columns for u in utterances if u.columns), [])
+        tables: list[pa.Table] = [t for t in (u.token_table() for u in utterances) if t is not None]
+        if not tables:
+            return pa.table({name: pa.array([], pa.string()) for name in columns})
+        return pa.concat_tables(tables, promote_options='default').select(columns)
+
+    @staticmethod
+    def has_annotation(utterance: Utterance) -> bool:
+        """True if utterance has a (non-empty) tagged text"""
+        if isinstance(utterance, TokenTableUtterance):
+            return utterance.tokens is not None or bool(utterance.annotation_header)
+        return bool(utterance.tagged_text)
+
+    @staticmethod
+    def count_tokens(utterances: list[Utterance]) -> int:
+        """Number of tokens in merged tagged text (i.e. lines, as counted by `count_tagged_lines`). Stored counts
+        are used if utterances were loaded without annotation."""
+        if any(isinstance(u, UtteranceMetadata) for u in utterances):
+            return sum(u.n_tokens for u in utterances if isinstance(u, UtteranceMetadata))
+        if not any(UtteranceHelper.has_annotation(u) for u in utterances):
+            return 0
+        return UtteranceHelper.count_tagged_lines(utterances)
+
+    @staticmethod
+    def merged_content_length(utterances: list[Utterance], what: ContentType) -> int:
+        """Length of `merge_content(utterances, what)` computed from each utterance (without merging)."""
+        if not utterances:
+            return 0
+        if what == ContentType.TaggedFrame:
+            parts: list[int] = [n for n, _ in UtteranceHelper.tagged_body_sizes(utterances)]
+        else:
+            """Utterance texts are stripped, hence the merged text is not affected by `strip`"""
+            parts = [n for n in (u.text_length for u in utterances) if n > 0]
+        return sum(parts) + max(len(parts) - 1, 0)
+
 
 class UtteranceMixIn:
     def to_text(self, *, sep: str = '\n', require_letter: bool = False) -> str:
@@ -289,10 +590,26 @@ class UtteranceMixIn:
             return ""
         return t.strip()
 
+    def cached(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Return value of `compute` cached under `key` (until `invalidate` is called)."""
+        cache: dict[str, Any] = self.__dict__.setdefault('_cache', {})
+        if key not in cache:
+            cache[key] = compute()
+        return cache[key]
+
+    def invalidate(self, utterances: bool = False) -> Any:
+        """Reset cached (merged) content. Also resets utterances' cached text if `utterances` is True.
+        Must be called if utterances, or utterances' paragraphs, are changed. Return self."""
+        self.__dict__.pop('_cache', None)
+        if utterances:
+            for u in self.utterances:  # type: ignore
+                u.invalidate()
+        return self
+
     @property
     def text(self) -> str:
         """Join text of all utterances."""
-        return self.to_text(sep='\n', require_letter=False)
+        return self.cached('text', lambda: self.to_text(sep='\n', require_letter=False))
 
     @property
     def has_text(self) -> bool:
@@ -302,7 +619,9 @@ class UtteranceMixIn:
     @property
     def tagged_text(self) -> str:
         """Merge tagged texts for entire speech into a single CSV string."""
-        return UtteranceHelper.merge_tagged_texts(self.utterances, sep='\n')  # type: ignore
+        return self.cached(
+            'tagged_text', lambda: UtteranceHelper.merge_tagged_texts(self.utterances, sep='\n')  # type: ignore
+        )
 
     @property
     def has_tagged_text(self) -> bool:
@@ -384,7 +703,7 @@ class Speech(UtteranceMixIn):
 
     def add(self, item: Utterance) -> "Speech":
         self.utterances.append(item)
-        return self
+        return self.invalidate()
 
     def get_year(self) -> int:
         """Return year of speech."""
@@ -433,7 +752,7 @@ class Protocol(UtteranceMixIn, IProtocol):
         for uttr in self.utterances:
             uttr.paragraphs = [preprocess(p.strip()) for p in uttr.paragraphs]
 
-        return self
+        return self.invalidate(utterances=True)
 
     def checksum(self) -> Optional[str]:
         """Compute checksum for entire text."""
@@ -448,8 +767,52 @@ class Protocol(UtteranceMixIn, IProtocol):
         return self.speaker_notes
 
 
+class ProtocolBatchMetadata:
+    """Protocol level data stored as schema metadata of record batches created by `IProtocolParser.parse_to_arrow`"""
+
+    @staticmethod
+    def encode(
+        *,
+        name: str | None,
+        date: str | None,
+        preface_name: str | None,
+        speaker_notes: dict[str, SpeakerNote],
+        page_references: list[PageReference],
+    ) -> dict[str, str]:
+        """Encode protocol data. Preface name defaults to name (same as `Protocol`)."""
+        return dict(
+            name=name or "",
+            date=date or "",
+            preface_name=preface_name or name or "",
+            speaker_notes=ujson_dumps({k: v.speaker_note for k, v in (speaker_notes or {}).items()}),
+            page_references=ujson_dumps([(p.source_id, p.page_number, p.reference) for p in page_references or []]),
+        )
+
+    @staticmethod
+    def decode(metadata: dict[bytes, bytes] | None) -> dict[str, Any]:
+        """Decode protocol data (name, date, preface name, speaker notes and page references)."""
+        data: dict[str, str] = {k.decode('utf-8'): v.decode('utf-8') for k, v in (metadata or {}).items()}
+        return dict(
+            name=data.get('name', ""),
+            date=data.get('date') or None,
+            preface_name=data.get('preface_name', ""),
+            speaker_notes={k: SpeakerNote(k, v) for k, v in ujson_loads(data.get('speaker_notes') or "{}").items()},
+            page_references=[PageReference(*p) for p in ujson_loads(data.get('page_references') or "[]")],
+        )
+
+
 class IProtocolParser(abc.ABC):
     @staticmethod
     def parse(
         filename: str, *, use_preface_name: bool = False, ignore_tags: set[str]  # pylint: disable=unused-argument
     ) -> IProtocol: ...
+
+    @staticmethod
+    def iter_utterances(
+        filename: str, *, ignore_tags: set[str]  # pylint: disable=unused-argument
+    ) -> Iterator[Utterance]: ...
+
+    @staticmethod
+    def parse_to_arrow(
+        filename: str, *, use_preface_name: bool = False, ignore_tags: set[str]  # pylint: disable=unused-argument
+    ) -> pa.RecordBatch: ...
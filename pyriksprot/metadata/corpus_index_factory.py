@@ -1,11 +1,18 @@
 from __future__ import annotations
 
+import gzip
 import itertools
+import json
 import os
-from dataclasses import dataclass, field
-from typing import Sequence, Type
+from dataclasses import asdict, dataclass, field
+from functools import partial
+from multiprocessing import get_context
+from typing import Any, Callable, Sequence, Type
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from loguru import logger
 from tqdm import tqdm
 
@@ -15,93 +22,304 @@ from pyriksprot.corpus.utility import (
     load_chamber_indexes,
     ls_corpus_folder,
 )
-from pyriksprot.interface import MISSING_SPEAKER_NOTE, IProtocol, IProtocolParser, SpeakerNote, Speech
-from pyriksprot.to_speech import to_speeches
+from pyriksprot.interface import (
+    MISSING_SPEAKER_NOTE,
+    IProtocolParser,
+    PageReference,
+    ParlaClarinError,
+    ProtocolBatchMetadata,
+    SpeakerNote,
+    UtteranceHelper,
+)
+from pyriksprot.to_speech import MergeStrategyType, has_link, speech_source_checksum, to_speech_indices
+from pyriksprot.utility import compute_file_hash
 
 from .schema import MetadataSchema
 
 jj = os.path.join
+relpath = os.path.relpath
+
+"""Per protocol index data is collected as Arrow record batches (one per protocol) with these schemas"""
+UTTERANCE_INDEX_SCHEMA: pa.Schema = pa.schema(
+    [
+        ('document_id', pa.int64()),
+        ('u_id', pa.string()),
+        ('person_id', pa.string()),
+        ('speaker_note_id', pa.string()),
+        ('page_number', pa.int64()),
+    ]
+)
+"""Merge strategies stored in utterance speech index"""
+SPEECH_MERGE_STRATEGIES: list[MergeStrategyType] = [x for x in MergeStrategyType if x != MergeStrategyType.undefined]
+
+"""Utterance columns collected for speech segmentation (not stored in utterance index). Speech segmentation
+only depends on whether an utterance has a `prev_id` (`next_id`), hence only the flags are kept"""
+SPEECH_SOURCE_SCHEMA: pa.Schema = pa.schema(
+    [('has_prev', pa.bool_()), ('has_next', pa.bool_()), ('n_chars', pa.int64())]
+)
+SCAN_UTTERANCE_SCHEMA: pa.Schema = pa.schema([*UTTERANCE_INDEX_SCHEMA, *SPEECH_SOURCE_SCHEMA])
+
+"""Compact types of scanned record batches (decoded to `SCAN_UTTERANCE_SCHEMA` when batches are combined):
+dictionary encoded columns having few distinct values within a protocol, and 32-bit integers"""
+SCAN_BATCH_TYPES: dict[str, pa.DataType] = {
+    'document_id': pa.int32(),
+    'person_id': pa.dictionary(pa.int32(), pa.string()),
+    'speaker_note_id': pa.dictionary(pa.int32(), pa.string()),
+    'page_number': pa.int32(),
+    'n_chars': pa.int32(),
+}
+SCAN_BATCH_SCHEMA: pa.Schema = pa.schema(
+    [(f.name, SCAN_BATCH_TYPES.get(f.name, f.type)) for f in SCAN_UTTERANCE_SCHEMA]
+)
+PAGE_REFERENCE_INDEX_SCHEMA: pa.Schema = pa.schema(
+    [
+        ('document_id', pa.int64()),
+        ('source_id', pa.int64()),
+        ('page_number', pa.int64()),
+        ('reference', pa.string()),
+    ]
+)
+
+
+def scan_protocol(
+    args: tuple[int, str],
+    parser: IProtocolParser | Type[IProtocolParser],
+    protocol_to_chamber: dict[str, str],
+    use_preface_name: bool = False,
+) -> CorpusScanner.ScanResult:
+    """Scan a single protocol. Return index data for the protocol."""
+    document_id, filename = args
+    data: CorpusScanner.ScanResult = CorpusScanner.ScanResult()
+
+    batch: pa.RecordBatch = parser.parse_to_arrow(
+        filename, use_preface_name=use_preface_name, ignore_tags={"teiHeader"}
+    )
+    protocol: dict[str, Any] = ProtocolBatchMetadata.decode(batch.schema.metadata)
+
+    # FIXME: #77 change: Add chamber_abbrev to the protocol index
+    chamber_abbrev: str = protocol_to_chamber.get(protocol['name'])
+    if not chamber_abbrev:
+        chamber_abbrev = get_chamber_by_filename(filename)
+
+    formatted_name: str = format_protocol_name(protocol['name'], chamber_abbrev=chamber_abbrev)
+
+    data.protocols.append(
+        (document_id, protocol['name'], protocol['date'], int(protocol['date'][:4]), chamber_abbrev, formatted_name)
+    )
+    data.utterances.append(
+        pa.RecordBatch.from_arrays(
+            [
+                pa.array(np.full(batch.num_rows, document_id, dtype=np.int32)),
+                batch.column('u_id'),
+                batch.column('who').dictionary_encode(),
+                batch.column('speaker_note_id').dictionary_encode(),
+                batch.column('page_number').cast(pa.int32()),
+                pc.fill_null(pc.not_equal(batch.column('prev_id'), ""), False),
+                pc.fill_null(pc.not_equal(batch.column('next_id'), ""), False),
+                pa.array(
+                    [len(UtteranceHelper.paragraphs_to_text(p)) for p in batch.column('paragraphs').to_pylist()],
+                    type=pa.int32(),
+                ),
+            ],
+            schema=SCAN_BATCH_SCHEMA,
+        )
+    )
+    page_references: list[PageReference] = protocol['page_references']
+    data.page_references.append(
+        pa.RecordBatch.from_arrays(
+            [
+                pa.array(np.full(len(page_references), document_id, dtype=np.int64)),
+                pa.array([p.source_id for p in page_references], type=pa.int64()),
+                pa.array([p.page_number for p in page_references], type=pa.int64()),
+                pa.array([p.reference for p in page_references], type=pa.string()),
+            ],
+            schema=PAGE_REFERENCE_INDEX_SCHEMA,
+        )
+    )
+
+    data.speaker_notes.update(protocol['speaker_notes'])
+    data.speaker_note_documents.update((k, document_id) for k in protocol['speaker_notes'])
+
+    return data
+
+
+def create_speech_index(
+    protocols: pd.DataFrame, utterances: pa.Table, merge_strategy: str = 'chain', skip_size: int = 1
+) -> pd.DataFrame:
+    """Create speech index from scanned protocols (indexed by `document_id`) and utterances (in document order).
+    Speeches are identical to `to_speeches` (including skipping of speeches having text shorter than `skip_size`)
+    but are segmented for all protocols in a single vectorised pass."""
+    speech_index: np.ndarray = to_speech_indices(
+        utterances.rename_columns(['who' if x == 'person_id' else x for x in utterances.column_names]), merge_strategy
+    )
+    data: pd.DataFrame = utterances.select(['document_id', 'u_id', 'person_id', 'page_number', 'n_chars']).to_pandas()
+    data = data[speech_index >= 0].assign(
+        speech_index=speech_index[speech_index >= 0] + 1, has_text=lambda x: x.n_chars > 0
+    )
+    speeches: pd.DataFrame = (
+        data.groupby(['document_id', 'speech_index'], sort=False)
+        .agg(
+            speech_id=('u_id', 'first'),
+            person_id=('person_id', 'first'),
+            page_number=('page_number', 'first'),
+            n_chars=('n_chars', 'sum'),
+            n_texts=('has_text', 'sum'),
+        )
+        .reset_index()
+    )
+
+    """Length of merged speech text is sum of non-empty utterance texts and separators"""
+    if skip_size > 0:
+        speeches = speeches[speeches.n_chars + np.maximum(speeches.n_texts - 1, 0) >= skip_size]
+
+    protocol_names: pd.Series = speeches.document_id.map(protocols.document_name).astype(str)
+    return (
+        speeches.assign(
+            year=speeches.document_id.map(protocols.year).astype(np.int64),
+            document_name=protocol_names + "_" + speeches.speech_index.map('{:03}'.format),
+            protocol_name=protocol_names,
+            num_tokens=0,
+            num_words=0,
+        )[
+            [
+                'speech_id',
+                'person_id',
+                'year',
+                'document_name',
+                'protocol_name',
+                'speech_index',
+                'page_number',
+                'num_tokens',
+                'num_words',
+            ]
+        ]
+        .set_index('speech_id')
+        .fillna("")
+    )
+
+
+def create_speech_source_checksums(utterances: pa.Table) -> np.ndarray:
+    """Checksum (see `speech_source_checksum`) of each utterance's document (utterances in document order)."""
+    if utterances.num_rows == 0:
+        return np.zeros(0, dtype=object)
+    document_ids: np.ndarray = utterances.column('document_id').to_numpy()
+    columns: list[list] = [utterances.column(x).to_pylist() for x in ['u_id', 'who', 'speaker_note_id']] + [
+        has_link(utterances, 'prev').tolist(),
+        has_link(utterances, 'next').tolist(),
+    ]
+    bounds: np.ndarray = np.flatnonzero(np.r_[True, document_ids[1:] != document_ids[:-1], True])
+    checksums: np.ndarray = np.empty(len(document_ids), dtype=object)
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        checksums[a:b] = speech_source_checksum(*(values[a:b] for values in columns))
+    return checksums
+
+
+def create_strategy_speech_index(source: pa.Table, merge_strategy: MergeStrategyType) -> pd.arrays.IntegerArray:
+    """Create (1-based) speech index of utterances (in document order) for `merge_strategy`. Protocols that cannot
+    be segmented by `merge_strategy` (e.g. multiple speakers in same speech) are not indexed (index is NA)."""
+    try:
+        return pd.array(to_speech_indices(source, merge_strategy) + 1, dtype="Int64")
+    except ParlaClarinError:
+        pass
+    document_ids: np.ndarray = source.column('document_id').to_numpy()
+    bounds: np.ndarray = np.flatnonzero(np.r_[True, document_ids[1:] != document_ids[:-1], True])
+    indices: pd.arrays.IntegerArray = pd.array(np.zeros(len(document_ids), dtype=np.int64), dtype="Int64")
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        try:
+            indices[a:b] = to_speech_indices(source.slice(a, b - a), merge_strategy) + 1
+        except ParlaClarinError as ex:
+            logger.warning(f"speech index: document {document_ids[a]} not indexed by {merge_strategy.value} ({ex})")
+            indices[a:b] = pd.NA
+    return indices
+
+
+def create_utterance_speech_index(utterances: pa.Table) -> pd.DataFrame:
+    """Create speech assignments of utterances (in document order) for each merge strategy. The speech index
+    (1-based, same as `Speech.speech_index`) is zero for utterances that are not part of any speech, and empty
+    for protocols that cannot be segmented by the strategy. Each row holds the checksum of its protocol's
+    segmentation source, used for detecting stale entries."""
+    source: pa.Table = utterances.rename_columns(['who' if x == 'person_id' else x for x in utterances.column_names])
+    return pd.DataFrame(
+        {
+            'u_id': utterances.column('u_id').to_numpy(),
+            'document_id': utterances.column('document_id').to_numpy(),
+            'checksum': create_speech_source_checksums(source),
+            **{strategy.value: create_strategy_speech_index(source, strategy) for strategy in SPEECH_MERGE_STRATEGIES},
+        }
+    ).set_index('u_id')
 
 
 class CorpusScanner:
     @dataclass
     class ScanResult:
         protocols: list[tuple[int, str, str, str, str]] = field(default_factory=list)
-        utterances: list[tuple] = field(default_factory=list)
-        page_references: list[tuple] = field(default_factory=list)
+        utterances: list[pa.RecordBatch] = field(default_factory=list)
+        page_references: list[pa.RecordBatch] = field(default_factory=list)
         speaker_notes: dict[str, SpeakerNote] = field(default_factory=dict)
-        speeches: list[Speech] = field(default_factory=list)
+        speaker_note_documents: dict[str, int] = field(default_factory=dict)
+
+        @property
+        def speeches(self) -> pd.DataFrame:
+            """Speech index ('chain' merged speeches) of scanned protocols, segmented in a single vectorised pass."""
+            return create_speech_index(
+                pd.DataFrame(
+                    data=[(p[0], p[1], p[3]) for p in self.protocols], columns=['document_id', 'document_name', 'year']
+                ).set_index('document_id'),
+                self.utterance_table(),
+            )
+
+        def utterance_table(self) -> pa.Table:
+            """Scanned utterances (in document order) with dictionary encoded columns decoded."""
+            return pa.Table.from_batches(self.utterances, schema=SCAN_BATCH_SCHEMA).cast(SCAN_UTTERANCE_SCHEMA)
+
+        def extend(self, other: CorpusScanner.ScanResult) -> CorpusScanner.ScanResult:
+            """Append result of (subsequent) documents. Return self."""
+            self.protocols.extend(other.protocols)
+            self.utterances.extend(other.utterances)
+            self.page_references.extend(other.page_references)
+            self.speaker_notes.update(other.speaker_notes)
+            self.speaker_note_documents.update(other.speaker_note_documents)
+            return self
 
     def __init__(self, parser: IProtocolParser | Type[IProtocolParser]) -> None:
         self.parser: IProtocolParser | Type[IProtocolParser] = parser
 
     def scan(
-        self, filenames: Sequence[str], chambers: dict[str, set[str]], use_preface_name: bool = False
+        self,
+        filenames: Sequence[str],
+        chambers: dict[str, set[str]],
+        use_preface_name: bool = False,
+        processes: int = 1,
+        chunksize: int = 4,
+        document_ids: Sequence[int] | None = None,
     ) -> CorpusScanner.ScanResult:
+        """Scan protocols in `filenames`. Document ids are assigned in `filenames` order (unless `document_ids` given).
+        If `processes` > 1 then files are parsed by a process pool. The result is identical
+        to a serial scan since partial results are merged in document id order."""
         protocol_to_chamber: dict[str, str] = {v: k for k, p in chambers.items() for v in p}
 
-        data: CorpusScanner.ScanResult = CorpusScanner.ScanResult()
-        # FIXME: #77 change: Add chamber_abbrev to the protocol index
-        for document_id, filename in tqdm(enumerate(filenames)):
-            protocol: IProtocol = self.parser.parse(
-                filename, use_preface_name=use_preface_name, ignore_tags={"teiHeader"}
-            )
-            chamber_abbrev: str = protocol_to_chamber.get(protocol.name)
-            if not chamber_abbrev:
-                chamber_abbrev = get_chamber_by_filename(filename)
-
-            formatted_name: str = format_protocol_name(protocol.name, chamber_abbrev=chamber_abbrev)
+        scan_document: Callable[[tuple[int, str]], CorpusScanner.ScanResult] = partial(
+            scan_protocol,
+            parser=self.parser,
+            protocol_to_chamber=protocol_to_chamber,
+            use_preface_name=use_preface_name,
+        )
 
-            data.protocols.append(
-                (document_id, protocol.name, protocol.date, int(protocol.date[:4]), chamber_abbrev, formatted_name)
-            )
-            data.utterances.extend(
-                tuple([document_id, u.u_id, u.who, u.speaker_note_id, u.page_number]) for u in protocol.utterances
-            )
-            data.page_references.extend(
-                tuple([document_id, p.source_id, p.page_number, p.reference]) for p in protocol.page_references
-            )
-            data.speeches.extend(to_speeches(protocol=protocol, merge_strategy='chain') or [])
+        data: CorpusScanner.ScanResult = CorpusScanner.ScanResult()
+        documents: list[tuple[int, str]] = list(
+            zip(document_ids, filenames) if document_ids is not None else enumerate(filenames)
+        )
 
-            data.speaker_notes.update(protocol.get_speaker_notes())
+        if (processes or 1) > 1:
+            with get_context("spawn").Pool(processes=processes) as executor:
+                for item in tqdm(executor.imap(scan_document, documents, chunksize=chunksize), total=len(documents)):
+                    data.extend(item)
+        else:
+            for item in tqdm(map(scan_document, documents), total=len(documents)):
+                data.extend(item)
 
         return data
 
-    # def parallel_scan(self, filenames: Sequence[str]) -> CorpusScanner.ScanResult:
-    #     data: CorpusScanner.ScanResult = CorpusScanner.ScanResult()
-
-    #     # Function to process a single file
-    #     def process_file(document_id, filename):
-    #         protocol: IProtocol = self.parser.parse(filename, ignore_tags={"teiHeader"})
-    #         protocols = (document_id, protocol.name, protocol.date, int(protocol.date[:4]))
-    #         utterances = [
-    #             (document_id, u.u_id, u.who, u.speaker_note_id, u.page_number) for u in protocol.utterances
-    #         ]
-    #         page_references = [
-    #             (document_id, p.source_id, p.page_number, p.reference) for p in protocol.page_references
-    #         ]
-    #         speaker_notes = protocol.get_speaker_notes()
-    #         return protocols, utterances, page_references, speaker_notes
-
-    #     # Parallel processing with ThreadPoolExecutor
-    #     with ThreadPoolExecutor() as executor:
-    #         futures = {
-    #             executor.submit(process_file, document_id, filename): filename
-    #             for document_id, filename in enumerate(filenames)
-    #         }
-
-    #         # Process each future as it completes
-    #         for future in tqdm(as_completed(futures), total=len(futures)):
-    #             protocols, utterances, page_references, speaker_notes = future.result()
-
-    #             # Append and extend data to the main ScanResult object
-    #             data.protocols.append(protocols)
-    #             data.utterances.extend(utterances)
-    #             data.page_references.extend(page_references)
-    #             data.speaker_notes.update(speaker_notes)
-
-    #     return data
-
     def to_dataframes(self, result: CorpusScanner.ScanResult) -> dict[str, pd.DataFrame]:
         """Store enough source reference data to reconstruct source urls."""
 
@@ -110,14 +328,14 @@ class CorpusScanner:
             columns=['document_id', 'document_name', 'date', 'year', 'chamber_abbrev', 'protocol_name'],
         ).set_index("document_id")
 
-        utterances: pd.DataFrame = pd.DataFrame(
-            data=result.utterances,
-            columns=['document_id', 'u_id', 'person_id', 'speaker_note_id', 'page_number'],
-        ).set_index("u_id")
+        utterance_table: pa.Table = result.utterance_table()
+        utterances: pd.DataFrame = utterance_table.select(UTTERANCE_INDEX_SCHEMA.names).to_pandas().set_index("u_id")
 
-        page_references: pd.DataFrame = pd.DataFrame(
-            data=result.page_references, columns=['document_id', 'source_id', 'page_number', 'reference']
-        ).set_index(['document_id', 'page_number'], drop=True)
+        page_references: pd.DataFrame = (
+            pa.Table.from_batches(result.page_references, schema=PAGE_REFERENCE_INDEX_SCHEMA)
+            .to_pandas()
+            .set_index(['document_id', 'page_number'], drop=True)
+        )
 
         source_references: pd.DataFrame = (
             page_references[page_references.reference != ""]  # pylint: disable=unsubscriptable-object
@@ -138,39 +356,7 @@ class CorpusScanner:
             .set_index('speaker_note_id')
             .fillna("")
         )
-        speeches: pd.DataFrame = (
-            pd.DataFrame(
-                itertools.chain(
-                    (
-                        (
-                            x.speech_id,
-                            x.who,
-                            x.get_year(),
-                            x.document_name,
-                            x.protocol_name,
-                            x.speech_index,
-                            x.page_number,
-                            x.num_tokens,
-                            x.num_words,
-                        )
-                        for x in result.speeches
-                    )
-                ),
-                columns=[
-                    'speech_id',
-                    'person_id',
-                    'year',
-                    'document_name',
-                    'protocol_name',
-                    'speech_index',
-                    'page_number',
-                    'num_tokens',
-                    'num_words',
-                ],
-            )
-            .set_index('speech_id')
-            .fillna("")
-        )
+        speeches: pd.DataFrame = result.speeches
         protocol_ids: set[int] = set(utterances.document_id.unique())
         empty_protocols: pd.DataFrame = protocols[~protocols.index.isin(protocol_ids)]
 
@@ -182,17 +368,153 @@ class CorpusScanner:
             "source_references": source_references,
             "speaker_notes": speaker_notes_data,
             "empty_protocols": empty_protocols,
+            "utterance_speeches": create_utterance_speech_index(utterance_table),
         }
 
 
+"""Index columns of generated corpus index tables"""
+INDEX_COLUMNS: dict[str, list[str]] = {
+    "protocols": ["document_id"],
+    "utterances": ["u_id"],
+    "speeches": ["speech_id"],
+    "page_references": ["document_id", "page_number"],
+    "source_references": ["document_id"],
+    "speaker_notes": ["speaker_note_id"],
+    "empty_protocols": ["document_id"],
+    "utterance_speeches": ["u_id"],
+}
+
+MANIFEST_FILENAME: str = "manifest.json.gz"
+
+
+@dataclass
+class CorpusIndexManifest:
+    """Size, mtime, checksum and document id of each indexed protocol (keyed by path relative to corpus folder).
+    Also keeps the chamber indexes and the protocol (document id) that each speaker note belongs to."""
+
+    protocols: dict[str, dict[str, Any]] = field(default_factory=dict)
+    speaker_notes: dict[str, int] = field(default_factory=dict)
+    chambers: dict[str, list[str]] = field(default_factory=dict)
+
+    @staticmethod
+    def fingerprint(filename: str, previous: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Size, mtime and checksum of `filename`. Checksum is reused from `previous` if size and mtime are unchanged."""
+        stat: os.stat_result = os.stat(filename)
+        item: dict[str, Any] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns}
+        if previous and all(previous.get(k) == v for k, v in item.items()):
+            return item | {'checksum': previous['checksum']}
+        return item | {'checksum': compute_file_hash(filename)}
+
+    @staticmethod
+    def create(
+        *,
+        corpus_folder: str,
+        filenames: Sequence[str],
+        document_ids: Sequence[int],
+        chambers: dict[str, set[str]],
+        speaker_notes: dict[str, int],
+        previous: CorpusIndexManifest | None = None,
+    ) -> CorpusIndexManifest:
+        protocols: dict[str, dict[str, Any]] = {}
+        for document_id, filename in zip(document_ids, filenames):
+            name: str = relpath(filename, corpus_folder)
+            protocols[name] = {
+                'document_id': document_id,
+                **CorpusIndexManifest.fingerprint(filename, previous.protocols.get(name) if previous else None),
+            }
+        return CorpusIndexManifest(
+            protocols=protocols, speaker_notes=speaker_notes, chambers=CorpusIndexManifest.to_lists(chambers)
+        )
+
+    @staticmethod
+    def to_lists(chambers: dict[str, set[str]]) -> dict[str, list[str]]:
+        return {k: sorted(v) for k, v in sorted(chambers.items())}
+
+    def is_changed(self, corpus_folder: str, name: str) -> bool:
+        """True if protocol `name` has changed since it was indexed."""
+        previous: dict[str, Any] = self.protocols[name]
+        return self.fingerprint(jj(corpus_folder, name), previous)['checksum'] != previous['checksum']
+
+    def store(self, filename: str) -> None:
+        with gzip.open(filename, "wt", encoding="utf-8") as fp:
+            json.dump(asdict(self), fp)
+
+    @staticmethod
+    def load(filename: str) -> CorpusIndexManifest | None:
+        if not os.path.isfile(filename):
+            return None
+        with gzip.open(filename, "rt", encoding="utf-8") as fp:
+            return CorpusIndexManifest(**json.load(fp))
+
+
+def get_document_ids(df: pd.DataFrame) -> np.ndarray:
+    return (df['document_id'] if 'document_id' in df.columns else df.index.get_level_values('document_id')).to_numpy()
+
+
+def sort_by_document_id(df: pd.DataFrame, document_ids: np.ndarray | None = None) -> pd.DataFrame:
+    """Stable sort on document id i.e. rows of a document are kept in document order."""
+    document_ids = get_document_ids(df) if document_ids is None else document_ids
+    return df.iloc[np.argsort(document_ids, kind='stable')]
+
+
+def replace_documents(previous: pd.DataFrame, data: pd.DataFrame, document_ids: set[int]) -> pd.DataFrame:
+    """Replace rows of `document_ids` in `previous` with `data`."""
+    kept: pd.DataFrame = previous[~np.isin(get_document_ids(previous), list(document_ids))]
+    return sort_by_document_id(pd.concat([kept, data]) if len(data) > 0 else kept)
+
+
+def patch_index(
+    previous: dict[str, pd.DataFrame], data: dict[str, pd.DataFrame], document_ids: set[int], speaker_note_ids: set[str]
+) -> dict[str, pd.DataFrame]:
+    """Replace index data of (changed or removed) `document_ids` in `previous` with (new) index `data`."""
+
+    protocols: pd.DataFrame = replace_documents(previous['protocols'], data['protocols'], document_ids)
+    utterances: pd.DataFrame = replace_documents(previous['utterances'], data['utterances'], document_ids)
+
+    replaced_names: set[str] = set(previous['protocols'][previous['protocols'].index.isin(document_ids)].document_name)
+    speeches: pd.DataFrame = previous['speeches'][~previous['speeches'].protocol_name.isin(replaced_names)]
+    speeches = pd.concat([speeches, data['speeches']]) if len(data['speeches']) > 0 else speeches
+    speeches = sort_by_document_id(
+        speeches,
+        speeches.protocol_name.map(pd.Series(protocols.index, index=protocols.document_name)).to_numpy(),
+    )
+
+    speaker_notes: pd.DataFrame = previous['speaker_notes'].drop(index=list(speaker_note_ids), errors='ignore')
+    new_speaker_notes: pd.DataFrame = data['speaker_notes'].drop(
+        index=MISSING_SPEAKER_NOTE.speaker_note_id, errors='ignore'
+    )
+    if len(new_speaker_notes) > 0:
+        speaker_notes = pd.concat([speaker_notes, new_speaker_notes])
+        speaker_notes = speaker_notes[~speaker_notes.index.duplicated(keep='last')]
+
+    return {
+        "protocols": protocols,
+        "utterances": utterances,
+        "speeches": speeches,
+        "page_references": replace_documents(previous['page_references'], data['page_references'], document_ids),
+        "source_references": replace_documents(previous['source_references'], data['source_references'], document_ids),
+        "speaker_notes": speaker_notes,
+        "empty_protocols": protocols[~protocols.index.isin(set(utterances.document_id.unique()))],
+        "utterance_speeches": replace_documents(
+            previous['utterance_speeches'], data['utterance_speeches'], document_ids
+        ),
+    }
+
+
 class CorpusIndexFactory:
     def __init__(self, parser: IProtocolParser | Type[IProtocolParser], schema: MetadataSchema | str) -> None:
         self.parser: IProtocolParser | Type[IProtocolParser] = parser
         self.data: dict[str, pd.DataFrame] = {}
+        self.speaker_notes: dict[str, int] = {}
+        self.manifest: CorpusIndexManifest | None = None
         self.sep: str = '\t'
         self.schema: MetadataSchema = schema if isinstance(schema, MetadataSchema) else MetadataSchema(schema)
 
-    def generate(self, corpus_folder: str, target_folder: str) -> CorpusIndexFactory:
+    def generate(
+        self, corpus_folder: str, target_folder: str, processes: int = 1, incremental: bool = False
+    ) -> CorpusIndexFactory:
+        """Generate corpus index. If `incremental` then only new, changed and removed protocols since
+        previous index (in `target_folder`) was generated are (re-)indexed."""
         logger.info("Corpus index: generating utterance, protocol, speaker notes and page reference indices.")
         logger.info(f"     Source: {corpus_folder}")
         logger.info(f"     Target: {target_folder}")
@@ -201,14 +523,109 @@ class CorpusIndexFactory:
         filenames: list[str] = ls_corpus_folder(corpus_folder)
         chambers: dict[str, set[str]] = load_chamber_indexes(corpus_folder)
 
-        return self.collect(filenames, chambers).to_csv(target_folder)
+        if incremental:
+            previous: CorpusIndexManifest | None = self.load_manifest(target_folder)
+            if previous is not None and previous.chambers == CorpusIndexManifest.to_lists(chambers):
+                return self.update(corpus_folder, filenames, chambers, target_folder, previous, processes).to_csv(
+                    target_folder
+                )
+            logger.info("Corpus index: no previous index (or chambers have changed), generating full index.")
+
+        self.collect(filenames, chambers, processes=processes)
+        self.manifest = CorpusIndexManifest.create(
+            corpus_folder=corpus_folder,
+            filenames=filenames,
+            document_ids=range(len(filenames)),
+            chambers=chambers,
+            speaker_notes=self.speaker_notes,
+        )
+        return self.to_csv(target_folder)
+
+    def update(
+        self,
+        corpus_folder: str,
+        filenames: list[str],
+        chambers: dict[str, set[str]],
+        folder: str,
+        previous: CorpusIndexManifest,
+        processes: int = 1,
+    ) -> CorpusIndexFactory:
+        """Patch index in `folder` with new, changed and removed protocols. Indexed protocols keep their document ids."""
+
+        names: dict[str, str] = {relpath(filename, corpus_folder): filename for filename in filenames}
+
+        removed: list[str] = [name for name in previous.protocols if name not in names]
+        changed: list[str] = [
+            name for name in names if name in previous.protocols and previous.is_changed(corpus_folder, name)
+        ]
+        added: list[str] = sorted(name for name in names if name not in previous.protocols)
+
+        logger.info(f"Corpus index: {len(added)} new, {len(changed)} changed and {len(removed)} removed protocols.")
+
+        next_id: int = max((item['document_id'] for item in previous.protocols.values()), default=-1) + 1
+        document_ids: dict[str, int] = {
+            name: item['document_id'] for name, item in previous.protocols.items() if name in names
+        } | {name: next_id + i for i, name in enumerate(added)}
+
+        replaced_ids: set[int] = {previous.protocols[name]['document_id'] for name in changed + removed}
+
+        self.collect(
+            [names[name] for name in changed + added],
+            chambers,
+            processes=processes,
+            document_ids=[document_ids[name] for name in changed + added],
+        )
 
-    def collect(self, filenames: list[str], chambers: dict[str, set[str]]) -> CorpusIndexFactory:
+        self.data = patch_index(
+            self.load(folder),
+            self.data,
+            replaced_ids,
+            {k for k, document_id in previous.speaker_notes.items() if document_id in replaced_ids},
+        )
+
+        self.speaker_notes = {
+            k: document_id for k, document_id in previous.speaker_notes.items() if document_id not in replaced_ids
+        } | self.speaker_notes
+
+        self.manifest = CorpusIndexManifest.create(
+            corpus_folder=corpus_folder,
+            filenames=list(names.values()),
+            document_ids=[document_ids[name] for name in names],
+            chambers=chambers,
+            speaker_notes=self.speaker_notes,
+            previous=previous,
+        )
+        return self
+
+    def collect(
+        self,
+        filenames: list[str],
+        chambers: dict[str, set[str]],
+        processes: int = 1,
+        document_ids: Sequence[int] | None = None,
+    ) -> CorpusIndexFactory:
         service: CorpusScanner = CorpusScanner(self.parser)
-        scan_result: CorpusScanner.ScanResult = service.scan(filenames, chambers)
+        scan_result: CorpusScanner.ScanResult = service.scan(
+            filenames, chambers, processes=processes, document_ids=document_ids
+        )
         self.data = service.to_dataframes(scan_result)
+        self.speaker_notes = scan_result.speaker_note_documents
         return self
 
+    def load(self, folder: str) -> dict[str, pd.DataFrame]:
+        """Load previously generated index from `folder`."""
+        return {
+            tablename: pd.read_csv(
+                jj(folder, f"{tablename}.csv.gz"), sep=self.sep, index_col=columns, keep_default_na=False
+            )
+            for tablename, columns in INDEX_COLUMNS.items()
+        }
+
+    def load_manifest(self, folder: str) -> CorpusIndexManifest | None:
+        if not folder or not all(os.path.isfile(jj(folder, f"{tablename}.csv.gz")) for tablename in INDEX_COLUMNS):
+            return None
+        return CorpusIndexManifest.load(jj(folder, MANIFEST_FILENAME))
+
     def to_csv(self, folder: str) -> CorpusIndexFactory:
         if folder:
             os.makedirs(folder, exist_ok=True)
@@ -217,6 +634,9 @@ class CorpusIndexFactory:
                 filename: str = jj(folder, f"{tablename}.csv.gz")
                 df.to_csv(filename, sep=self.sep, compression=dict(method='gzip', mtime=0))
 
+            if self.manifest is not None:
+                self.manifest.store(jj(folder, MANIFEST_FILENAME))
+
             logger.info("Corpus index: stored.")
 
         return self
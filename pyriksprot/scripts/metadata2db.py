@@ -79,9 +79,15 @@ def download(target_folder: str, version: str):
 @click.argument('corpus_folder', type=str)
 @click.argument('target_folder', type=str)
 @click.argument('version', type=str)
-def index(corpus_folder: str, target_folder: str, version: str) -> None:
+@click.option('--processes', type=int, help='Number of processes used to scan corpus', default=1)
+@click.option(
+    '--incremental', type=bool, is_flag=True, help='Only index new, changed or removed protocols', default=False
+)
+def index(corpus_folder: str, target_folder: str, version: str, processes: int = 1, incremental: bool = False) -> None:
     factory: md.CorpusIndexFactory = md.CorpusIndexFactory(ProtocolMapper, schema=md.MetadataSchema(version=version))
-    factory.generate(corpus_folder=corpus_folder, target_folder=target_folder)
+    factory.generate(
+        corpus_folder=corpus_folder, target_folder=target_folder, processes=processes, incremental=incremental
+    )
 
 
 @main.command()
@@ -109,6 +115,7 @@ def index(corpus_folder: str, target_folder: str, version: str) -> None:
     help='Load extra scripts from the SQL module. If not specified, only the scripts in the config are loaded.',
     default=False,
 )
+@click.option('--processes', type=int, help='Number of processes used to scan corpus', default=1)
 def database(
     config_filename: str,
     target_filename: str = None,
@@ -121,6 +128,7 @@ def database(
     skip_load_scripts: bool = False,
     skip_download_metadata: bool = False,
     load_extra_scripts: bool = False,
+    processes: int = 1,
 ) -> None:
     """Create a database from metadata configuration"""
     try:
@@ -151,6 +159,7 @@ def database(
             skip_load_scripts=skip_load_scripts,
             load_extra_scripts=load_extra_scripts,
             force=force,
+            processes=processes,
         )
 
     except Exception as ex:
@@ -0,0 +1,67 @@
+import sys
+
+import click
+from loguru import logger
+
+from pyriksprot.corpus.parlaclarin import IterParseProtocolMapper, ProtocolCache, ProtocolMapper
+from pyriksprot.corpus.utility import ls_corpus_folder
+
+# pylint: disable=too-many-arguments, too-many-positional-arguments
+
+PARSERS: dict = {'iterparse': IterParseProtocolMapper, 'untangle': ProtocolMapper}
+
+
+@click.group(help="CLI tool to manage cache of parsed ParlaClarin protocols")
+def main(): ...
+
+
+@main.command()
+@click.argument('source_folder', type=str)
+@click.argument('cache_folder', type=str)
+@click.option('--pattern', default=None, type=str, help='Source files pattern (default: prot-*.xml)')
+@click.option('--parser', default='iterparse', type=click.Choice(list(PARSERS)), help='XML parser')
+@click.option('--max-size', default=None, type=int, help='Max cache size in bytes')
+@click.option('--use-hash', default=False, is_flag=True, help='Include content hash in cache key')
+@click.option('--use-preface-name', default=False, is_flag=True, help='Use preface name as protocol name')
+def warm(
+    source_folder: str,
+    cache_folder: str,
+    pattern: str,
+    parser: str,
+    max_size: int,
+    use_hash: bool,
+    use_preface_name: bool,
+) -> None:
+    """Parse and cache all protocols in SOURCE_FOLDER not already in cache."""
+    try:
+        cache: ProtocolCache = ProtocolCache(cache_folder, max_size=max_size, use_hash=use_hash)
+        filenames: list[str] = sorted(ls_corpus_folder(source_folder, pattern=pattern))
+        n_parsed: int = cache.warm(
+            filenames, PARSERS[parser], use_preface_name=use_preface_name, ignore_tags={"teiHeader"}
+        )
+        logger.info(f"protocol cache: parsed {n_parsed} of {len(filenames)} protocols")
+    except Exception as ex:
+        logger.error(ex)
+        sys.exit(-1)
+
+
+@main.command()
+@click.argument('cache_folder', type=str)
+@click.option('--max-size', default=None, type=int, help='Evict least recently used entries above this size (bytes)')
+@click.option('--all', 'remove_all', default=False, is_flag=True, help='Remove all entries')
+def prune(cache_folder: str, max_size: int, remove_all: bool) -> None:
+    """Remove stale entries and evict least recently used entries from CACHE_FOLDER."""
+    try:
+        cache: ProtocolCache = ProtocolCache(cache_folder, max_size=max_size)
+        if remove_all:
+            cache.clear()
+            return
+        removed: list[str] = cache.prune()
+        logger.info(f"protocol cache: removed {len(removed)} entries, size is now {cache.size()} bytes")
+    except Exception as ex:
+        logger.error(ex)
+        sys.exit(-1)
+
+
+if __name__ == "__main__":
+    main()
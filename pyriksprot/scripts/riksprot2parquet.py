@@ -0,0 +1,29 @@
+import sys
+
+import click
+from loguru import logger
+
+from pyriksprot.corpus.parlaclarin import IterParseProtocolMapper, ProtocolMapper
+from pyriksprot.corpus.parquet import store_corpus
+
+PARSERS: dict = {'iterparse': IterParseProtocolMapper, 'untangle': ProtocolMapper}
+
+
+@click.command()
+@click.argument('source_folder', type=str)
+@click.argument('target_folder', type=str)
+@click.option('--parser', default='iterparse', type=click.Choice(list(PARSERS)), help='XML parser')
+@click.option('--processes', default=1, type=click.IntRange(1, 40), help='Number of processes to use')
+@click.option('--compression', default='zstd', type=str, help='Parquet compression codec')
+def main(source_folder: str, target_folder: str, parser: str, processes: int, compression: str) -> None:
+    """Convert ParlaClarin XML corpus in SOURCE_FOLDER to a Parquet utterance store (partitioned by year and
+    chamber) in TARGET_FOLDER."""
+    try:
+        store_corpus(source_folder, target_folder, parser=PARSERS[parser], processes=processes, compression=compression)
+    except Exception as ex:
+        logger.error(ex)
+        sys.exit(-1)
+
+
+if __name__ == "__main__":
+    main()
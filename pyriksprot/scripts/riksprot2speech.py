@@ -22,6 +22,7 @@ warnings.filterwarnings("ignore", category=FutureWarning)
 @option2('--compress-type')
 @option2('--content-type')
 @option2('--merge-strategy')
+@option2('--speech-index-filename')
 @option2('--multiproc-processes')
 @option2('--skip-lemma')
 @option2('--skip-text')
@@ -39,6 +40,7 @@ def main(
     target_type: str = None,
     content_type: str = 'tagged_frame',
     merge_strategy: str = 'chain',
+    speech_index_filename: str = None,
     compress_type: str = 'feather',
     multiproc_processes: int = 1,
     skip_lemma: bool = False,
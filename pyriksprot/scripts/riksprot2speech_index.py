@@ -25,6 +25,7 @@ warnings.filterwarnings("ignore", category=FutureWarning)
 @click.argument('metadata-filename', type=click.STRING)
 @option2('--options-filename')
 @option2('--merge-strategy')
+@option2('--speech-index-filename')
 @option2('--multiproc-processes')
 def main(
     options_filename: str = None,
@@ -32,6 +33,7 @@ def main(
     target_name: str = None,
     metadata_filename: str = None,
     merge_strategy: str = 'chain',
+    speech_index_filename: str = None,
     multiproc_processes: int = 1,
 ):
     """Extracts a speech index from given speech corpus"""
@@ -36,6 +36,7 @@ Extract speech texts from a ParlaCLARIN corpus.
 @option2('--subfolder-key')
 @option2('--naming-key')
 @option2('--merge-strategy')
+@option2('--speech-index-filename')
 @option2('--years')
 @option2('--skip-size')
 @option2('--multiproc-processes')
@@ -54,6 +55,7 @@ def main(
     subfolder_key: TemporalKey = None,
     naming_key: Sequence[GroupingKey] = None,
     merge_strategy: str = "chain",
+    speech_index_filename: str = None,
     years: str = None,
     skip_size: int = 1,
     multiproc_processes: int = 1,
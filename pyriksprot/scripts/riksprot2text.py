@@ -42,6 +42,8 @@ Extract an aggregated subset of ParlaCLARIN XML corpus.
 @option2('--multiproc-keep-order')
 @option2('--dedent')
 @option2('--dehyphen')
+@option2('--parquet-folder')
+@option2('--speech-index-filename')
 @option2('--force')
 def main(
     options_filename: str = None,
@@ -59,6 +61,8 @@ def main(
     multiproc_keep_order: str = None,
     dedent: bool = False,
     dehyphen: bool = False,
+    parquet_folder: str = None,
+    speech_index_filename: str = None,
     force: bool = False,
 ):
     try:
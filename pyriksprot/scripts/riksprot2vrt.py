@@ -26,6 +26,7 @@ warnings.filterwarnings("ignore", category=FutureWarning)
 )
 @click.option('--metadata-filename', '-m', type=str, required=True, help="Metadata database filename.")
 @click.option('--merge-strategy', type=str, default="chain_consecutive_unknowns", help="Speech merge strategy.")
+@click.option('--speech-index-filename', type=str, default=None, help="Merge speeches using stored speech index.")
 @click.option('--processes', type=int, default=1, help="Number of processes to use.")
 @click.option('--force', is_flag=True, default=False, help="Force overwrite of existing files")
 @click.option('--batch-tag', '-t', type=str, multiple=False, required=False, default='year', help="Batch tag.")
@@ -36,6 +37,7 @@ def export_yearly_folders(
     structural_tag: list[str] = None,
     metadata_filename: str = None,
     merge_strategy: str = "chain_consecutive_unknowns",
+    speech_index_filename: str = None,
     processes: int = 1,
     force: bool = False,
 ):
@@ -64,7 +66,9 @@ def export_yearly_folders(
         for target in existing_targets:
             remove(target)
     speaker_service: SpeakerInfoService = SpeakerInfoService(metadata_filename)
-    exporter: VrtBatchExporter = VrtBatchExporter(speaker_service, merge_strategy=merge_strategy, processes=processes)
+    exporter: VrtBatchExporter = VrtBatchExporter(
+        speaker_service, merge_strategy=merge_strategy, speech_index_filename=speech_index_filename, processes=processes
+    )
     exporter.export(batches, *structural_tag)
     # except Exception as ex:
     #    click.echo(ex)
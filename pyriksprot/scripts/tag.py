@@ -20,6 +20,12 @@ from pyriksprot.workflows.tag import ITagger, TaggerProvider, tag_protocols
 @click.option('--skip-version-check', is_flag=True, default=False, help='Skip version check')
 @click.option('--recursive', is_flag=True, default=True, help='Recurse subfolders')
 @click.option('--pattern', type=str, default="**/prot-*-*.xml", help='Recurse subfolders')
+@click.option(
+    '--batch-tokens',
+    type=int,
+    default=None,
+    help='Tag utterances of many protocols in batches of at most this many tokens',
+)
 def main(
     config_filename: str,
     source_folder: str,
@@ -28,6 +34,7 @@ def main(
     skip_version_check: bool = False,
     recursive: bool = True,
     pattern: str = "**/prot-*-*.xml",
+    batch_tokens: int | None = None,
 ) -> None:
     tagit(
         config_filename=config_filename,
@@ -37,6 +44,7 @@ def main(
         check_version=not skip_version_check,
         recursive=recursive,
         pattern=pattern,
+        batch_tokens=batch_tokens,
     )
 
 
@@ -48,6 +56,7 @@ def tagit(
     recursive: bool = True,
     pattern: str | None = None,
     check_version: bool = True,
+    batch_tokens: int | None = None,
 ):
     # check_cuda()
 
@@ -73,6 +82,7 @@ def tagit(
         force=force,
         recursive=recursive,
         pattern=pattern,
+        batch_tokens=batch_tokens,
     )
 
     logger.info("workflow ended")
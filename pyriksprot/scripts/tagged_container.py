@@ -0,0 +1,53 @@
+import sys
+
+import click
+from loguru import logger
+
+from pyriksprot.corpus.corpus_index import CorpusManifest
+from pyriksprot.corpus.tagged import pack_corpus, unpack_corpus
+
+
+@click.group(help="CLI tool to manage storage of a tagged corpus (single file container and manifest)")
+def main(): ...
+
+
+@main.command()
+@click.argument('source_folder', type=str)
+@click.argument('target_filename', type=str)
+@click.option('--pattern', default='**/prot-*.zip', type=str, help='Source files pattern')
+def pack(source_folder: str, target_filename: str, pattern: str) -> None:
+    """Pack tagged protocols in SOURCE_FOLDER into container TARGET_FILENAME (*.pack)."""
+    try:
+        pack_corpus(source_folder, target_filename, pattern=pattern)
+    except Exception as ex:
+        logger.error(ex)
+        sys.exit(-1)
+
+
+@main.command()
+@click.argument('source_filename', type=str)
+@click.argument('target_folder', type=str)
+def unpack(source_filename: str, target_folder: str) -> None:
+    """Unpack tagged protocols in container SOURCE_FILENAME into TARGET_FOLDER."""
+    try:
+        n_items: int = unpack_corpus(source_filename, target_folder)
+        logger.info(f"unpacked {n_items} archives into {target_folder}")
+    except Exception as ex:
+        logger.error(ex)
+        sys.exit(-1)
+
+
+@main.command()
+@click.argument('source_folder', type=str)
+@click.option('--pattern', default='**/prot-*.zip', type=str, help='Source files pattern')
+def manifest(source_folder: str, pattern: str) -> None:
+    """Create or update manifest of tagged protocols in SOURCE_FOLDER (only changed protocols are read)."""
+    try:
+        CorpusManifest.update(source_folder, source_pattern=pattern)
+    except Exception as ex:
+        logger.error(ex)
+        sys.exit(-1)
+
+
+if __name__ == "__main__":
+    main()
@@ -45,6 +45,8 @@ CLI_OPTIONS = {
     '--subfolder-key': dict(default=None, help='Subfolder sort key', type=click.STRING),
     '--years': dict(default=None, help='Years to include in output', type=click.STRING),
     '--force': dict(default=False, help='Force remove of existing files', is_flag=True),
+    '--parquet-folder': dict(default=None, type=str, help='Read utterances from Parquet store in this folder'),
+    '--speech-index-filename': dict(default=None, type=str, help='Merge speeches using stored utterance speech index'),
     '--dehyphen-folder': dict(default='.', type=str, help='Path to dehypen data folder (word-frequencies etc)'),
 }
 
@@ -1,15 +1,21 @@
 from __future__ import annotations
 
 import abc
+import functools
+import hashlib
 import inspect
 from collections import defaultdict
 from enum import Enum
 from itertools import groupby
-from typing import TYPE_CHECKING, Type
+from typing import TYPE_CHECKING, Literal, Sequence, Type
 
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
 from loguru import logger
 
-from .interface import Speech
+from .interface import ContentType, ParlaClarinError, Speech, UtteranceHelper
 
 if TYPE_CHECKING:
     from .interface import Protocol, Utterance
@@ -50,7 +56,9 @@ def to_speeches(
     ]
 
     if skip_size > 0:
-        speeches = [s for s in speeches if len(s.text or "") >= skip_size]
+        speeches = [
+            s for s in speeches if UtteranceHelper.merged_content_length(s.utterances, ContentType.Text) >= skip_size
+        ]
 
     return speeches
 
@@ -170,6 +178,112 @@ class MergeByChainAndConsecutiveUnknowns(MergeByChain):
         super().__init__(True)
 
 
+class MergeBySpeechIndex(IMergeStrategy):
+    """Merge utterances by precomputed speech index (see `compute_speech_indices`), given in utterance order.
+    Utterances having a negative index are not part of any speech."""
+
+    def __init__(self, speech_indices: Sequence[int]):
+        self.speech_indices: Sequence[int] = speech_indices
+
+    def cluster(self, utterances: list[Utterance]) -> list[list[Utterance]]:
+        indices: np.ndarray = np.asarray(self.speech_indices)
+        if len(indices) != len(utterances or []):
+            raise ValueError("speech indices do not match utterances")
+
+        if len(indices) == 0:
+            return []
+
+        if np.all(indices[1:] >= indices[:-1]):
+            """Speeches are consecutive runs of utterances (all strategies but `who`): slice utterance list"""
+            bounds: list[int] = [0, *(np.flatnonzero(indices[1:] != indices[:-1]) + 1).tolist(), len(indices)]
+            return [utterances[a:b] for a, b in zip(bounds[:-1], bounds[1:]) if indices[a] >= 0]
+
+        groups: dict[int, list[Utterance]] = {}
+        for u, i in zip(utterances, indices):
+            if i >= 0:
+                groups.setdefault(i, []).append(u)
+        return [groups[i] for i in sorted(groups)]
+
+
+def speech_source_checksum(
+    u_ids: Sequence[str],
+    who: Sequence[str],
+    speaker_note_ids: Sequence[str | None],
+    has_prev: Sequence[bool],
+    has_next: Sequence[bool],
+) -> str:
+    """Checksum of the utterance attributes that speech segmentation depends on (in utterance order)."""
+    digest = hashlib.md5()
+    for values in zip(u_ids, who, speaker_note_ids, has_prev, has_next):
+        digest.update(f"{values[0]}\t{values[1]}\t{values[2] or ''}\t{int(values[3])}{int(values[4])}\n".encode())
+    return digest.hexdigest()
+
+
+def utterances_checksum(utterances: list[Utterance]) -> str:
+    return speech_source_checksum(
+        [u.u_id for u in utterances],
+        [u.who for u in utterances],
+        [u.speaker_note_id for u in utterances],
+        [bool(u.prev_id) for u in utterances],
+        [bool(u.next_id) for u in utterances],
+    )
+
+
+@functools.lru_cache(maxsize=4)
+def load_stored_speech_index(filename: str, merge_strategy: str) -> dict[str, tuple[str, np.ndarray]]:
+    """Load speech index of `merge_strategy` from an utterance speech index file (see `CorpusIndexFactory`).
+    Return (zero based) speech indices of each protocol keyed by the protocol's first u_id (with the protocol's
+    `speech_source_checksum`). Index files lacking checksums are ignored (all protocols are considered stale), as
+    are protocols not indexed by `merge_strategy` (empty index)."""
+    data: pd.DataFrame = pd.read_csv(filename, sep='\t', nrows=0)
+    if 'checksum' not in data.columns:
+        logger.warning(f"{filename}: speech index has no checksums (stale index ignored)")
+        return {}
+    data = pd.read_csv(
+        filename, sep='\t', usecols=['u_id', 'document_id', 'checksum', merge_strategy], keep_default_na=False
+    )
+    u_ids: np.ndarray = data.u_id.to_numpy()
+    checksums: np.ndarray = data.checksum.to_numpy()
+    document_ids: np.ndarray = data.document_id.to_numpy()
+    missing: np.ndarray = (data[merge_strategy].astype(str) == "").to_numpy()
+    indices: np.ndarray = pd.to_numeric(data[merge_strategy].where(~missing, 0)).to_numpy() - 1
+    bounds: np.ndarray = np.flatnonzero(np.r_[True, document_ids[1:] != document_ids[:-1], True])
+    return {u_ids[a]: (checksums[a], indices[a:b]) for a, b in zip(bounds[:-1], bounds[1:]) if not missing[a:b].any()}
+
+
+class MergeByStoredSpeechIndex(IMergeStrategy):
+    """Merge utterances using speech assignments of `merge_strategy` precomputed by `CorpusIndexFactory` (stored
+    in `utterance_speeches.csv.gz`). The index is loaded once per process. Protocols not found in index, or having
+    changed since the index was created (checksum mismatch), are clustered by `merge_strategy`."""
+
+    def __init__(self, filename: str, merge_strategy: MergeStrategyType | str = MergeStrategyType.chain):
+        self.filename: str = filename
+        self.merge_strategy: str = MergeStrategyType(merge_strategy).value
+
+    def cluster(self, utterances: list[Utterance]) -> list[list[Utterance]]:
+        if not utterances:
+            return []
+
+        stored: tuple[str, np.ndarray] | None = load_stored_speech_index(self.filename, self.merge_strategy).get(
+            utterances[0].u_id
+        )
+
+        if stored is None or len(stored[1]) != len(utterances) or stored[0] != utterances_checksum(utterances):
+            logger.debug(f"{utterances[0].u_id}: protocol not found in (or changed since) speech index, clustering")
+            return MergerFactory.get(self.merge_strategy).cluster(utterances)
+
+        return MergeBySpeechIndex(stored[1]).cluster(utterances)
+
+
+def resolve_merge_strategy(
+    merge_strategy: MergeStrategyType | str | IMergeStrategy, speech_index_filename: str | None = None
+) -> MergeStrategyType | str | IMergeStrategy:
+    """Use stored speech index `speech_index_filename` (if given) for merging utterances by `merge_strategy`."""
+    if not speech_index_filename or not isinstance(merge_strategy, str):
+        return merge_strategy
+    return MergeByStoredSpeechIndex(speech_index_filename, merge_strategy)
+
+
 class UndefinedMerge(IMergeStrategy):
     def cluster(self, utterances: list[Utterance]) -> list[list[Utterance]]:
         raise ValueError("undefined merge strategy encountered")
@@ -190,7 +304,9 @@ class MergerFactory:
     }
 
     @staticmethod
-    def get(strategy: str | Type[IMergeStrategy]) -> IMergeStrategy:
+    def get(strategy: str | Type[IMergeStrategy] | IMergeStrategy) -> IMergeStrategy:
+        if isinstance(strategy, IMergeStrategy):
+            return strategy
         return (
             strategy()
             if inspect.isclass(strategy) and issubclass(strategy, IMergeStrategy)
@@ -200,3 +316,155 @@ class MergerFactory:
                 else MergerFactory.strategies.get('undefined')
             )
         )  # type: ignore
+
+
+def compute_speech_starts(
+    *,
+    document_ids: np.ndarray,
+    who: np.ndarray,
+    speaker_note_ids: np.ndarray,
+    has_prev: np.ndarray,
+    has_next: np.ndarray,
+    merge_strategy: MergeStrategyType | str,
+    unknown: int = -1,
+) -> np.ndarray:
+    """Utterances that start a new speech (except for `who` strategy) according to `merge_strategy`.
+    See `compute_speech_indices` for arguments."""
+    n: int = len(document_ids)
+    is_first: np.ndarray = np.ones(n, dtype=bool)
+    is_first[1:] = document_ids[1:] != document_ids[:-1]
+
+    who_changed: np.ndarray = np.ones(n, dtype=bool)
+    who_changed[1:] = who[1:] != who[:-1]
+    note_changed: np.ndarray = np.ones(n, dtype=bool)
+    note_changed[1:] = speaker_note_ids[1:] != speaker_note_ids[:-1]
+
+    if merge_strategy == MergeStrategyType.who_sequence:
+        return is_first | who_changed
+
+    if merge_strategy == MergeStrategyType.speaker_note_id_sequence:
+        return is_first | note_changed
+
+    if merge_strategy == MergeStrategyType.who_speaker_note_id_sequence:
+        return is_first | who_changed | note_changed
+
+    if merge_strategy in (MergeStrategyType.chain, MergeStrategyType.chain_consecutive_unknowns):
+        """Same rules as `MergeByChain.group_utterances_by_chain`"""
+        is_unknown_continuation: np.ndarray = np.zeros(n, dtype=bool)
+        if merge_strategy == MergeStrategyType.chain_consecutive_unknowns:
+            is_unknown_continuation[1:] = (who[1:] == unknown) & (who[:-1] == unknown) & ~note_changed[1:]
+            is_unknown_continuation &= ~has_prev & ~has_next & ~is_first
+        return ~has_prev & ~is_unknown_continuation
+
+    raise ValueError(f"undefined merge strategy encountered: {merge_strategy}")
+
+
+def compute_speech_indices(
+    *,
+    document_ids: np.ndarray,
+    who: np.ndarray,
+    speaker_note_ids: np.ndarray,
+    has_prev: np.ndarray,
+    has_next: np.ndarray,
+    merge_strategy: MergeStrategyType | str,
+    unknown: int = -1,
+) -> np.ndarray:
+    """Vectorised speech segmentation of (many) protocols' utterances. Returns the (zero based) index of each
+    utterance's speech within its protocol, identical to the order of speeches returned by `to_speeches` (before
+    speeches are skipped by size), or -1 if the utterance is not part of any speech.
+
+    Args:
+        document_ids (np.ndarray): Integer protocol id of each utterance. Utterances of a protocol must be
+            consecutive, and in protocol order.
+        who (np.ndarray): Integer encoded `who`.
+        speaker_note_ids (np.ndarray): Integer encoded `speaker_note_id`.
+        has_prev (np.ndarray): True if utterance has a `prev_id`.
+        has_next (np.ndarray): True if utterance has a `next_id`.
+        merge_strategy (MergeStrategyType | str): Merge strategy (any but `undefined`).
+        unknown (int, optional): Code of `who` for unknown speaker. Defaults to -1.
+    """
+    document_ids = np.asarray(document_ids)
+    who = np.asarray(who)
+    n: int = len(document_ids)
+
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    is_first: np.ndarray = np.ones(n, dtype=bool)
+    is_first[1:] = document_ids[1:] != document_ids[:-1]
+
+    if merge_strategy == MergeStrategyType.who:
+        """One speech per (document, who) in order of first appearance. Since documents are consecutive, codes of
+        a document's speeches are consecutive and start at the code of the document's first utterance"""
+        codes: np.ndarray = pd.factorize(document_ids.astype(np.int64) * (int(who.max()) + 1) + who)[0]
+        return codes - np.maximum.accumulate(np.where(is_first, codes, 0))
+
+    is_start: np.ndarray = compute_speech_starts(
+        document_ids=document_ids,
+        who=who,
+        speaker_note_ids=np.asarray(speaker_note_ids),
+        has_prev=np.asarray(has_prev, dtype=bool),
+        has_next=np.asarray(has_next, dtype=bool),
+        merge_strategy=merge_strategy,
+        unknown=unknown,
+    )
+
+    """Number of starts up to and including each utterance within its document (0 => before first speech)"""
+    counts: np.ndarray = np.cumsum(is_start)
+    counts = counts - np.maximum.accumulate(np.where(is_first, counts - is_start, 0))
+
+    """Continuation utterances must have the same speaker as the first utterance in speech"""
+    groups: np.ndarray = np.cumsum(is_start | is_first) - 1
+    group_who: np.ndarray = who[np.flatnonzero(is_start | is_first)]
+    if np.any(who != group_who[groups]):
+        raise ParlaClarinError("multiple speakers in same speech not allowed")
+
+    return counts - 1
+
+
+def encode_column(values: pa.ChunkedArray | pa.Array) -> tuple[np.ndarray, pa.Array]:
+    """Integer encode column (codes in order of first appearance). Return codes and distinct values."""
+    encoded: pa.DictionaryArray = pc.dictionary_encode(values, null_encoding='encode')
+    if isinstance(encoded, pa.ChunkedArray):
+        encoded = encoded.unify_dictionaries().combine_chunks()
+    return encoded.indices.to_numpy(zero_copy_only=False), encoded.dictionary
+
+
+def is_not_empty(values: pa.ChunkedArray | pa.Array) -> np.ndarray:
+    return np.asarray(pc.fill_null(pc.greater(pc.utf8_length(values), 0), False))
+
+
+def has_link(utterances: pa.Table, name: Literal['prev', 'next']) -> np.ndarray:
+    """True if utterance has a `prev_id` (`next_id`), given by either the id column or a `has_prev` (`has_next`)
+    boolean column."""
+    if f'has_{name}' in utterances.column_names:
+        return np.asarray(pc.fill_null(utterances[f'has_{name}'], False))
+    return is_not_empty(utterances[f'{name}_id'])
+
+
+def to_speech_indices(utterances: pa.Table, merge_strategy: MergeStrategyType | str) -> np.ndarray:
+    """Vectorised speech segmentation of a table of utterances (see `compute_speech_indices`) having columns
+    `document_id`, `who`, `speaker_note_id`, `prev_id` and `next_id` (or boolean `has_prev` and `has_next`).
+    Utterances are grouped by `document_id` (keeping utterance order within each document). Return speech index
+    of each row."""
+    if utterances.num_rows == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    document_ids, _ = encode_column(utterances['document_id'])
+    order: np.ndarray = np.argsort(document_ids, kind='stable')
+    who, who_values = encode_column(utterances['who'])
+    unknown: int = who_values.index("unknown").as_py()
+
+    indices: np.ndarray = compute_speech_indices(
+        document_ids=document_ids[order],
+        who=who[order],
+        speaker_note_ids=encode_column(utterances['speaker_note_id'])[0][order],
+        has_prev=has_link(utterances, 'prev')[order],
+        has_next=has_link(utterances, 'next')[order],
+        merge_strategy=merge_strategy,
+        unknown=unknown,
+    )
+
+    result: np.ndarray = np.empty_like(indices)
+    result[order] = indices
+    return result
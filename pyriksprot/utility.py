@@ -6,6 +6,7 @@ import contextlib
 import functools
 import glob
 import gzip
+import hashlib
 import inspect
 import json
 import lzma
@@ -13,6 +14,7 @@ import os
 import pathlib
 import re
 import shutil
+import sys
 import tempfile
 import time
 import unicodedata
@@ -223,6 +225,11 @@ def flatten(lofl: list[list[T]]) -> list[T]:
     return [item for sublist in lofl for item in sublist]
 
 
+def intern_str(value: T) -> T:
+    """Intern `value` if it is a string (so that equal values share a single object)."""
+    return sys.intern(str(value)) if isinstance(value, str) else value
+
+
 def hasattr_path(data: Any, path: str) -> bool:
     """Tests if attrib string in dot-notation is present in data."""
     attribs = path.split(".")
@@ -426,6 +433,15 @@ def is_empty(filename: str) -> bool:
     return os.path.exists(filename) and os.stat(filename).st_size == 0
 
 
+def compute_file_hash(filename: str) -> str:
+    """Compute SHA-1 of file content."""
+    sha: Any = hashlib.sha1()
+    with open(filename, "rb") as fp:
+        for block in iter(lambda: fp.read(1 << 20), b""):
+            sha.update(block)
+    return sha.hexdigest()
+
+
 def strip_csv_header(csv_str: str, sep: str = '\n') -> str:
     """Remove header line from `csv_str`"""
     if not csv_str:
@@ -42,8 +42,9 @@ def create_database_workflow(  # pylint: disable=too-many-arguments
     skip_load_scripts: bool = False,
     load_extra_scripts: bool = False,
     force: bool = False,
+    processes: int = 1,
 ) -> None:
-    """Create a database from metadata configuration"""
+    """Create a database from metadata configuration (`processes` is the number of processes used to index corpus)"""
     try:
         schema: MetadataSchema = MetadataSchema(metadata_version)
 
@@ -67,7 +68,7 @@ def create_database_workflow(  # pylint: disable=too-many-arguments
 
             """ Create index from corpus for protocols, utterances and speaker notes """
             index_service: md.CorpusIndexFactory = md.CorpusIndexFactory(ProtocolMapper, schema=schema)
-            index_service.generate(corpus_folder=corpus_folder, target_folder=metadata_folder)
+            index_service.generate(corpus_folder=corpus_folder, target_folder=metadata_folder, processes=processes)
 
         db: database.DatabaseInterface = resolve_backend(db_opts)
 
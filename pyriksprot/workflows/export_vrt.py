@@ -12,7 +12,7 @@ import tqdm
 
 from pyriksprot.corpus.tagged.persist import load_protocols
 from pyriksprot.metadata.person import SpeakerInfo, SpeakerInfoService
-from pyriksprot.utility import strip_csv_header, xml_escape
+from pyriksprot.utility import xml_escape
 
 from .. import interface
 from .. import to_speech as mu  # pylint: disable=import-outside-toplevel
@@ -35,9 +35,14 @@ def vrt_exporter(func):
 
 
 class VrtExportService:
-    def __init__(self, speaker_service: SpeakerInfoService, merge_strategy: str = "chain_consecutive_unknowns"):
+    def __init__(
+        self,
+        speaker_service: SpeakerInfoService,
+        merge_strategy: str = "chain_consecutive_unknowns",
+        speech_index_filename: str = None,
+    ):
         self.speaker_service: SpeakerInfoService = speaker_service
-        self.merge_strategy: str = merge_strategy
+        self.merge_strategy: str | mu.IMergeStrategy = mu.resolve_merge_strategy(merge_strategy, speech_index_filename)
 
     @overload
     def to_vrt(self, entity: interface.Utterance, *tags: tuple[str]) -> str: ...
@@ -62,7 +67,7 @@ class VrtExportService:
     # @vrt_exporter
     def _utterance_to_vrt(self, utterance: interface.Utterance, *tags: tuple[str]) -> str:
         if not tags:
-            return xml_escape(strip_csv_header(utterance.annotation))
+            return xml_escape(utterance.tagged_body)
 
         # if 'sentence' in tags or 'paragraph' in tags:
         #     # TODO: Tagged data frames must contain sentence/paragraph markers
@@ -70,7 +75,7 @@ class VrtExportService:
         #     # 2) Or sentence or paragraph markers are included in the tagged text on separate lines
         #     raise NotImplementedError("Export to VRT with sentence/paragraph structural tags is not implemented yet.")
 
-        vrt_str: str = xml_escape(strip_csv_header(utterance.annotation))
+        vrt_str: str = xml_escape(utterance.tagged_body)
 
         if 'utterance' in tags:
             vrt_str = f'<utterance id="{utterance.u_id}" page_number="{utterance.page_number}" who="{utterance.who}">\n{vrt_str}</utterance>\n'
@@ -80,7 +85,7 @@ class VrtExportService:
     # @vrt_exporter
     def _speech_to_vrt(self, speech: interface.Speech, *tags: tuple[str]) -> str:
         if tags is None:
-            return xml_escape(strip_csv_header(speech.tagged_text))
+            return xml_escape(_tagged_body(speech.utterances))
 
         speaker_info: SpeakerInfo = self.speaker_service.get_speaker_info(
             u_id=speech.speech_id, person_id=speech.who, year=speech.get_year()
@@ -123,7 +128,7 @@ class VrtExportService:
         """Local import do avoid circular dependency"""
 
         if tags is None:
-            return xml_escape(strip_csv_header(protocol.tagged_text))
+            return xml_escape(_tagged_body(protocol.utterances))
 
         vrt_str: str = ''
         if 'speech' in tags:
@@ -183,6 +188,12 @@ def _open_output(output: str) -> TextIOWrapper | TextIO:
     return open(output, 'w', encoding="utf8")
 
 
+def _tagged_body(utterances: list[interface.Utterance]) -> str:
+    """Tagged rows (without headers) of utterances. Utterances loaded from a columnar store are formatted directly
+    from their token tables."""
+    return '\n'.join(body for body in (u.tagged_body for u in utterances) if body)
+
+
 def _xml_start_tag(tag: str, **attribs) -> str:
     """Generate XML open tag with optional attributes."""
     attrib_str: str = " ".join((f"{k}=\"{v}\"" for k, v in attribs.items()))
@@ -193,13 +204,19 @@ class VrtBatchExporter:
     """Export a batch(es) of protocols on disk to VRT format."""
 
     def __init__(
-        self, speaker_service: str | SpeakerInfoService, merge_strategy: str = "chain_consecutive_unknowns", **opts
+        self,
+        speaker_service: str | SpeakerInfoService,
+        merge_strategy: str = "chain_consecutive_unknowns",
+        speech_index_filename: str = None,
+        **opts,
     ):
         self.merge_strategy: str = merge_strategy
         self.speaker_service: SpeakerInfoService = (
             speaker_service if isinstance(speaker_service, SpeakerInfoService) else SpeakerInfoService(speaker_service)
         )
-        self.export_service: VrtExportService = VrtExportService(self.speaker_service, self.merge_strategy)
+        self.export_service: VrtExportService = VrtExportService(
+            self.speaker_service, self.merge_strategy, speech_index_filename=speech_index_filename
+        )
         self.opts: dict = opts
 
     @overload
@@ -6,15 +6,13 @@ from typing import Sequence
 
 from loguru import logger
 
-from pyriksprot.corpus.iterate import ProtocolSegment
 from pyriksprot.corpus.parlaclarin import iterate
 
-from .. import dehyphenation
 from .. import dispatch as sd
 from .. import interface
 from .. import metadata as md
-from .. import preprocess as pp
 from ..corpus import corpus_index
+from .segment_preprocess import SegmentPreprocessor
 
 # pylint: disable=too-many-arguments, too-many-positional-arguments
 
@@ -31,6 +29,7 @@ def extract_speech_texts(
     subfolder_key: interface.TemporalKey = None,
     naming_keys: Sequence[interface.GroupingKey] = None,
     merge_strategy: str = "chain",
+    speech_index_filename: str = None,
     years: str = None,
     skip_size: int = 1,
     multiproc_keep_order: str = None,
@@ -57,6 +56,7 @@ def extract_speech_texts(
         subfolder_key (str, optional): Sub-folder key used in store. Defaults to None.
         naming_keys (Sequence[str], optional): Naming keys. Defaults to None.
         merge_strategy (str, optional): Speech merge strategy. Defaults to `chain`.
+        speech_index_filename (str, optional): Merge speeches using stored utterance speech index. Defaults to None.
         years (str, optional): Years filter. Defaults to None.
         skip_size (int, optional): Speech text length skip size. Defaults to 1.
         multiproc_keep_order (str, optional): Force correct iterate yield order when multiprocessing. Defaults to None.
@@ -72,30 +72,16 @@ def extract_speech_texts(
     )
     lookups: md.Codecs = md.Codecs().load(metadata_filename)
 
-    dehypenator: dehyphenation.SwedishDehyphenator | None = (  # type: ignore
-        dehyphenation.SwedishDehyphenator(data_folder=dehyphen_folder, word_frequencies=None) if dehyphen else None
+    preprocess: SegmentPreprocessor = SegmentPreprocessor(
+        dedent=dedent, dehyphen=dehyphen, dehyphen_folder=dehyphen_folder, metadata_filename=metadata_filename
     )
 
-    if dehyphen:
-        if not dehypenator.word_frequencies:
-            raise ValueError("dehyphenation requires word frequencies (frequency file empty or not specified)")
-
-    speaker_service: md.SpeakerInfoService = md.SpeakerInfoService(database_filename=metadata_filename)
-
-    def preprocess(item: ProtocolSegment) -> None:
-        if dedent:
-            item.data = pp.dedent(item.data)
-
-        if dehypenator:
-            item.data = dehypenator.dehyphen_text(item.data)  # pylint: disable=not-callable
-
-        item.speaker_info = speaker_service.get_speaker_info(u_id=item.u_id, person_id=item.who, year=item.year)
-
     segments: iterate.XmlUntangleSegmentIterator = iterate.XmlUntangleSegmentIterator(
         filenames=source_index.paths,
         segment_level=interface.SegmentLevel.Speech,
         segment_skip_size=skip_size,
         merge_strategy=merge_strategy,
+        speech_index_filename=speech_index_filename,
         multiproc_keep_order=multiproc_keep_order,
         multiproc_processes=multiproc_processes,
         multiproc_chunksize=multiproc_chunksize,
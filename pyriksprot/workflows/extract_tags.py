@@ -14,6 +14,8 @@ from .. import metadata as md
 from .. import to_speech
 from ..corpus import corpus_index
 from ..dispatch import dispatch, merge
+from .partition import extract_partitions
+from .segment_preprocess import SegmentPreprocessor
 
 # pylint: disable=too-many-arguments, W0613
 
@@ -34,6 +36,8 @@ def extract_corpus_tags(
     multiproc_keep_order: str = None,
     multiproc_processes: int = 1,
     multiproc_chunksize: int = 100,
+    multiproc_schedule: t.Literal["sorted", "size"] = "sorted",
+    prefetch: int = None,
     merge_strategy: to_speech.MergeStrategyType = 'chain',
     force: bool = False,
     skip_lemma: bool = False,
@@ -43,7 +47,9 @@ def extract_corpus_tags(
     lowercase: bool = True,
     progress: bool = True,
     source_pattern: str = '**/prot-*.zip',
-) -> None:
+    partition_processes: int = None,
+    speech_index_filename: str = None,
+) -> dispatch.IDispatcher:
     """Group extracted protocol blocks by `temporal_key` and attribute `group_keys`.
 
     Temporal key kan be any of None, 'Year', 'Lustrum', 'Decade' or custom year periods
@@ -63,11 +69,20 @@ def extract_corpus_tags(
         multiproc_keep_order (str, optional): Force correct iterate yield order when multiprocessing. Defaults to None.
         multiproc_processes (int, optional): Number of processes during iterate. Defaults to 1.
         multiproc_chunksize (int, optional): Chunksize to use per process during iterate. Defaults to 100.
+        multiproc_schedule (str, optional): Submit protocols to processes in name order ('sorted') or largest
+            first ('size'). Defaults to 'sorted'.
+        prefetch (int, optional): Number of protocols read ahead by background threads when not multiprocessing.
+            Defaults to None.
         force (bool, optional): Clear target if it exists. Defaults to False
         skip_lemma (bool, optional): Defaults to False
         skip_text (bool, optional): Defaults to False
         lowercase (bool, optional): Defaults to False
+        partition_processes (int, optional): Extract temporal partitions in parallel (each with its own merger
+            and dispatcher) and merge results into target. Defaults to None.
+        speech_index_filename (str, optional): Merge speeches using stored utterance speech index. Defaults to None.
     """
+    arguments: dict = {**locals()}
+
     logger.info("extracting tagged corpus...")
 
     if isdir(target_name):
@@ -104,14 +119,20 @@ def extract_corpus_tags(
     )
     # logger.info("loading parliamentary metadata...")
 
-    # FIXME: How to ensure metadata tag is the same as corpus??? Add tag to DB?
-    speaker_service: md.SpeakerInfoService = md.SpeakerInfoService(database_filename=metadata_filename)
-
-    def get_speaker(item: iterate.ProtocolSegment) -> None:
-        item.speaker_info = speaker_service.get_speaker_info(u_id=item.u_id, person_id=item.who, year=item.year)
+    if partition_processes and partition_processes > 1:
+        with extract_partitions(
+            extract_corpus_tags, arguments, source_index=source_index, processes=partition_processes
+        ) as shards:
+            with dispatch.IDispatcher.dispatcher(target_type)(
+                target_name=target_name, compress_type=compress_type, lookups=lookups, **dispatch_opts
+            ) as dispatcher:
+                dispatcher.merge_shards(shards)
+        logger.info(f"Corpus stored in {target_name}.")
+        return dispatcher
 
-    preprocess: t.Callable[[iterate.ProtocolSegment], None] = (
-        get_speaker if segment_level not in ('protocol', None) else None
+    # FIXME: How to ensure metadata tag is the same as corpus??? Add tag to DB?
+    preprocess: SegmentPreprocessor | None = (
+        SegmentPreprocessor(metadata_filename=metadata_filename) if segment_level not in ('protocol', None) else None
     )
 
     texts: iterate.ProtocolSegmentIterator = tagged.ProtocolIterator(
@@ -123,6 +144,10 @@ def extract_corpus_tags(
         multiproc_processes=multiproc_processes,
         multiproc_chunksize=multiproc_chunksize,
         merge_strategy=merge_strategy,
+        speech_index_filename=speech_index_filename,
+        multiproc_schedule=multiproc_schedule,
+        filesizes=source_index.sizes,
+        prefetch=prefetch,
         preprocess=preprocess,
     )
 
@@ -157,3 +182,5 @@ def extract_corpus_tags(
     logger.info(f"Please copy a corpus config `corpus.yml` to {target_name}.")
 
     # FIXME: #69 Write corpus config to file to target folder
+
+    return dispatcher
@@ -1,18 +1,20 @@
 from __future__ import annotations
 
-from typing import Sequence
+from typing import Literal, Sequence
 
 from loguru import logger
 
-from pyriksprot.corpus.iterate import ProtocolSegment
+from pyriksprot.corpus.iterate import ProtocolSegmentIterator
 from pyriksprot.corpus.parlaclarin import iterate
+from pyriksprot.corpus.parquet import ParquetSegmentIterator
 from pyriksprot.corpus.utility import ls_corpus_by_tei_corpora
 
-from .. import dehyphenation, interface
+from .. import interface
 from .. import metadata as md
-from .. import preprocess as pp
 from ..corpus import corpus_index
 from ..dispatch import dispatch, merge
+from .partition import extract_partitions
+from .segment_preprocess import SegmentPreprocessor
 
 # pylint: disable=too-many-arguments, too-many-positional-arguments
 
@@ -30,12 +32,16 @@ def extract_corpus_text(
     multiproc_keep_order: str = None,
     multiproc_processes: int = 1,
     multiproc_chunksize: int = 100,
+    multiproc_schedule: Literal["sorted", "size"] = "sorted",
     dedent: bool = True,
     dehyphen: bool = False,
     data_path: str = '.',
     compress_type: dispatch.CompressType = dispatch.CompressType.Zip,
+    parquet_folder: str = None,
+    partition_processes: int = None,
+    speech_index_filename: str = None,
     **_,
-) -> None:
+) -> dispatch.IDispatcher:
     """Group extracted protocol blocks by `temporal_key` and attribute `group_keys`.
 
     Temporal key kan be any of None, 'Year', 'Lustrum', 'Decade' or custom year periods
@@ -54,10 +60,18 @@ def extract_corpus_text(
         multiproc_keep_order (str, optional): Force correct iterate yield order when multiprocessing. Defaults to None.
         multiproc_processes (int, optional): Number of processes during iterate. Defaults to 1.
         multiproc_chunksize (int, optional): Chunksize to use per process during iterate. Defaults to 100.
+        multiproc_schedule (str, optional): Submit protocols to processes in name order ('sorted') or largest
+            first ('size'). Defaults to 'sorted'.
         dedent (bool, optional): Dedent text. Defaults to True.
         dehyphen (bool, optional): Dehyphen text. Defaults to False.
         data_path (str, optional): Path to model data (used by dedent/dehyphen). Defaults to '.'.
+        parquet_folder (str, optional): Read utterances from Parquet store instead of XML. Defaults to None.
+        partition_processes (int, optional): Extract temporal partitions in parallel (each with its own merger
+            and dispatcher) and merge results into target. Defaults to None.
+        speech_index_filename (str, optional): Merge speeches using stored utterance speech index. Defaults to None.
     """
+    arguments: dict = {**locals()}
+
     ls_tei = lambda d: ls_corpus_by_tei_corpora(  # pylint: disable=unnecessary-lambda-assignment
         d, mode='filenames', normalize=True
     )
@@ -67,25 +81,26 @@ def extract_corpus_text(
 
     lookups: md.Codecs = md.Codecs().load(source=metadata_filename)
 
-    dehypenator: dehyphenation.SwedishDehyphenator = (
-        dehyphenation.SwedishDehyphenator(data_folder=data_path, word_frequencies=None) if dehyphen else None
+    if partition_processes and partition_processes > 1:
+        with extract_partitions(
+            extract_corpus_text, arguments, source_index=source_index, processes=partition_processes
+        ) as shards:
+            with dispatch.IDispatcher.dispatcher(target_type)(
+                target_name, compress_type=compress_type, lookups=lookups
+            ) as dispatcher:
+                dispatcher.merge_shards(shards)
+        logger.info(f"Corpus stored in {target_name}.")
+        return dispatcher
+
+    preprocess: SegmentPreprocessor = SegmentPreprocessor(
+        dedent=dedent,
+        dehyphen=dehyphen,
+        dehyphen_folder=data_path,
+        metadata_filename=metadata_filename if segment_level not in ('protocol', None) else None,
+        require_speaker_info=True,
     )
-    speaker_service: md.SpeakerInfoService = md.SpeakerInfoService(database_filename=metadata_filename)
-
-    def preprocess(item: ProtocolSegment) -> None:
-        if dedent:
-            item.data = pp.dedent(item.data)
-
-        if dehypenator:
-            item.data = dehypenator(item.data)  # pylint: disable=not-callable
-
-        if segment_level not in ('protocol', None):
-            item.speaker_info = speaker_service.get_speaker_info(u_id=item.u_id, person_id=item.who, year=item.year)
 
-        # If not unknown a speaker info must have been assigned
-        assert not (item.who and item.who != "unknown" and item.speaker_info is None)
-
-    segments: iterate.XmlUntangleSegmentIterator = iterate.XmlUntangleSegmentIterator(
+    opts: dict = dict(
         filenames=source_index.paths,
         segment_level=segment_level,
         segment_skip_size=segment_skip_size,
@@ -93,6 +108,14 @@ def extract_corpus_text(
         multiproc_processes=multiproc_processes,
         multiproc_chunksize=multiproc_chunksize,
         preprocess=preprocess,
+        multiproc_schedule=multiproc_schedule,
+        filesizes=source_index.sizes,
+        speech_index_filename=speech_index_filename,
+    )
+    segments: ProtocolSegmentIterator = (
+        ParquetSegmentIterator(source_folder=parquet_folder, **opts)
+        if parquet_folder
+        else iterate.XmlUntangleSegmentIterator(**opts)
     )
 
     merger: merge.SegmentMerger = merge.SegmentMerger(
@@ -110,3 +133,5 @@ def extract_corpus_text(
     # metadata_index.store(target_name if isdir(target_name) else dirname(target_name))
 
     logger.info(f"Corpus stored in {target_name}.")
+
+    return dispatcher
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import contextlib
+import os
+import shutil
+import tempfile
+from collections import Counter
+from functools import partial
+from multiprocessing import get_context
+from typing import Any, Callable, Iterator, Type
+
+from loguru import logger
+
+from .. import interface
+from ..corpus import corpus_index
+from ..dispatch import dispatch
+from ..dispatch.utility import to_temporal_category
+
+jj = os.path.join
+
+
+def partition_years(
+    source_index: corpus_index.CorpusSourceIndex, temporal_key: interface.TemporalKey, n_partitions: int
+) -> list[set[int]]:
+    """Split years in `source_index` into at most `n_partitions` consecutive year sets of roughly equal number of
+    protocols. Years that belong to the same temporal category (e.g. decade) are never split, since the merger
+    requires all segments in a category to be merged (and dispatched) together."""
+    counts: Counter[int] = Counter(x.year for x in source_index.source_items)
+
+    categories: dict[str, set[int]] = {}
+    for year in sorted(counts):
+        categories.setdefault(to_temporal_category(temporal_key, year, str(year)), set()).add(year)
+
+    target_size: float = sum(counts.values()) / max(n_partitions, 1)
+
+    partitions: list[set[int]] = []
+    current: set[int] = set()
+    for years in categories.values():
+        current |= years
+        if sum(counts[y] for y in current) >= target_size:
+            partitions.append(current)
+            current = set()
+
+    if current:
+        partitions.append(current)
+
+    return partitions
+
+
+def extract_partition(
+    partition: tuple[int, set[int]], *, extract: Callable[..., dispatch.IDispatcher], arguments: dict, shard_folder: str
+) -> dispatch.DispatchShard:
+    """Run `extract` workflow on a subset of years. Result is dispatched to a shard target in `shard_folder`."""
+    index, years = partition
+    target_name: str = jj(shard_folder, f"{index:03d}", os.path.basename(os.path.normpath(arguments['target_name'])))
+    os.makedirs(os.path.dirname(target_name), exist_ok=True)
+    dispatcher: dispatch.IDispatcher = extract(
+        **{
+            **arguments,
+            'target_name': target_name,
+            'years': years,
+            'partition_processes': None,
+            'multiproc_processes': 1,
+            'progress': False,
+        }
+    )
+    return dispatcher.to_shard()
+
+
+@contextlib.contextmanager
+def extract_partitions(
+    extract: Callable[..., dispatch.IDispatcher],
+    arguments: dict[str, Any],
+    *,
+    source_index: corpus_index.CorpusSourceIndex,
+    processes: int,
+    n_partitions: int = None,
+) -> Iterator[list[dispatch.DispatchShard]]:
+    """Split corpus into temporal partitions and run `extract` workflow on each partition in a separate process,
+    each with its own merger and dispatcher. Yields shards (in temporal order) to be merged into final target.
+    Shards are removed on exit. Raises ValueError (before any partition is extracted) if target dispatcher cannot
+    merge shards."""
+
+    dispatcher: Type[dispatch.IDispatcher] = dispatch.IDispatcher.dispatcher(arguments.get('target_type'))
+    if not dispatcher.supports_merge:
+        raise ValueError(f"partitioned extract not supported by target type {dispatcher.name} (cannot merge shards)")
+
+    partitions: list[set[int]] = partition_years(
+        source_index, arguments.get('temporal_key'), n_partitions or 4 * processes
+    )
+
+    shard_folder: str = tempfile.mkdtemp(
+        prefix=".shards-", dir=os.path.dirname(os.path.abspath(os.path.normpath(arguments['target_name'])))
+    )
+
+    logger.info(f"extracting {len(partitions)} partitions using {processes} processes")
+
+    try:
+        fx: Callable = partial(
+            extract_partition,
+            extract=extract,
+            arguments={k: v for k, v in arguments.items() if k != '_'},
+            shard_folder=shard_folder,
+        )
+        with get_context("spawn").Pool(processes=processes) as executor:
+            shards: list[dispatch.DispatchShard] = list(executor.imap(fx, enumerate(partitions)))
+        yield shards
+    finally:
+        shutil.rmtree(shard_folder, ignore_errors=True)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from .. import dehyphenation
+from .. import metadata as md
+from .. import preprocess as pp
+from ..corpus.iterate import ISegmentPreprocessor, ProtocolSegment
+
+
+class SegmentPreprocessor(ISegmentPreprocessor):
+    """Dedents and dehyphens segment text, and assigns speaker info to segments.
+
+    The dehyphenator and speaker service are created once per (worker) process in `setup`,
+    hence only configuration is pickled and sent to worker processes.
+    """
+
+    def __init__(
+        self,
+        *,
+        dedent: bool = False,
+        dehyphen: bool = False,
+        dehyphen_folder: str = '.',
+        metadata_filename: str = None,
+        require_speaker_info: bool = False,
+    ):
+        """
+        Args:
+            dedent (bool, optional): Dedent text. Defaults to False.
+            dehyphen (bool, optional): Dehyphen text. Defaults to False.
+            dehyphen_folder (str, optional): Path to dehyphen data (word frequencies). Defaults to '.'.
+            metadata_filename (str, optional): Metadata database, assign speaker info if specified. Defaults to None.
+            require_speaker_info (bool, optional): Raise error if no speaker info is found for a known speaker.
+                Defaults to False.
+        """
+        super().__init__()
+        self.dedent: bool = dedent
+        self.dehyphen: bool = dehyphen
+        self.dehyphen_folder: str = dehyphen_folder
+        self.metadata_filename: str = metadata_filename
+        self.require_speaker_info: bool = require_speaker_info
+
+        self.dehyphenator: dehyphenation.SwedishDehyphenator | None = None
+        self.speaker_service: md.SpeakerInfoService | None = None
+
+    def setup(self) -> None:
+        if self.dehyphen:
+            self.dehyphenator = dehyphenation.SwedishDehyphenator(
+                data_folder=self.dehyphen_folder, word_frequencies=None
+            )
+            if not self.dehyphenator.word_frequencies:
+                raise ValueError("dehyphenation requires word frequencies (frequency file empty or not specified)")
+
+        if self.metadata_filename:
+            self.speaker_service = md.SpeakerInfoService(database_filename=self.metadata_filename)
+
+    def process(self, item: ProtocolSegment) -> None:
+        if self.dedent:
+            item.data = pp.dedent(item.data)
+
+        if self.dehyphenator:
+            item.data = self.dehyphenator.dehyphen_text(item.data)
+
+        if self.speaker_service:
+            item.speaker_info = self.speaker_service.get_speaker_info(
+                u_id=item.u_id, person_id=item.who, year=item.year
+            )
+
+            if self.require_speaker_info and item.speaker_info is None and item.who and item.who != "unknown":
+                raise ValueError(f"speaker info not found for {item.who} (u_id={item.u_id}, year={item.year})")
@@ -1,17 +1,16 @@
 from __future__ import annotations
 
 import os
-import typing as t
 
 import pandas as pd
 from loguru import logger
 from tqdm import tqdm
 
-from pyriksprot import interface
-from pyriksprot import metadata as md
-from pyriksprot import to_speech
+from pyriksprot import interface, to_speech
 from pyriksprot.corpus import corpus_index, iterate, tagged
 
+from .segment_preprocess import SegmentPreprocessor
+
 jj = os.path.join
 relpath = os.path.relpath
 
@@ -30,6 +29,7 @@ def extract_speech_index(
     multiproc_processes: int = 1,
     multiproc_chunksize: int = 100,
     merge_strategy: to_speech.MergeStrategyType = 'chain',
+    speech_index_filename: str = None,
     source_pattern: str = '**/prot-*.zip',
 ) -> pd.DataFrame:
     """Generates a speech index for corpus in `source_folder`, and according to given parameters..
@@ -45,6 +45,7 @@ def extract_speech_index(
         multiproc_processes (int, optional): Number of processes. Defaults to 1.
         multiproc_chunksize (int, optional): Size of work loads assigned to each process. Defaults to 100.
         merge_strategy (to_speech.MergeStrategyType, optional): Speech merge strategy. Defaults to 'chain'.
+        speech_index_filename (str, optional): Merge speeches using stored utterance speech index. Defaults to None.
     """
     logger.info("extracting corpus speech index...")
 
@@ -53,13 +54,8 @@ def extract_speech_index(
     )
     logger.info("loading parliamentary metadata...")
 
-    speaker_service: md.SpeakerInfoService = md.SpeakerInfoService(database_filename=metadata_filename)
-
-    def get_speaker(item: iterate.ProtocolSegment) -> None:
-        item.speaker_info = speaker_service.get_speaker_info(u_id=item.u_id, person_id=item.who, year=item.year)
-
-    preprocess: t.Callable[[iterate.ProtocolSegment], None] = (
-        get_speaker if segment_level not in ('protocol', None) else None
+    preprocess: SegmentPreprocessor | None = (
+        SegmentPreprocessor(metadata_filename=metadata_filename) if segment_level not in ('protocol', None) else None
     )
 
     speeches: iterate.ProtocolSegmentIterator = tagged.ProtocolIterator(
@@ -71,7 +67,9 @@ def extract_speech_index(
         multiproc_processes=multiproc_processes,
         multiproc_chunksize=multiproc_chunksize,
         merge_strategy=merge_strategy,
+        speech_index_filename=speech_index_filename,
         preprocess=preprocess,
+        metadata_only=segment_level in tagged.METADATA_SEGMENT_LEVELS,
     )
 
     df: pd.DataFrame = pd.DataFrame(data=(speech.to_dict() for speech in tqdm(speeches)))
@@ -1,24 +1,33 @@
 from __future__ import annotations
 
 import abc
+import hashlib
 import importlib
-from functools import reduce
+import json
+import os
+import time
+from collections import deque
+from dataclasses import dataclass
+from functools import partial, reduce
 from os.path import dirname, getmtime, isfile, join, split
-from typing import Any, Mapping, Protocol, Type, Union
+from typing import Any, Callable, Mapping, Protocol, Type, Union
 
 from loguru import logger
 from tqdm import tqdm
 
+from pyriksprot.corpus.corpus_index import CorpusManifest
 from pyriksprot.corpus.parlaclarin import parse
+from pyriksprot.corpus.parlaclarin.cache import source_fingerprint
 from pyriksprot.corpus.tagged import persist
 from pyriksprot.corpus.utility import ls_corpus_folder
 
 from .. import interface
 from .. import preprocess as pp
 from ..configuration import ConfigValue, inject_config
-from ..utility import ensure_path, strip_path_and_extension, touch, unlink
+from ..utility import compute_file_hash, ensure_path, strip_path_and_extension, touch, unlink
 
 METADATA_FILENAME: str = 'metadata.json'
+TAGGING_MANIFEST_FILENAME: str = 'tagging_manifest.json'
 TAGGED_COLUMNS: list[str] = ['token', 'lemma', 'pos', 'xpos', 'sentence_id']
 
 TaggedDocument = Mapping[str, list[str]]
@@ -148,53 +157,244 @@ def tag_protocol(tagger: ITagger, protocol: interface.Protocol, preprocess=False
     documents: list[TaggedDocument] = tagger.tag(texts, preprocess=preprocess)
 
     for i, document in enumerate(documents):
-        protocol.utterances[i].annotation = tagger.to_csv(document)
-        protocol.utterances[i].num_tokens = document.get("num_tokens")  # type: ignore
-        protocol.utterances[i].num_words = document.get("num_words")  # type: ignore
+        assign_tagged_document(tagger, protocol.utterances[i], document)
 
-    return protocol
+    return protocol.invalidate()
 
 
-def tag_protocol_xml(
+def assign_tagged_document(tagger: ITagger, utterance: interface.Utterance, document: TaggedDocument) -> None:
+    utterance.annotation = tagger.to_csv(document)
+    utterance.num_tokens = document.get("num_tokens")  # type: ignore
+    utterance.num_words = document.get("num_words")  # type: ignore
+
+
+@dataclass
+class TaggingJob:
+    """A parsed and preprocessed protocol waiting to be tagged and stored"""
+
+    input_filename: str
+    output_filename: str
+    protocol: interface.Protocol
+    checksum: str
+    preprocessors: str
+    n_pending: int = 0
+
+
+@dataclass
+class BatchStatistics:
+    """Batch size and throughput of a tagging run"""
+
+    n_batches: int = 0
+    n_utterances: int = 0
+    n_tokens: int = 0
+    max_batch_tokens: int = 0
+    elapsed: float = 0.0
+
+    def add(self, n_utterances: int, n_tokens: int, elapsed: float) -> None:
+        self.n_batches += 1
+        self.n_utterances += n_utterances
+        self.n_tokens += n_tokens
+        self.max_batch_tokens = max(self.max_batch_tokens, n_tokens)
+        self.elapsed += elapsed
+
+    def __str__(self) -> str:
+        return (
+            f"batches: {self.n_batches}, utterances: {self.n_utterances}, tokens: {self.n_tokens}, "
+            f"tokens/batch: {self.n_tokens / max(self.n_batches, 1):.0f} (max {self.max_batch_tokens}), "
+            f"throughput: {self.n_tokens / self.elapsed if self.elapsed > 0 else 0:.0f} tokens/s"
+        )
+
+
+class TokenBudgetBatcher:
+    """Tags utterances of many protocols in batches bounded by token count (estimated as number of whitespace
+    separated words). An utterance larger than the budget is tagged in a batch of its own. Results are scattered
+    back to their protocols, and a protocol is passed to `on_done` as soon as all its utterances are tagged."""
+
+    def __init__(self, tagger: ITagger, max_tokens: int, on_done: Callable[[TaggingJob], None]):
+        self.tagger: ITagger = tagger
+        self.max_tokens: int = max_tokens
+        self.on_done: Callable[[TaggingJob], None] = on_done
+        self.queue: deque[tuple[TaggingJob, int, int]] = deque()
+        self.n_queued_tokens: int = 0
+        self.stats: BatchStatistics = BatchStatistics()
+
+    def add(self, job: TaggingJob) -> None:
+        """Queue utterances of `job`. Tag batches while queue holds at least a full batch."""
+        job.n_pending = len(job.protocol.utterances)
+        for i, u in enumerate(job.protocol.utterances):
+            n_tokens: int = len(u.text.split())
+            self.queue.append((job, i, n_tokens))
+            self.n_queued_tokens += n_tokens
+        if job.n_pending == 0:
+            self.on_done(job)
+        while self.n_queued_tokens >= self.max_tokens:
+            self.tag_batch()
+
+    def flush(self) -> None:
+        """Tag all queued utterances."""
+        while self.queue:
+            self.tag_batch()
+
+    def tag_batch(self) -> None:
+        batch: list[tuple[TaggingJob, int, int]] = []
+        n_tokens: int = 0
+        while self.queue and (not batch or n_tokens + self.queue[0][2] <= self.max_tokens):
+            batch.append(self.queue.popleft())
+            n_tokens += batch[-1][2]
+        self.n_queued_tokens -= n_tokens
+
+        start: float = time.perf_counter()
+        documents: list[TaggedDocument] = self.tagger.tag(
+            [job.protocol.utterances[i].text for job, i, _ in batch], preprocess=False
+        )
+        self.stats.add(len(batch), n_tokens, time.perf_counter() - start)
+
+        for (job, i, _), document in zip(batch, documents):
+            assign_tagged_document(self.tagger, job.protocol.utterances[i], document)
+            job.n_pending -= 1
+            if job.n_pending == 0:
+                job.protocol.invalidate()
+                self.on_done(job)
+
+
+def processor_key(processor: Callable) -> str:
+    """Identity of a preprocessor, including arguments bound by `functools.partial`."""
+    if isinstance(processor, partial):
+        args: list[str] = [repr(a) for a in processor.args] + [
+            f"{k}={v!r}" for k, v in sorted(processor.keywords.items())
+        ]
+        return f"{processor_key(processor.func)}({', '.join(args)})"
+    name: str | None = getattr(processor, '__qualname__', None) or getattr(processor, '__name__', None)
+    if name is None:
+        return repr(processor)
+    return f"{getattr(processor, '__module__', None) or ''}.{name}"
+
+
+def preprocessor_key(tagger: ITagger) -> str:
+    """Identity of tagger configuration and its preprocessors (tagged output of unchanged source may differ if they
+    differ). The key is the tagger's class name and a hash of its `config` (or `model_version`) and preprocessors."""
+    preprocessors: list[Callable] = getattr(tagger, 'preprocessors', None) or []
+    fingerprint: str = json.dumps(
+        {
+            'config': getattr(tagger, 'config', None),
+            'model_version': getattr(tagger, 'model_version', None),
+            'preprocessors': [processor_key(p) for p in preprocessors],
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return f"{type(tagger).__name__}:{hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()}"
+
+
+class TaggingManifest:
+    """Source fingerprint (size, mtime and hash) and preprocessor configuration of each tagged protocol, together
+    with checksum and size of stored output. Used to skip unchanged protocols without parsing the source XML.
+    Entries are keyed by output path relative to `folder`, and stored in `TAGGING_MANIFEST_FILENAME` in `folder`."""
+
+    def __init__(self, folder: str, entries: dict[str, dict] = None):
+        self.folder: str = folder
+        self.entries: dict[str, dict] = entries or {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def filename(self) -> str:
+        return join(self.folder, TAGGING_MANIFEST_FILENAME)
+
+    @staticmethod
+    def load(folder: str) -> "TaggingManifest":
+        """Load manifest stored in `folder`. Return an empty manifest if missing or unreadable."""
+        manifest: TaggingManifest = TaggingManifest(folder)
+        try:
+            if isfile(manifest.filename):
+                with open(manifest.filename, encoding="utf-8") as fp:
+                    manifest.entries = json.load(fp)
+        except ValueError:
+            logger.warning(f"ignoring unreadable tagging manifest {manifest.filename}")
+        return manifest
+
+    def store(self) -> "TaggingManifest":
+        """Store manifest (atomically). Return self."""
+        os.makedirs(self.folder, exist_ok=True)
+        with open(f"{self.filename}.tmp", "w", encoding="utf-8") as fp:
+            json.dump(self.entries, fp)
+        os.replace(f"{self.filename}.tmp", self.filename)
+        return self
+
+    def key(self, output_filename: str) -> str:
+        return os.path.relpath(output_filename, self.folder)
+
+    def is_unchanged(self, input_filename: str, output_filename: str, preprocessors: str) -> bool:
+        """Check if stored output of `input_filename` is up to date. Source file is only stat:ed, unless its
+        mtime has changed but not its size, in which case its content hash is compared."""
+        entry: dict | None = self.entries.get(self.key(output_filename))
+        if entry is None or entry['preprocessors'] != preprocessors or not isfile(output_filename):
+            return False
+        if os.path.getsize(output_filename) != entry['output_size']:
+            return False
+        stat: os.stat_result = os.stat(input_filename)
+        if stat.st_size != entry['size']:
+            return False
+        if stat.st_mtime_ns != entry['mtime']:
+            if compute_file_hash(input_filename) != entry['hash']:
+                return False
+            entry['mtime'] = stat.st_mtime_ns
+        return True
+
+    def update(self, input_filename: str, output_filename: str, preprocessors: str, checksum: str | None) -> None:
+        """Record source fingerprint and stored output of a tagged (or validated) protocol."""
+        fingerprint: dict = source_fingerprint(input_filename, use_hash=True)
+        self.entries[self.key(output_filename)] = {
+            'size': fingerprint['size'],
+            'mtime': fingerprint['mtime'],
+            'hash': fingerprint['hash'],
+            'preprocessors': preprocessors,
+            'checksum': checksum,
+            'output_size': os.path.getsize(output_filename),
+        }
+
+
+def prepare_protocol(
     input_filename: str,
     output_filename: str,
     tagger: ITagger,
     force: bool = False,
-    storage_format: interface.StorageFormat = interface.StorageFormat.JSON,
-) -> None:
-    """Annotate XML protocol `input_filename` to `output_filename`.
-
-    Args:
-        input_filename (str, optional): Defaults to None.
-        output_filename (str, optional): Defaults to None.
-        tagger (StanzaTagger, optional): Defaults to None.
-    """
+    manifest: TaggingManifest = None,
+) -> TaggingJob | None:
+    """Parse and preprocess XML protocol `input_filename`. Return None if protocol is skipped (unchanged according
+    to `manifest` or to stored checksum) or empty, otherwise a job to be tagged and stored in `output_filename`."""
 
     try:
         ensure_path(output_filename)
 
+        preprocessors: str = preprocessor_key(tagger)
+        if not force and manifest is not None and manifest.is_unchanged(input_filename, output_filename, preprocessors):
+            logger.info(f"skipped: {strip_path_and_extension(input_filename)} (source unchanged)")
+            return None
+
         protocol: interface.Protocol = parse.ProtocolMapper.parse(input_filename)
 
         if not protocol.has_text:
             unlink(output_filename)
             touch(output_filename)
-            return
+            if manifest is not None:
+                manifest.update(input_filename, output_filename, preprocessors, None)
+            return None
 
         protocol.preprocess(tagger.preprocess)
         checksum: str = protocol.checksum()
 
-        # print(f"checksum: {checksum}")
-        # print(f"   force: {force}")
-        # print(f"filename: {os.path.abspath(output_filename)}  {os.path.isfile(os.path.abspath(output_filename))}")
-
         if not force and persist.validate_checksum(output_filename, checksum):
             logger.info(f"skipped: {strip_path_and_extension(input_filename)} (checksum validates OK)")
-            touch(output_filename)
-        else:
-            unlink(output_filename)
-            logger.info(f"tagging: {strip_path_and_extension(input_filename)}")
-            protocol = tag_protocol(tagger, protocol=protocol)
-            persist.store_protocol(output_filename, protocol=protocol, checksum=checksum, storage_format=storage_format)
+            if manifest is None:
+                touch(output_filename)
+            else:
+                manifest.update(input_filename, output_filename, preprocessors, checksum)
+            return None
+
+        unlink(output_filename)
+        return TaggingJob(input_filename, output_filename, protocol, checksum, preprocessors)
 
     except Exception:
         logger.error(f"FAILED: {input_filename}")
@@ -202,6 +402,57 @@ def tag_protocol_xml(
         raise
 
 
+def store_tagged_protocol(
+    job: TaggingJob,
+    storage_format: interface.StorageFormat = interface.StorageFormat.JSON,
+    manifest: TaggingManifest = None,
+) -> None:
+    """Store tagged protocol of `job`, and record it in `manifest`."""
+    try:
+        persist.store_protocol(
+            job.output_filename, protocol=job.protocol, checksum=job.checksum, storage_format=storage_format
+        )
+    except Exception:
+        logger.error(f"FAILED: {job.input_filename}")
+        unlink(job.output_filename)
+        raise
+    if manifest is not None:
+        manifest.update(job.input_filename, job.output_filename, job.preprocessors, job.checksum)
+
+
+def tag_protocol_xml(
+    input_filename: str,
+    output_filename: str,
+    tagger: ITagger,
+    force: bool = False,
+    storage_format: interface.StorageFormat = interface.StorageFormat.JSON,
+    manifest: TaggingManifest = None,
+) -> None:
+    """Annotate XML protocol `input_filename` to `output_filename`.
+
+    Args:
+        input_filename (str, optional): Defaults to None.
+        output_filename (str, optional): Defaults to None.
+        tagger (StanzaTagger, optional): Defaults to None.
+        manifest (TaggingManifest, optional): Skip protocol, without parsing it, if manifest shows that
+            source and preprocessors are unchanged. Manifest is updated. Defaults to None.
+    """
+
+    job: TaggingJob | None = prepare_protocol(input_filename, output_filename, tagger, force=force, manifest=manifest)
+
+    if job is None:
+        return
+
+    try:
+        logger.info(f"tagging: {strip_path_and_extension(input_filename)}")
+        tag_protocol(tagger, protocol=job.protocol)
+    except Exception:
+        logger.error(f"FAILED: {input_filename}")
+        raise
+
+    store_tagged_protocol(job, storage_format=storage_format, manifest=manifest)
+
+
 def tag_protocols(
     tagger: ITagger,
     source_folder: str,
@@ -209,17 +460,46 @@ def tag_protocols(
     force: bool,
     recursive: bool = False,
     pattern: str | None = None,
-):
-    """Tags protocols in `source_folder`. Stores result in `target_folder`.
+    batch_tokens: int | None = None,
+) -> BatchStatistics | None:
+    """Tags protocols in `source_folder`. Stores result in `target_folder`, and updates manifests of `target_folder`.
+    Protocols whose source (and tagger preprocessors) are unchanged according to the tagging manifest are skipped
+    without being parsed. Skipped output files are not touched, so that their corpus manifest rows remain valid.
+    If `batch_tokens` is given, then utterances of consecutive protocols are tagged together
+    in batches of at most this many tokens (see `TokenBudgetBatcher`), and batch statistics are returned.
     Note: not used by Snakemake workflow (used by tag CLI script)
     """
+    manifest: TaggingManifest = TaggingManifest.load(target_folder)
+    batcher: TokenBudgetBatcher | None = (
+        TokenBudgetBatcher(tagger, batch_tokens, on_done=partial(store_tagged_protocol, manifest=manifest))
+        if batch_tokens
+        else None
+    )
     source_files: list[str] = ls_corpus_folder(source_folder, pattern=pattern)
-    for source_file in tqdm(source_files):
-        target_file: str = resolve_target_filename(source_file, target_folder, recursive)
-        if force or expired(target_file, source_file):
-            tag_protocol_xml(source_file, target_file, tagger, storage_format="json", force=force)
-        else:
-            touch(target_file)
+    try:
+        for source_file in tqdm(source_files):
+            target_file: str = resolve_target_filename(source_file, target_folder, recursive)
+            if not (force or expired(target_file, source_file)):
+                continue
+            if batcher is None:
+                tag_protocol_xml(
+                    source_file, target_file, tagger, storage_format="json", force=force, manifest=manifest
+                )
+            else:
+                job: TaggingJob | None = prepare_protocol(
+                    source_file, target_file, tagger, force=force, manifest=manifest
+                )
+                if job is not None:
+                    batcher.add(job)
+        if batcher is not None:
+            batcher.flush()
+            logger.info(f"tagging: {batcher.stats}")
+    finally:
+        manifest.store()
+
+    CorpusManifest.update(target_folder)
+
+    return batcher.stats if batcher is not None else None
 
 
 def resolve_target_filename(source_file: str, target_folder: str, recursive: bool) -> str:
@@ -1,3 +1,8 @@
+import pickle
+
+import pytest
+
+from pyriksprot.foss import untangle
 from pyriksprot.foss.sparv_tokenize import BetterSentenceTokenizer, BetterWordTokenizer
 
 
@@ -21,3 +26,37 @@ def test_better_sentencer():
     assert list(data) == ["Hej!", "Vad heter du?"]
 
     assert not list(tokenizer.tokenize(""))
+
+
+def test_untangle_element():
+    xml: str = (
+        '<TEI><text><body><div>'
+        '<u who="x" xml:id="i-1"><seg>a<pb n="1"/>b</seg><seg>c</seg></u><class/>'
+        '</div></body></text></TEI>'
+    )
+    data: untangle.Element = untangle.parse(xml)
+
+    div: untangle.Element = data.TEI.text.body.div
+
+    assert not hasattr(div, '__dict__')
+    assert div.u['who'] == 'x'
+    assert div.u.get_attribute('xml:id') == 'i-1'
+    assert div.u.attributes == {'who': 'x', 'xml:id': 'i-1'}
+    assert div.class_.attributes == {}
+    assert div.class_['missing'] is None
+    assert [seg.cdata for seg in div.u.seg] == ['ab', 'c']
+    assert div.u.seg[0].cdatas == ['ab']
+    assert div.u.seg[0].pb['n'] == '1'
+    assert div.u.seg[1] == 'c'
+    assert div.u is div.u
+    assert 'u' in div and 'seg' not in div
+    assert len(div) == 2
+
+    with pytest.raises(AttributeError):
+        _ = div.seg
+
+    with pytest.raises(AttributeError):
+        _ = data.TEI.missing
+
+    clone: untangle.Element = pickle.loads(pickle.dumps(data))
+    assert clone.TEI.text.body.div.u.seg[0].cdata == 'ab'
@@ -3,6 +3,7 @@ from __future__ import annotations
 import glob
 import itertools
 import os
+import pickle
 import uuid
 from typing import Callable
 
@@ -31,6 +32,35 @@ def test_utterance_text():
     assert u.text == '\n'.join(["X", "Y", "C"])
 
 
+def test_utterance_text_is_cached():
+    u: interface.Utterance = interface.Utterance(u_id="u", speaker_note_id="x", who="x", paragraphs=["X", "", "C"])
+    assert u.text is u.text
+    assert not hasattr(u, '__dict__')
+
+    u.paragraphs = ["Y"]
+    assert u.invalidate().text == "Y"
+
+    loaded: interface.Utterance = pickle.loads(pickle.dumps(u))
+    assert loaded.__getstate__() == u.__getstate__()
+    assert loaded.text == "Y"
+
+
+@pytest.mark.parametrize('paragraphs', [[], [''], ['X'], ['\nX\n', '', 'Y\nZ', ''], 'X@#@Y'])
+def test_utterance_paragraphs_are_packed(paragraphs: list[str] | str):
+    u: interface.Utterance = interface.Utterance(u_id="u", who="x", paragraphs=paragraphs)
+    expected: list[str] = paragraphs.split(interface.PARAGRAPH_MARKER) if isinstance(paragraphs, str) else paragraphs
+    assert u.paragraphs == expected
+    assert u.text == '\n'.join(p for p in expected if p != '').strip()
+    assert interface.Utterance(**u.__getstate__()).paragraphs == expected
+
+
+@pytest.mark.parametrize('paragraphs', [[], [''], [' \n '], ' \n ', ' X ', ['\nX\n', '', 'Y\nZ', ''], ' X@#@Y '])
+def test_paragraphs_to_text_equals_utterance_text(paragraphs: list[str] | str):
+    """Text lengths precomputed by corpus index must equal lengths of iterated utterance texts"""
+    u: interface.Utterance = interface.Utterance(u_id="u", who="x", paragraphs=paragraphs)
+    assert interface.UtteranceHelper.paragraphs_to_text(paragraphs) == u.text
+
+
 def test_utterance_checksumtext():
     u: interface.Utterance = interface.Utterance(u_id="u", speaker_note_id="x", who="x", paragraphs=["X", "Y", "C"])
     assert u.checksum() == '6060d006e0494206'
@@ -69,13 +99,13 @@ def test_utterances_who_sequences(utterances: list[interface.Utterance]):
 def test_utterances_to_csv(utterances: list[interface.Utterance]):
     data: str = interface.UtteranceHelper.to_csv(utterances)
     loaded_utterances = interface.UtteranceHelper.from_csv(data)
-    assert [x.__dict__ for x in utterances] == [x.__dict__ for x in loaded_utterances]
+    assert [x.__getstate__() for x in utterances] == [x.__getstate__() for x in loaded_utterances]
 
 
 def test_utterances_to_json(utterances: list[interface.Utterance]):
     data: str = interface.UtteranceHelper.to_json(utterances)
     loaded_utterances = interface.UtteranceHelper.from_json(data)
-    assert [x.__dict__ for x in utterances] == [x.__dict__ for x in loaded_utterances]
+    assert [x.__getstate__() for x in utterances] == [x.__getstate__() for x in loaded_utterances]
 
 
 def test_utterances_to_pandas(utterances: list[interface.Utterance]):
@@ -113,6 +143,9 @@ def test_protocol_preprocess():
 
     preprocess: Callable[[str], str] = lambda t: 'APA'
 
+    """Cached texts are invalidated"""
+    assert protocol.text != 'APA\nAPA\nAPA\nAPA\nAPA\nAPA\nAPA'
+
     protocol.preprocess(preprocess=preprocess)
 
     assert protocol.text == 'APA\nAPA\nAPA\nAPA\nAPA\nAPA\nAPA'
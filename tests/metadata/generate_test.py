@@ -6,6 +6,7 @@ from typing import Any
 from unittest.mock import MagicMock
 
 import pandas as pd
+import pyarrow as pa
 import pytest
 
 import pyriksprot.sql as sql
@@ -14,8 +15,19 @@ from pyriksprot import metadata as md
 from pyriksprot.configuration import ConfigValue
 from pyriksprot.configuration.inject import ConfigStore
 from pyriksprot.corpus.parlaclarin import ProtocolMapper
+from pyriksprot.corpus.utility import ls_corpus_folder
+from pyriksprot.interface import Protocol, Speech, Utterance
 from pyriksprot.metadata import database
+from pyriksprot.metadata.corpus_index_factory import create_utterance_speech_index
 from pyriksprot.metadata.schema import MetadataSchema
+from pyriksprot.to_speech import (
+    MergeByStoredSpeechIndex,
+    MergerFactory,
+    MergeStrategyType,
+    load_stored_speech_index,
+    to_speeches,
+    utterances_checksum,
+)
 from pyriksprot.workflows.create_metadata import create_database_workflow
 
 jj = os.path.join
@@ -182,3 +194,179 @@ def test_generate_corpus_indexes(corpus_folder: str):
     assert data.get('protocols') is not None
     assert data.get('utterances') is not None
     assert data.get('speaker_notes') is not None
+
+
+def assert_incremental_equals_full_rebuild(
+    version: str, corpus_folder: str, root_folder: str, previous_ids: pd.Series
+) -> dict[str, pd.DataFrame]:
+    """Regenerate index incrementally and in full, and assert that they are equal (except for document ids, which
+    are kept for protocols in `previous_ids`). Return incrementally generated index."""
+    data: dict[str, pd.DataFrame] = (
+        md.CorpusIndexFactory(ProtocolMapper, schema=version)
+        .generate(corpus_folder=corpus_folder, target_folder=jj(root_folder, "index"), incremental=True)
+        .data
+    )
+    full_data: dict[str, pd.DataFrame] = (
+        md.CorpusIndexFactory(ProtocolMapper, schema=version)
+        .generate(corpus_folder=corpus_folder, target_folder=jj(root_folder, "full_index"))
+        .data
+    )
+
+    protocols: pd.DataFrame = data["protocols"].reset_index().set_index("document_name")
+    kept: pd.Series = protocols.document_id[protocols.index.isin(previous_ids.index)]
+    assert (kept == previous_ids[kept.index]).all()
+    assert set(protocols.index) == set(full_data["protocols"].document_name)
+
+    for tablename in ["speeches", "speaker_notes"]:
+        assert data[tablename].sort_index().equals(full_data[tablename].sort_index())
+
+    for tablename in ["utterances", "utterance_speeches"]:
+        assert (data[tablename].drop(columns="document_id").sort_index()).equals(
+            full_data[tablename].drop(columns="document_id").sort_index()
+        )
+
+    return data
+
+
+def test_generate_corpus_indexes_incrementally():
+    version: str = ConfigValue("metadata.version").resolve()
+    source_folder: str = ConfigValue("corpus.folder").resolve()
+    root_folder: str = jj("tests", "output", str(uuid.uuid4())[:8])
+    corpus_folder: str = jj(root_folder, "corpus")
+    shutil.copytree(source_folder, corpus_folder)
+
+    factory: md.CorpusIndexFactory = md.CorpusIndexFactory(ProtocolMapper, schema=version)
+    expected: dict[str, bytes] = {}
+    for tablename in factory.generate(corpus_folder=corpus_folder, target_folder=jj(root_folder, "index")).data:
+        with open(jj(root_folder, "index", f"{tablename}.csv.gz"), "rb") as fp:
+            expected[tablename] = fp.read()
+
+    """No changes: index should be identical"""
+    md.CorpusIndexFactory(ProtocolMapper, schema=version).generate(
+        corpus_folder=corpus_folder, target_folder=jj(root_folder, "index"), incremental=True
+    )
+    for tablename, data in expected.items():
+        with open(jj(root_folder, "index", f"{tablename}.csv.gz"), "rb") as fp:
+            assert fp.read() == data
+
+    """Remove one protocol, change another: index should equal a full rebuild (except for document ids)"""
+    previous_ids: pd.Series = (
+        md.CorpusIndexFactory(ProtocolMapper, schema=version)
+        .load(jj(root_folder, "index"))["protocols"]
+        .reset_index()
+        .set_index("document_name")["document_id"]
+    )
+    filenames: list[str] = sorted(ls_corpus_folder(corpus_folder))
+    removed_filename: str = filenames[-1]
+    os.remove(removed_filename)
+    with open(filenames[1], "r", encoding="utf-8") as fp:
+        xml: str = fp.read().replace("</seg>", " tillägg</seg>", 1)
+    with open(filenames[1], "w", encoding="utf-8") as fp:
+        fp.write(xml)
+
+    assert_incremental_equals_full_rebuild(version, corpus_folder, root_folder, previous_ids)
+
+    """Add a new protocol: existing documents keep their ids, index should equal a full rebuild"""
+    previous_ids = (
+        md.CorpusIndexFactory(ProtocolMapper, schema=version)
+        .load(jj(root_folder, "index"))["protocols"]
+        .reset_index()
+        .set_index("document_name")["document_id"]
+    )
+    shutil.copyfile(jj(source_folder, os.path.relpath(removed_filename, corpus_folder)), removed_filename)
+
+    data: dict[str, pd.DataFrame] = assert_incremental_equals_full_rebuild(
+        version, corpus_folder, root_folder, previous_ids
+    )
+    added_name: str = os.path.splitext(os.path.basename(removed_filename))[0]
+    protocols: pd.DataFrame = data["protocols"].reset_index().set_index("document_name")
+    assert added_name in protocols.index and added_name not in previous_ids.index
+    assert (data["utterances"].document_id == protocols.document_id[added_name]).sum() > 0
+    assert protocols.document_id.is_unique
+
+    shutil.rmtree(root_folder, ignore_errors=True)
+
+
+@pytest.mark.parametrize('strategy', [x for x in MergeStrategyType if x != MergeStrategyType.undefined])
+def test_stored_speech_index_equals_to_speeches(strategy: MergeStrategyType):
+    version: str = ConfigValue("metadata.version").resolve()
+    corpus_folder: str = ConfigValue("corpus.folder").resolve()
+    target_folder: str = jj("tests", "output", str(uuid.uuid4())[:8])
+
+    md.CorpusIndexFactory(ProtocolMapper, schema=version).generate(
+        corpus_folder=corpus_folder, target_folder=target_folder
+    )
+
+    merger: MergeByStoredSpeechIndex = MergeByStoredSpeechIndex(
+        jj(target_folder, "utterance_speeches.csv.gz"), strategy
+    )
+
+    stored: dict = load_stored_speech_index(merger.filename, merger.merge_strategy)
+
+    for filename in sorted(ls_corpus_folder(corpus_folder)):
+        protocol: Protocol = ProtocolMapper.parse(filename)
+        if protocol.utterances:
+            assert stored[protocol.utterances[0].u_id][0] == utterances_checksum(protocol.utterances)
+        expected: list[Speech] = to_speeches(protocol=protocol, merge_strategy=strategy, skip_size=0)
+        speeches: list[Speech] = to_speeches(protocol=protocol, merge_strategy=merger, skip_size=0)
+        assert [[u.u_id for u in s.utterances] for s in speeches] == [[u.u_id for u in s.utterances] for s in expected]
+
+    """Protocols not in index are clustered by merge strategy"""
+    protocol.utterances = protocol.utterances[1:]
+    assert [s.speech_id for s in to_speeches(protocol=protocol, merge_strategy=merger, skip_size=0)] == [
+        s.speech_id for s in to_speeches(protocol=protocol, merge_strategy=strategy, skip_size=0)
+    ]
+
+    """Protocols changed since index was created (same utterances, broken prev/next chain) are clustered"""
+    protocol = ProtocolMapper.parse(filename)
+    for u in protocol.utterances:
+        u.prev_id = u.next_id = None
+    assert [
+        [u.u_id for u in s.utterances] for s in to_speeches(protocol=protocol, merge_strategy=merger, skip_size=0)
+    ] == [[u.u_id for u in s.utterances] for s in to_speeches(protocol=protocol, merge_strategy=strategy, skip_size=0)]
+
+    shutil.rmtree(target_folder, ignore_errors=True)
+
+
+def test_utterance_speech_index_skips_protocols_not_segmentable_by_strategy():
+    """Second protocol has consecutive utterances of different speakers having a missing speaker note"""
+    protocols: list[list[Utterance]] = [
+        [Utterance(u_id="a", who="x", speaker_note_id="n1"), Utterance(u_id="b", who="x", speaker_note_id="n1")],
+        [
+            Utterance(u_id="c", who="x", speaker_note_id="missing"),
+            Utterance(u_id="d", who="y", speaker_note_id="missing"),
+        ],
+    ]
+    utterances: pa.Table = pa.Table.from_pylist(
+        [
+            dict(
+                document_id=document_id,
+                u_id=u.u_id,
+                person_id=u.who,
+                speaker_note_id=u.speaker_note_id,
+                page_number=0,
+                has_prev=False,
+                has_next=False,
+                n_chars=1,
+            )
+            for document_id, protocol in enumerate(protocols)
+            for u in protocol
+        ]
+    )
+
+    speech_index: pd.DataFrame = create_utterance_speech_index(utterances)
+
+    assert speech_index.speaker_note_id_sequence.isna().tolist() == [False, False, True, True]
+    assert speech_index.who.tolist() == [1, 1, 1, 2]
+
+    filename: str = jj("tests", "output", f"{uuid.uuid4()}.csv.gz")
+    speech_index.to_csv(filename, sep='\t')
+
+    assert set(load_stored_speech_index(filename, "speaker_note_id_sequence")) == {"a"}
+    assert set(load_stored_speech_index(filename, "who")) == {"a", "c"}
+
+    """Protocol not indexed by strategy is clustered"""
+    merger: MergeByStoredSpeechIndex = MergeByStoredSpeechIndex(filename, "speaker_note_id_sequence")
+    assert merger.cluster(protocols[1]) == MergerFactory.get("speaker_note_id_sequence").cluster(protocols[1])
+
+    os.unlink(filename)